@@ -0,0 +1,36 @@
+"""add tokenrevocado
+
+Revision ID: 1f6a8c4e2d95
+Revises: e5b9d3f7a240
+Create Date: 2026-10-18 20:26:47.903118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6a8c4e2d95'
+down_revision = 'e5b9d3f7a240'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tokenrevocado',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=True),
+    sa.Column('expira', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tokenrevocado_jti'), 'tokenrevocado', ['jti'], unique=True)
+    op.create_index(op.f('ix_tokenrevocado_expira'), 'tokenrevocado', ['expira'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tokenrevocado_expira'), table_name='tokenrevocado')
+    op.drop_index(op.f('ix_tokenrevocado_jti'), table_name='tokenrevocado')
+    op.drop_table('tokenrevocado')
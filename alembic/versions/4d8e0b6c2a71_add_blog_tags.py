@@ -0,0 +1,74 @@
+"""add blog tags
+
+Revision ID: 4d8e0b6c2a71
+Revises: c3a7e91f5d28
+Create Date: 2026-10-18 18:21:40.882013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8e0b6c2a71'
+down_revision = 'c3a7e91f5d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clave', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('nombre', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('cantidad_posts', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tag_clave'), 'tag', ['clave'], unique=True)
+    op.create_table('blogposttag',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['blogpost.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ),
+    sa.PrimaryKeyConstraint('post_id', 'tag_id')
+    )
+    op.create_index('ix_blogposttag_tag_post', 'blogposttag', ['tag_id', 'post_id'], unique=False)
+
+    # Backfill desde BlogPost.tags (texto separado por comas)
+    conn = op.get_bind()
+    tags = {}  # clave -> [id, nombre, publicados]
+    enlaces = set()
+    for post_id, texto, publicado in conn.execute(sa.text('SELECT id, tags, publicado FROM blogpost')):
+        for nombre in (texto or '').split(','):
+            nombre = ' '.join(nombre.split())[:100]
+            if not nombre:
+                continue
+            clave = nombre.lower()
+            if clave not in tags:
+                tags[clave] = [len(tags) + 1, nombre, 0]
+            if (post_id, tags[clave][0]) not in enlaces:
+                enlaces.add((post_id, tags[clave][0]))
+                tags[clave][2] += 1 if publicado else 0
+    if tags:
+        op.bulk_insert(
+            sa.table('tag', sa.column('id'), sa.column('clave'), sa.column('nombre'), sa.column('cantidad_posts')),
+            [
+                {'id': id_, 'clave': clave, 'nombre': nombre, 'cantidad_posts': cantidad}
+                for clave, (id_, nombre, cantidad) in tags.items()
+            ],
+        )
+        op.bulk_insert(
+            sa.table('blogposttag', sa.column('post_id'), sa.column('tag_id')),
+            [{'post_id': post_id, 'tag_id': tag_id} for post_id, tag_id in enlaces],
+        )
+        if conn.dialect.name == 'postgresql':
+            # Los ids se insertaron explícitamente: ajustar la secuencia
+            op.execute("SELECT setval(pg_get_serial_sequence('tag', 'id'), (SELECT max(id) FROM tag))")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blogposttag_tag_post', table_name='blogposttag')
+    op.drop_table('blogposttag')
+    op.drop_index(op.f('ix_tag_clave'), table_name='tag')
+    op.drop_table('tag')
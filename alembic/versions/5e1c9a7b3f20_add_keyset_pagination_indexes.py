@@ -0,0 +1,27 @@
+"""add keyset pagination indexes
+
+Revision ID: 5e1c9a7b3f20
+Revises: d0cf2c802257
+Create Date: 2026-10-18 16:40:12.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1c9a7b3f20'
+down_revision = 'd0cf2c802257'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_publicacion_anio_id', 'publicacion', ['anio', 'id'], unique=False)
+    op.create_index('ix_blogpost_fecha_publicacion_id', 'blogpost', ['fecha_publicacion', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blogpost_fecha_publicacion_id', table_name='blogpost')
+    op.drop_index('ix_publicacion_anio_id', table_name='publicacion')
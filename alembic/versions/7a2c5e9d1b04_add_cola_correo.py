@@ -0,0 +1,49 @@
+"""add cola de correo
+
+Revision ID: 7a2c5e9d1b04
+Revises: 4d8e0b6c2a71
+Create Date: 2026-10-18 19:05:12.417530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2c5e9d1b04'
+down_revision = '4d8e0b6c2a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('mensajecorreo',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('asunto', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('html', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('enviocorreo',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mensaje_id', sa.Integer(), nullable=False),
+    sa.Column('destinatario', sqlmodel.sql.sqltypes.AutoString(length=254), nullable=False),
+    sa.Column('estado', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('ultimo_error', sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True),
+    sa.Column('enviado_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['mensaje_id'], ['mensajecorreo.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_enviocorreo_mensaje_id'), 'enviocorreo', ['mensaje_id'], unique=False)
+    op.create_index('ix_envio_correo_pendientes', 'enviocorreo', ['estado', 'proximo_intento'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_envio_correo_pendientes', table_name='enviocorreo')
+    op.drop_index(op.f('ix_enviocorreo_mensaje_id'), table_name='enviocorreo')
+    op.drop_table('enviocorreo')
+    op.drop_table('mensajecorreo')
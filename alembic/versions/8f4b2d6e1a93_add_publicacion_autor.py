@@ -0,0 +1,58 @@
+"""add publicacion_autor
+
+Revision ID: 8f4b2d6e1a93
+Revises: 5e1c9a7b3f20
+Create Date: 2026-10-18 17:05:31.204117
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4b2d6e1a93'
+down_revision = '5e1c9a7b3f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('publicacionautor',
+    sa.Column('publicacion_id', sa.Integer(), nullable=False),
+    sa.Column('personal_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['personal_id'], ['personal.id'], ),
+    sa.ForeignKeyConstraint(['publicacion_id'], ['publicacion.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('publicacion_id', 'personal_id')
+    )
+    op.create_index('ix_publicacionautor_personal_publicacion', 'publicacionautor', ['personal_id', 'publicacion_id'], unique=False)
+
+    # Backfill desde Publicacion.authors, solo con personal_id existentes
+    conn = op.get_bind()
+    personal = {fila[0] for fila in conn.execute(sa.text('SELECT id FROM personal'))}
+    filas = []
+    for publicacion_id, authors in conn.execute(sa.text('SELECT id, authors FROM publicacion')):
+        if isinstance(authors, str):
+            authors = json.loads(authors or '[]')
+        ids = {
+            author.get('personal_id')
+            for author in authors or []
+            if isinstance(author, dict)
+        }
+        filas.extend(
+            {'publicacion_id': publicacion_id, 'personal_id': personal_id}
+            for personal_id in ids
+            if personal_id in personal
+        )
+    if filas:
+        op.bulk_insert(
+            sa.table('publicacionautor', sa.column('publicacion_id'), sa.column('personal_id')),
+            filas,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_publicacionautor_personal_publicacion', table_name='publicacionautor')
+    op.drop_table('publicacionautor')
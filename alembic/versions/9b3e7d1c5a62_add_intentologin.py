@@ -0,0 +1,32 @@
+"""add intentologin
+
+Revision ID: 9b3e7d1c5a62
+Revises: 1f6a8c4e2d95
+Create Date: 2026-10-18 21:02:19.548230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e7d1c5a62'
+down_revision = '1f6a8c4e2d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('intentologin',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clave', sqlmodel.sql.sqltypes.AutoString(length=300), nullable=False),
+    sa.Column('momento', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_intentologin_clave_momento', 'intentologin', ['clave', 'momento'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_intentologin_clave_momento', table_name='intentologin')
+    op.drop_table('intentologin')
@@ -0,0 +1,49 @@
+"""add blogpost full-text search
+
+Revision ID: c3a7e91f5d28
+Revises: 8f4b2d6e1a93
+Create Date: 2026-10-18 17:48:09.731552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.models.blog import BUSQUEDA_DDL_POSTGRES, BUSQUEDA_DDL_SQLITE
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7e91f5d28'
+down_revision = '8f4b2d6e1a93'
+branch_labels = None
+depends_on = None
+
+
+# Las mismas sentencias que crean el índice en las bases nuevas (create_all);
+# en Postgres la columna generada se calcula para las filas existentes al
+# agregarla
+POSTGRES = BUSQUEDA_DDL_POSTGRES
+
+SQLITE = [
+    *BUSQUEDA_DDL_SQLITE,
+    # Indexa los posts existentes
+    "INSERT INTO blogpost_fts(blogpost_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    for sentencia in POSTGRES if dialecto == 'postgresql' else SQLITE if dialecto == 'sqlite' else []:
+        op.execute(sentencia)
+
+
+def downgrade() -> None:
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_blogpost_busqueda")
+        op.execute("ALTER TABLE blogpost DROP COLUMN IF EXISTS busqueda")
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent")
+    elif dialecto == 'sqlite':
+        for trigger in ('blogpost_fts_ai', 'blogpost_fts_ad', 'blogpost_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS blogpost_fts")
@@ -0,0 +1,24 @@
+"""add admin token_version
+
+Revision ID: e5b9d3f7a240
+Revises: 7a2c5e9d1b04
+Create Date: 2026-10-18 19:48:03.215644
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9d3f7a240'
+down_revision = '7a2c5e9d1b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('admin', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('admin', 'token_version')
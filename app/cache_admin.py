@@ -0,0 +1,85 @@
+"""
+Caché en memoria de los administradores autenticados.
+
+`get_current_admin` guarda, por hash del token, el Admin ya verificado durante
+ADMIN_CACHE_TTL_SECONDS: las peticiones siguientes con el mismo token no
+decodifican el JWT ni consultan la base.
+
+Cada token lleva la `token_version` del admin al emitirse. Cambiar la
+contraseña o borrar el admin incrementa (o anula) esa versión: en este
+proceso las entradas dejan de valer de inmediato y en los demás workers al
+vencer el TTL, cuando el token vuelve a compararse con la versión en la base.
+Los tokens revocados (logout) se descartan aunque estén en la caché.
+"""
+
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app import revocacion
+from app.models import Admin
+
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get("ADMIN_CACHE_TTL_SECONDS", "30"))
+ADMIN_CACHE_MAX = int(os.environ.get("ADMIN_CACHE_MAX", "1024"))
+
+# sha256(token) -> (vence, admin, jti); en orden de uso para descartar por LRU
+_entradas: "OrderedDict[bytes, Tuple[float, Admin, Optional[str]]]" = OrderedDict()
+# admin_id -> token_version vigente conocida (None: admin eliminado)
+_versiones: Dict[int, Optional[int]] = {}
+
+
+def _clave(token: str) -> bytes:
+    # No se guarda el token en claro
+    return hashlib.sha256(token.encode()).digest()
+
+
+def obtener(token: str) -> Optional[Admin]:
+    """Admin cacheado para el token, si sigue vigente."""
+    clave = _clave(token)
+    entrada = _entradas.get(clave)
+    if entrada is None:
+        return None
+    vence, admin, jti = entrada
+    if (
+        vence <= time.time()
+        or _versiones.get(admin.id) != admin.token_version  # type: ignore
+        or (jti is not None and revocacion.revocado(jti))
+    ):
+        del _entradas[clave]
+        return None
+    _entradas.move_to_end(clave)
+    return admin
+
+
+def guardar(
+    token: str, admin: Admin, expira_token: float, jti: Optional[str] = None
+) -> None:
+    """Cachea el admin verificado, como mucho hasta que venza el token."""
+    if ADMIN_CACHE_TTL_SECONDS <= 0:
+        return
+    # Copia desligada de la sesión de la petición que lo cargó
+    copia = Admin(
+        id=admin.id,
+        username=admin.username,
+        password_hash=admin.password_hash,
+        token_version=admin.token_version,
+        created_at=admin.created_at,
+    )
+    _versiones[admin.id] = admin.token_version  # type: ignore
+    _entradas[_clave(token)] = (
+        min(time.time() + ADMIN_CACHE_TTL_SECONDS, expira_token),
+        copia,
+        jti,
+    )
+    while len(_entradas) > ADMIN_CACHE_MAX:
+        _entradas.popitem(last=False)
+
+
+def invalidar(admin_id: int, version: Optional[int] = None) -> None:
+    """
+    Registra la nueva token_version del admin (None si se eliminó): las
+    entradas con otra versión se descartan en la próxima consulta.
+    """
+    _versiones[admin_id] = version
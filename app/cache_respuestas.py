@@ -0,0 +1,233 @@
+"""
+Caché de respuestas de los listados públicos que cambian poco.
+
+Las rutas se suman con la dependencia `cachear("carrera")`, que declara de
+qué entidades depende la respuesta. El middleware guarda el cuerpo ya
+serializado (y los headers) por host + ruta + query y lo devuelve sin pasar
+por el endpoint ni la base mientras no se invalide.
+
+Los servicios llaman a `invalidar("carrera")` después de cada escritura: se
+descartan solo las respuestas con esa etiqueta. Cada etiqueta tiene además un
+contador de generación; una respuesta que empezó a calcularse antes de una
+invalidación no se guarda, aunque termine después.
+
+El almacén se limita por tamaño total (LRU) y por tamaño de cada respuesta.
+La invalidación es por proceso: en los demás workers la respuesta vieja dura
+como mucho RESPONSE_CACHE_TTL_SECONDS. Los clientes que acaban de escribir
+(cookie de lectura en el primario) no usan la caché.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Depends, Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics, replicas
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024))
+)
+
+# Headers de la respuesta que se guardan (el resto los recalcula el servidor)
+HEADERS_GUARDADOS = {b"content-type", b"link", b"x-next-cursor"}
+
+ACIERTOS = metrics.Contador(
+    "response_cache_hits_total", "Respuestas servidas desde la caché"
+)
+FALLOS = metrics.Contador(
+    "response_cache_misses_total", "Respuestas cacheables calculadas por el endpoint"
+)
+INVALIDADAS = metrics.Contador(
+    "response_cache_invalidations_total", "Respuestas descartadas por escrituras"
+)
+
+
+class _Entrada(NamedTuple):
+    vence: float
+    headers: List[Tuple[bytes, bytes]]
+    cuerpo: bytes
+    etiquetas: Tuple[str, ...]
+
+
+_entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+_por_etiqueta: Dict[str, Set[str]] = {}
+_generaciones: Dict[str, int] = {}
+_total = 0
+
+
+def _tamano(entrada: _Entrada) -> int:
+    return len(entrada.cuerpo) + sum(len(k) + len(v) for k, v in entrada.headers)
+
+
+def _metricas() -> List[str]:
+    return metrics.metrica(
+        "response_cache_bytes", "gauge", "Bytes guardados en la caché", _total
+    ) + metrics.metrica(
+        "response_cache_entries", "gauge", "Respuestas guardadas", len(_entradas)
+    )
+
+
+metrics.registrar(_metricas)
+
+
+def _quitar(clave: str) -> None:
+    global _total
+    entrada = _entradas.pop(clave, None)
+    if entrada is None:
+        return
+    _total -= _tamano(entrada)
+    for etiqueta in entrada.etiquetas:
+        claves = _por_etiqueta.get(etiqueta)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del _por_etiqueta[etiqueta]
+
+
+def _obtener(clave: str):
+    entrada = _entradas.get(clave)
+    if entrada is None:
+        return None
+    if entrada.vence <= time.monotonic():
+        _quitar(clave)
+        return None
+    _entradas.move_to_end(clave)
+    return entrada
+
+
+def _guardar(clave: str, entrada: _Entrada) -> None:
+    global _total
+    tamano = _tamano(entrada)
+    if tamano > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+        return
+    _quitar(clave)
+    _entradas[clave] = entrada
+    _total += tamano
+    for etiqueta in entrada.etiquetas:
+        _por_etiqueta.setdefault(etiqueta, set()).add(clave)
+    while _total > RESPONSE_CACHE_MAX_BYTES and _entradas:
+        _quitar(next(iter(_entradas)))
+
+
+def invalidar(*etiquetas: str) -> None:
+    """Descarta las respuestas que dependen de alguna de las etiquetas."""
+    for etiqueta in etiquetas:
+        _generaciones[etiqueta] = _generaciones.get(etiqueta, 0) + 1
+        for clave in list(_por_etiqueta.get(etiqueta, ())):
+            _quitar(clave)
+            INVALIDADAS.incrementar()
+
+
+def limpiar() -> None:
+    """Vacía la caché (p. ej. tras modificar datos fuera de los servicios)."""
+    for etiqueta in list(_por_etiqueta):
+        invalidar(etiqueta)
+
+
+def cachear(*etiquetas: str):
+    """
+    Dependencia de ruta que habilita la caché para el endpoint; `etiquetas`
+    son las entidades de las que depende la respuesta.
+    """
+
+    def marcar(request: Request) -> None:
+        # La generación se toma antes de consultar la base
+        request.state.cache_generaciones = {
+            etiqueta: _generaciones.get(etiqueta, 0) for etiqueta in etiquetas
+        }
+
+    return Depends(marcar)
+
+
+def _clave(scope: Scope) -> str:
+    host = dict(scope["headers"]).get(b"host", b"").decode("latin-1")
+    query = sorted(parse_qsl(scope["query_string"].decode("latin-1"), True))
+    return f"{host}{scope['path']}?{urlencode(query)}"
+
+
+class CacheRespuestasMiddleware:
+    """Sirve y guarda las respuestas de las rutas marcadas con `cachear`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or RESPONSE_CACHE_TTL_SECONDS <= 0
+            or replicas.lectura_en_primario(Request(scope))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        clave = _clave(scope)
+        entrada = _obtener(clave)
+        if entrada is not None:
+            ACIERTOS.incrementar()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": entrada.headers
+                    + [
+                        (b"content-length", str(len(entrada.cuerpo)).encode()),
+                        (b"x-cache", b"HIT"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": entrada.cuerpo})
+            return
+
+        generaciones = None
+        headers: List[Tuple[bytes, bytes]] = []
+        partes: List[bytes] = []
+        tamano = 0
+
+        async def enviar(message: Message) -> None:
+            nonlocal generaciones, headers, tamano
+            if message["type"] == "http.response.start":
+                generaciones = scope.get("state", {}).get("cache_generaciones")
+                if generaciones is not None and message["status"] == 200:
+                    headers = [
+                        (k, v)
+                        for k, v in message.get("headers", [])
+                        if k.lower() in HEADERS_GUARDADOS
+                    ]
+                    MutableHeaders(scope=message).append("x-cache", "MISS")
+                    FALLOS.incrementar()
+                else:
+                    generaciones = None
+            elif message["type"] == "http.response.body" and generaciones is not None:
+                tamano += len(message.get("body", b""))
+                if tamano > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+                    generaciones = None
+                else:
+                    partes.append(message.get("body", b""))
+                if not message.get("more_body", False) and generaciones is not None:
+                    # Si hubo escrituras mientras se calculaba, puede ser vieja
+                    if all(
+                        _generaciones.get(etiqueta, 0) == generacion
+                        for etiqueta, generacion in generaciones.items()
+                    ):
+                        _guardar(
+                            clave,
+                            _Entrada(
+                                time.monotonic() + RESPONSE_CACHE_TTL_SECONDS,
+                                headers,
+                                b"".join(partes),
+                                tuple(generaciones),
+                            ),
+                        )
+            await send(message)
+
+        await self.app(scope, receive, enviar)
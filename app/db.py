@@ -1,20 +1,102 @@
 from os import getenv
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 import os
 
+from app import metrics
+
 DATABASE_URL = getenv("DATABASE_URL")
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL environment variable is not set")
 
 is_async = "+asyncpg" in DATABASE_URL or "+aiosqlite" in DATABASE_URL
 
-# Only add connect_args for Postgres
-if DATABASE_URL.startswith("postgresql"):
-    connect_args = {"server_settings": {"timezone": "UTC"}}
-else:
-    connect_args = {}
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+# Loguear cada sentencia SQL es síncrono y costoso: solo para depurar
+DB_ECHO = getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# Conexiones por proceso: cada worker de uvicorn abre hasta
+# DB_POOL_SIZE + DB_MAX_OVERFLOW, a tener en cuenta en max_connections
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Límite de duración de cada sentencia en Postgres (0 = sin límite)
+DB_STATEMENT_TIMEOUT_MS = int(getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+DB_POOL_ESPERA = metrics.Histograma(
+    "db_pool_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = metrics.Contador(
+    "db_pool_timeouts_total", "Esperas de conexión que superaron DB_POOL_TIMEOUT"
+)
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """Pool asíncrono que mide cuánto espera cada checkout."""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.incrementar()
+            raise
+        finally:
+            DB_POOL_ESPERA.observar(time.perf_counter() - inicio)
+
+
+def metricas_pool(pool: Pool) -> List[str]:
+    """Estado actual del pool (solo los pools con cola tienen estos datos)."""
+    if not isinstance(pool, QueuePool):
+        return []
+    return [
+        *metrics.metrica("db_pool_size", "gauge", "Conexiones fijas del pool", pool.size()),
+        *metrics.metrica(
+            "db_pool_checked_out", "gauge", "Conexiones en uso", pool.checkedout()
+        ),
+        *metrics.metrica(
+            "db_pool_checked_in", "gauge", "Conexiones libres en el pool", pool.checkedin()
+        ),
+        # overflow() es negativo mientras no se llenó el tamaño fijo
+        *metrics.metrica(
+            "db_pool_overflow",
+            "gauge",
+            "Conexiones abiertas por encima de DB_POOL_SIZE",
+            max(pool.overflow(), 0),
+        ),
+    ]
+
+
+def opciones_engine(url: str) -> Dict[str, Any]:
+    """Argumentos de create_async_engine según el motor y el entorno."""
+    opciones: Dict[str, Any] = {"echo": DB_ECHO, "future": True}
+
+    # SQLite (tests y desarrollo) usa sus propios pools sin estas opciones
+    if url.startswith("postgresql"):
+        server_settings = {"timezone": "UTC"}
+        if DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+        opciones.update(
+            connect_args={"server_settings": server_settings},
+            poolclass=PoolMedido,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    return opciones
 
 if is_async:
     from sqlalchemy.ext.asyncio import (
@@ -25,17 +107,25 @@ if is_async:
     )
 
     async_engine: AsyncEngine = create_async_engine(
-        DATABASE_URL,
-        echo=True,
-        future=True,
-        connect_args=connect_args,
+        DATABASE_URL, **opciones_engine(DATABASE_URL)
     )
+    metrics.registrar(lambda: metricas_pool(async_engine.pool))
     async_session_factory = async_sessionmaker(
         async_engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
 
+    # Réplicas de solo lectura opcionales (URLs separadas por comas)
+    replica_session_factories = [
+        async_sessionmaker(
+            create_async_engine(url, **opciones_engine(url)),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        for url in DATABASE_REPLICA_URLS
+    ]
+
     async def get_session_async() -> AsyncGenerator[AsyncSession, None]:
         async with async_session_factory() as session:
             yield session
@@ -60,6 +150,7 @@ else:
     async_session_factory = async_sessionmaker(
         dummy_async_engine, class_=AsyncSession, expire_on_commit=False
     )
+    replica_session_factories = []
 
     def get_session_sync():
         raise NotImplementedError("Async session not available for sync driver.")
@@ -84,7 +175,7 @@ def get_sync_session_local():
     from sqlalchemy.orm import sessionmaker
     from sqlmodel import Session
 
-    engine = create_engine(db_url, echo=True, future=True)
+    engine = create_engine(db_url, echo=DB_ECHO, future=True)
     return sessionmaker(class_=Session, autocommit=False, autoflush=False, bind=engine)
 
 
@@ -14,11 +14,37 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-from fastapi import Header, HTTPException, status, Depends
+from fastapi import Header, HTTPException, Request, status, Depends
 from jose import JWTError
 from sqlalchemy.future import select
 from app.security import decode_token
 from app.models import Admin
+from app import cache_admin, replicas, revocacion
+
+
+async def get_read_session(
+    request: Request, primary: AsyncSession = Depends(get_async_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sesión para endpoints de solo lectura: usa una réplica si hay alguna
+    disponible, salvo que la petición no sea de lectura o el cliente haya
+    escrito hace poco (lee del primario para ver sus propios cambios).
+    """
+    session = None
+    if (
+        request.method in replicas.METODOS_LECTURA
+        and not replicas.lectura_en_primario(request)
+    ):
+        session = await replicas.abrir_sesion_replica()
+
+    if session is None:
+        yield primary
+        return
+
+    try:
+        yield session
+    finally:
+        await session.close()
 
 
 async def get_current_admin(
@@ -29,15 +55,30 @@ async def get_current_admin(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token faltante"
         )
     token = authorization.removeprefix("Bearer ").strip()
+    # Solo consulta la base una vez por intervalo de refresco; la sesión no
+    # abre conexión hasta la primera consulta, así que un acierto de la caché
+    # no toca la base
+    await revocacion.actualizar(db)
+    admin = cache_admin.obtener(token)
+    if admin is not None:
+        return admin
     try:
         payload = decode_token(token)
         admin_id = int(payload["sub"])
+        # Los tokens emitidos antes de token_version corresponden a la 0
+        version = int(payload.get("ver", 0))
     except (JWTError, KeyError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido"
         )
+    jti = payload.get("jti")
+    if jti is not None and revocacion.revocado(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revocado"
+        )
     result = await db.execute(select(Admin).where(Admin.id == admin_id))  # type: ignore
     admin = result.scalar_one_or_none()
-    if not admin:
+    if not admin or admin.token_version != version:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    cache_admin.guardar(token, admin, float(payload["exp"]), jti)
     return admin
@@ -0,0 +1,178 @@
+"""
+Límite de intentos de login por IP y por usuario (ventana deslizante).
+
+Cada intento se registra antes de verificar la contraseña: cuando una de las
+dos claves (`ip:<dirección>` o `usuario:<nombre>`) ya alcanzó su límite en los
+últimos LOGIN_WINDOW_SECONDS, el login se rechaza con 429 y Retry-After sin
+llegar a ejecutar bcrypt. Un login correcto borra los intentos del usuario.
+
+La ventana es un registro de los momentos de cada intento (sliding log): no
+hay bordes de ventana fija que permitan duplicar la ráfaga.
+
+Backends (LOGIN_RATE_BACKEND):
+  - memoria: en el proceso; con varios workers cada uno cuenta por separado.
+  - db: tabla intentologin en la base, compartida por todos los workers.
+
+La IP es la del cliente de la conexión; detrás de un proxy hay que ejecutar
+uvicorn con --proxy-headers para que sea la del cliente real.
+"""
+
+import os
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import IntentoLogin
+
+LOGIN_RATE_BACKEND = os.environ.get("LOGIN_RATE_BACKEND", "memoria").lower()
+# Intentos permitidos por ventana; 0 desactiva el límite correspondiente
+LOGIN_MAX_PER_IP = int(os.environ.get("LOGIN_MAX_PER_IP", "30"))
+LOGIN_MAX_PER_USER = int(os.environ.get("LOGIN_MAX_PER_USER", "10"))
+LOGIN_WINDOW_SECONDS = float(os.environ.get("LOGIN_WINDOW_SECONDS", "900"))
+
+# Claves que guarda como mucho el backend en memoria (descarta las menos usadas)
+MAX_CLAVES_MEMORIA = 10_000
+
+
+class LimiteIntentos(ABC):
+    @abstractmethod
+    async def intentar(
+        self, db: AsyncSession, clave: str, limite: int, ventana: float
+    ) -> float:
+        """
+        Registra un intento para `clave` si no superó `limite` en los últimos
+        `ventana` segundos. Devuelve 0 si se permitió, o los segundos que
+        faltan para que se libere un lugar.
+        """
+
+    @abstractmethod
+    async def reiniciar(self, db: AsyncSession, clave: str) -> None:
+        """Olvida los intentos registrados para `clave`."""
+
+
+class LimiteMemoria(LimiteIntentos):
+    """
+    Intentos por clave en un OrderedDict en orden de uso: con más de
+    MAX_CLAVES_MEMORIA claves se descartan las usadas hace más tiempo, así la
+    memoria y el costo de cada intento no dependen de cuántas claves (IPs o
+    usuarios inventados) lleguen.
+    """
+
+    def __init__(self):
+        self._intentos: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    async def intentar(
+        self, db: AsyncSession, clave: str, limite: int, ventana: float
+    ) -> float:
+        ahora = time.monotonic()
+        momentos = self._intentos.get(clave)
+        if momentos is None:
+            momentos = self._intentos[clave] = deque()
+        else:
+            self._intentos.move_to_end(clave)
+            while momentos and momentos[0] <= ahora - ventana:
+                momentos.popleft()
+            if len(momentos) >= limite:
+                # Rechazado: no se registra nada nuevo
+                return momentos[0] + ventana - ahora
+        momentos.append(ahora)
+        while len(self._intentos) > MAX_CLAVES_MEMORIA:
+            self._intentos.popitem(last=False)
+        return 0.0
+
+    async def reiniciar(self, db: AsyncSession, clave: str) -> None:
+        self._intentos.pop(clave, None)
+
+
+class LimiteBaseDatos(LimiteIntentos):
+    """
+    Intentos en la tabla intentologin (índice por clave y momento). Entre el
+    conteo y la inserción otro worker puede colar algún intento: el límite es
+    aproximado en ráfagas concurrentes, pero nunca deja de aplicarse.
+    """
+
+    async def intentar(
+        self, db: AsyncSession, clave: str, limite: int, ventana: float
+    ) -> float:
+        ahora = datetime.now(timezone.utc)
+        desde = ahora - timedelta(seconds=ventana)
+        # Los intentos fuera de la ventana ya no cuentan
+        await db.execute(
+            delete(IntentoLogin).where(
+                IntentoLogin.clave == clave, IntentoLogin.momento <= desde
+            )
+        )
+        cantidad, primero = (
+            await db.execute(
+                select(func.count(), func.min(IntentoLogin.momento)).where(
+                    IntentoLogin.clave == clave
+                )
+            )
+        ).one()
+        if cantidad >= limite:
+            await db.commit()
+            if primero.tzinfo is None:
+                primero = primero.replace(tzinfo=timezone.utc)
+            return max((primero - desde).total_seconds(), 0.0)
+        db.add(IntentoLogin(clave=clave, momento=ahora))
+        await db.commit()
+        return 0.0
+
+    async def reiniciar(self, db: AsyncSession, clave: str) -> None:
+        await db.execute(delete(IntentoLogin).where(IntentoLogin.clave == clave))
+        await db.commit()
+
+
+_instancia: Optional[LimiteIntentos] = None
+
+
+def crear_limite(nombre: str = LOGIN_RATE_BACKEND) -> LimiteIntentos:
+    if nombre == "memoria":
+        return LimiteMemoria()
+    if nombre == "db":
+        return LimiteBaseDatos()
+    raise ValueError(f"LOGIN_RATE_BACKEND desconocido: {nombre}")
+
+
+def obtener_limite() -> LimiteIntentos:
+    """Backend configurado (se crea una única vez por proceso)."""
+    global _instancia
+    if _instancia is None:
+        _instancia = crear_limite()
+    return _instancia
+
+
+def _clave_usuario(username: str) -> str:
+    return f"usuario:{username.strip().lower()[:255]}"
+
+
+async def verificar(db: AsyncSession, request: Request, username: str) -> None:
+    """Registra el intento o responde 429 con Retry-After si no se permite."""
+    ip = request.client.host if request.client else "desconocida"
+    limite = obtener_limite()
+    for clave, maximo in (
+        (f"ip:{ip}", LOGIN_MAX_PER_IP),
+        (_clave_usuario(username), LOGIN_MAX_PER_USER),
+    ):
+        if maximo <= 0:
+            continue
+        espera = await limite.intentar(db, clave, maximo, LOGIN_WINDOW_SECONDS)
+        if espera > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiados intentos de login",
+                headers={"Retry-After": str(max(1, math.ceil(espera)))},
+            )
+
+
+async def login_correcto(db: AsyncSession, username: str) -> None:
+    if LOGIN_MAX_PER_USER > 0:
+        await obtener_limite().reiniciar(db, _clave_usuario(username))
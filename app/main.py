@@ -13,6 +13,11 @@ from app.routes.academico import router as academico_router
 from app.routes.blog import router as blog_router
 from app.routes import auth
 from app.routes.subscribers import router as subscribers_router
+from app.routes.metrics import router as metrics_router
+from app import security
+from app.services import imagenes_service
+from app.replicas import StickyPrimarioMiddleware
+from app.cache_respuestas import CacheRespuestasMiddleware
 
 # Configuración mejorada para Swagger
 app = FastAPI(
@@ -24,12 +29,21 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+app.add_middleware(StickyPrimarioMiddleware)
+app.add_middleware(CacheRespuestasMiddleware)
+
 
 @app.on_event("startup")
 async def on_startup():
     await init_db()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    imagenes_service.cerrar_pool()
+    security.cerrar_pool()
+
+
 # Incluir routers de forma explícita
 app.include_router(archivos_router)
 app.include_router(personal_router)
@@ -42,6 +56,7 @@ app.include_router(blog_router)
 # Suscripciones (público)
 app.include_router(subscribers_router)
 app.include_router(auth.router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -0,0 +1,95 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus.
+
+Cada proceso (worker de uvicorn) mantiene sus propias métricas; todas llevan
+la etiqueta `pid` para poder sumarlas o distinguirlas al consultarlas.
+Se sirven en /metrics (app/routes/metrics.py), que requiere METRICS_TOKEN o,
+solo en redes internas, METRICS_PUBLIC=true; sin ninguno responde 404.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Colectores que devuelven las líneas de sus métricas al momento de exponerlas
+_colectores: List[Callable[[], List[str]]] = []
+
+
+def _etiquetas(extra: Optional[Dict[str, str]] = None) -> str:
+    # getpid al exponer: los workers pueden crearse por fork tras importar
+    etiquetas = {"pid": str(os.getpid()), **(extra or {})}
+    return ",".join(f'{k}="{v}"' for k, v in etiquetas.items())
+
+
+def metrica(nombre: str, tipo: str, ayuda: str, valor: float) -> List[str]:
+    """Líneas de una métrica simple (gauge o counter)."""
+    return [
+        f"# HELP {nombre} {ayuda}",
+        f"# TYPE {nombre} {tipo}",
+        f"{nombre}{{{_etiquetas()}}} {valor}",
+    ]
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.valor = 0
+        self._lock = threading.Lock()
+        registrar(self.exponer)
+
+    def incrementar(self, cantidad: float = 1) -> None:
+        with self._lock:
+            self.valor += cantidad
+
+    def exponer(self) -> List[str]:
+        return metrica(self.nombre, "counter", self.ayuda, self.valor)
+
+
+class Histograma:
+    """Histograma acumulado por buckets, como prometheus_client.Histogram."""
+
+    def __init__(self, nombre: str, ayuda: str, buckets: Sequence[float]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = sorted(buckets)
+        self._conteos = [0] * (len(self.buckets) + 1)
+        self._suma = 0.0
+        # Las observaciones pueden llegar desde hilos del threadpool
+        self._lock = threading.Lock()
+        registrar(self.exponer)
+
+    def observar(self, valor: float) -> None:
+        with self._lock:
+            self._conteos[bisect_left(self.buckets, valor)] += 1
+            self._suma += valor
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            conteos = list(self._conteos)
+            suma = self._suma
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, conteos):
+            acumulado += conteo
+            lineas.append(
+                f"{self.nombre}_bucket{{{_etiquetas({'le': repr(limite)})}}} {acumulado}"
+            )
+        acumulado += conteos[-1]
+        lineas.append(f"{self.nombre}_bucket{{{_etiquetas({'le': '+Inf'})}}} {acumulado}")
+        lineas.append(f"{self.nombre}_sum{{{_etiquetas()}}} {suma}")
+        lineas.append(f"{self.nombre}_count{{{_etiquetas()}}} {acumulado}")
+        return lineas
+
+
+def registrar(colector: Callable[[], List[str]]) -> None:
+    _colectores.append(colector)
+
+
+def exponer() -> str:
+    """Texto completo para el endpoint /metrics."""
+    lineas: List[str] = []
+    for colector in _colectores:
+        lineas.extend(colector())
+    return "\n".join(lineas) + "\n"
@@ -1,5 +1,6 @@
 from .models import *
 from .academico import Carrera, Materia, Requisito, TipoRequisito
-from .blog import BlogPost
-from .admin import Admin
+from .blog import BlogPost, BlogPostTag, Tag
+from .admin import Admin, IntentoLogin, TokenRevocado
 from .subscriber import Subscriber
+from .correo import EnvioCorreo, MensajeCorreo
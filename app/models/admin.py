@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional
-from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlmodel import SQLModel, Field, Index, UniqueConstraint
 
 
 class Admin(SQLModel, table=True):
@@ -8,4 +8,31 @@ class Admin(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str
     password_hash: str
+    # Se incrementa al cambiar la contraseña: invalida los tokens emitidos
+    token_version: int = Field(default=0)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class TokenRevocado(SQLModel, table=True):
+    """
+    Token revocado antes de vencer (logout), identificado por su claim jti. El
+    id creciente permite a cada worker traer solo las revocaciones nuevas.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(index=True, unique=True, max_length=64)
+    admin_id: Optional[int] = Field(default=None)
+    # exp del token: pasado ese momento la revocación ya no hace falta
+    expira: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class IntentoLogin(SQLModel, table=True):
+    """Intento de login, para el límite por IP y usuario (backend db)."""
+
+    __table_args__ = (Index("ix_intentologin_clave_momento", "clave", "momento"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # "ip:<dirección>" o "usuario:<nombre>"
+    clave: str = Field(max_length=300)
+    momento: datetime
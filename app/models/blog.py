@@ -3,10 +3,15 @@
 from datetime import datetime, timezone
 from typing import List, Optional
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Boolean, Column
+from sqlalchemy import DDL, Boolean, Column, Index, event
 
 
 class BlogPost(SQLModel, table=True):
+    # Índice del orden de paginación por cursor (fecha de publicación, id)
+    __table_args__ = (
+        Index("ix_blogpost_fecha_publicacion_id", "fecha_publicacion", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     titulo: str
     contenido: str
@@ -20,3 +25,98 @@ class BlogPost(SQLModel, table=True):
     publicado: bool = Field(default=True, sa_column=Column(Boolean))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class Tag(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Forma normalizada (minúsculas, sin espacios sobrantes) por la que se busca
+    clave: str = Field(max_length=100, unique=True, index=True)
+    # Forma con la que se escribió por primera vez, para mostrar
+    nombre: str = Field(max_length=100)
+    # Posts publicados con este tag; se recalcula al escribir los posts
+    cantidad_posts: int = Field(default=0)
+
+
+class BlogPostTag(SQLModel, table=True):
+    """Tags de cada post, derivado de BlogPost.tags."""
+
+    __table_args__ = (Index("ix_blogposttag_tag_post", "tag_id", "post_id"),)
+
+    post_id: int = Field(
+        foreign_key="blogpost.id", primary_key=True, ondelete="CASCADE"
+    )
+    tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+
+
+# Índice de búsqueda de texto completo, mantenido por la base en cada escritura
+# (ver app/services/busqueda_service.py). La migración c3a7e91f5d28 importa
+# estas mismas listas para las bases ya existentes: deben seguir siendo
+# idempotentes (IF NOT EXISTS) y valer también sobre tablas con datos.
+
+# Postgres: columna tsvector generada con la configuración española sin tildes
+# (unaccent + stemming) e índice GIN
+BUSQUEDA_DDL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END $$
+    """,
+    """
+    ALTER TABLE blogpost ADD COLUMN IF NOT EXISTS busqueda tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('es_unaccent', coalesce(titulo, '')), 'A')
+        || setweight(to_tsvector('es_unaccent', coalesce(resumen, '')), 'B')
+        || setweight(to_tsvector('es_unaccent', coalesce(contenido, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_blogpost_busqueda ON blogpost USING gin (busqueda)",
+]
+
+# SQLite: tabla FTS5 de contenido externo sincronizada por triggers
+BUSQUEDA_DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blogpost_fts USING fts5(
+        titulo, contenido, resumen,
+        content='blogpost', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogpost_fts_ai AFTER INSERT ON blogpost BEGIN
+        INSERT INTO blogpost_fts(rowid, titulo, contenido, resumen)
+        VALUES (new.id, new.titulo, new.contenido, new.resumen);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogpost_fts_ad AFTER DELETE ON blogpost BEGIN
+        INSERT INTO blogpost_fts(blogpost_fts, rowid, titulo, contenido, resumen)
+        VALUES ('delete', old.id, old.titulo, old.contenido, old.resumen);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogpost_fts_au AFTER UPDATE ON blogpost BEGIN
+        INSERT INTO blogpost_fts(blogpost_fts, rowid, titulo, contenido, resumen)
+        VALUES ('delete', old.id, old.titulo, old.contenido, old.resumen);
+        INSERT INTO blogpost_fts(rowid, titulo, contenido, resumen)
+        VALUES (new.id, new.titulo, new.contenido, new.resumen);
+    END
+    """,
+]
+
+for _sentencia in BUSQUEDA_DDL_POSTGRES:
+    event.listen(
+        BlogPost.__table__,
+        "after_create",
+        DDL(_sentencia).execute_if(dialect="postgresql"),
+    )
+for _sentencia in BUSQUEDA_DDL_SQLITE:
+    event.listen(
+        BlogPost.__table__,
+        "after_create",
+        DDL(_sentencia).execute_if(dialect="sqlite"),
+    )
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import SQLModel, Field, Index
+
+
+class MensajeCorreo(SQLModel, table=True):
+    """Contenido de un envío (p. ej. un post para los suscriptores)."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Sin límite: el asunto es el título del post, que tampoco lo tiene
+    asunto: str
+    html: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class EnvioCorreo(SQLModel, table=True):
+    """
+    Cola de salida: una fila por destinatario de un MensajeCorreo. El worker
+    toma las filas pendientes cuyo proximo_intento ya pasó.
+    """
+
+    __table_args__ = (
+        Index("ix_envio_correo_pendientes", "estado", "proximo_intento"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    mensaje_id: int = Field(foreign_key="mensajecorreo.id", index=True)
+    destinatario: str = Field(max_length=254)
+    # pendiente | enviado | fallido
+    estado: str = Field(default="pendiente", max_length=16)
+    intentos: int = Field(default=0)
+    proximo_intento: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    ultimo_error: Optional[str] = Field(default=None, max_length=500)
+    enviado_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -3,7 +3,7 @@
 from datetime import date, datetime, timezone
 from typing import List, Optional
 from sqlmodel import Field, JSON, Relationship, SQLModel
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +26,9 @@ class Personal(SQLModel, table=True):
 
 
 class Publicacion(SQLModel, table=True):
+    # Índice del orden de paginación por cursor (año, id)
+    __table_args__ = (Index("ix_publicacion_anio_id", "anio", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     titulo: str
     cita_formateada: Optional[str] = None
@@ -41,6 +44,24 @@ class Publicacion(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class PublicacionAutor(SQLModel, table=True):
+    """
+    Autores internos (Personal) de cada publicación, derivado de
+    Publicacion.authors para poder filtrar por autor con un índice.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_publicacionautor_personal_publicacion", "personal_id", "publicacion_id"
+        ),
+    )
+
+    publicacion_id: int = Field(
+        foreign_key="publicacion.id", primary_key=True, ondelete="CASCADE"
+    )
+    personal_id: int = Field(foreign_key="personal.id", primary_key=True)
+
+
 class Proyecto(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     nombre: str
@@ -138,6 +159,22 @@ class Archivo(SQLModel, table=True):
     ruta: str
     tipo: Optional[str]
     tamano: Optional[int]
+    sha256: Optional[str] = Field(default=None, index=True, max_length=64)
+    # Variantes precomprimidas guardadas junto al original ("br,gzip")
+    codificaciones: Optional[str] = Field(default=None, max_length=32)
     fecha_subida: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class SesionSubida(SQLModel, table=True):
+    """Subida reanudable en curso: el archivo se escribe por fragmentos."""
+
+    id: str = Field(primary_key=True, max_length=32)
+    nombre: str
+    tipo: Optional[str]
+    tamano: int
+    recibido: int = Field(default=0)
+    ruta: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
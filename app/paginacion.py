@@ -0,0 +1,131 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+En lugar de OFFSET, que obliga a la base a recorrer y descartar todas las
+filas anteriores, cada página continúa a partir de los valores de orden de la
+última fila de la anterior: `WHERE (fecha, id) < (:fecha, :id)` sobre un
+índice, con costo constante sin importar la profundidad.
+
+El cursor es opaco para el cliente (JSON en base64url) y se devuelve en los
+encabezados `X-Next-Cursor` y `Link: <...>; rel="next"` cuando la página está
+completa. El modo offset se mantiene por compatibilidad.
+"""
+
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import DateTime, and_, false, or_
+
+# Columnas de orden, de la más significativa a la menos: (columna, descendente).
+# La última debe ser única (el id) para que el orden sea total.
+Orden = Sequence[Tuple[Any, bool]]
+
+
+def _nullable(columna) -> bool:
+    return bool(getattr(columna.expression, "nullable", False))
+
+
+def _es_fecha(columna) -> bool:
+    # TypeDecorator (p. ej. el UTCDateTime de SQLModel) envuelve a DateTime
+    tipo = getattr(columna.type, "impl", columna.type)
+    return isinstance(tipo, DateTime)
+
+
+def _serializar(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def codificar_cursor(fila, orden: Orden) -> str:
+    valores = [_serializar(getattr(fila, columna.key)) for columna, _ in orden]
+    datos = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, orden: Orden) -> List[Any]:
+    """Valores de orden del cursor. 400 si no corresponde a este listado."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(orden):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v)
+            if v is not None and _es_fecha(columna)
+            else v
+            for v, (columna, _) in zip(valores, orden)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
+
+
+def _posterior(columna, descendente: bool, valor):
+    """Filas que van después de `valor` en esta columna (NULL al final)."""
+    if valor is None:
+        return false()
+    condicion = columna < valor if descendente else columna > valor
+    if _nullable(columna):
+        condicion = or_(condicion, columna.is_(None))
+    return condicion
+
+
+def _igual(columna, valor):
+    return columna.is_(None) if valor is None else columna == valor
+
+
+def paginar(
+    query,
+    orden: Orden,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
+    """
+    Ordena la consulta por `orden` y aplica la página pedida: la que sigue al
+    cursor si se indica, o la de `offset` en caso contrario.
+    """
+    query = query.order_by(
+        *[
+            (columna.desc() if descendente else columna.asc()).nulls_last()
+            if _nullable(columna)
+            else (columna.desc() if descendente else columna.asc())
+            for columna, descendente in orden
+        ]
+    )
+    if cursor:
+        valores = decodificar_cursor(cursor, orden)
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condiciones = []
+        for i, (columna, descendente) in enumerate(orden):
+            previas = [_igual(c, v) for (c, _), v in zip(orden[:i], valores)]
+            condiciones.append(
+                and_(*previas, _posterior(columna, descendente, valores[i]))
+            )
+        return query.where(or_(*condiciones)).limit(limit)
+    return query.offset(offset).limit(limit)
+
+
+def siguiente_cursor(filas: Sequence, orden: Orden, limit: int) -> Optional[str]:
+    """Cursor de la página siguiente, o None si esta fue la última."""
+    if not filas or len(filas) < limit:
+        return None
+    return codificar_cursor(filas[-1], orden)
+
+
+def agregar_enlace(
+    request: Request, response: Response, filas: Sequence, orden: Orden, limit: int
+) -> None:
+    """Agrega X-Next-Cursor y Link rel="next" si hay página siguiente."""
+    cursor = siguiente_cursor(filas, orden, limit)
+    if cursor is None:
+        return
+    url = request.url.remove_query_params(["offset", "skip"]).include_query_params(
+        cursor=cursor
+    )
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{url}>; rel="next"'
@@ -0,0 +1,100 @@
+"""
+Enrutamiento de lecturas a réplicas de la base de datos.
+
+Las peticiones GET/HEAD de los endpoints que usan `get_read_session` se
+reparten entre las réplicas (round-robin). Una réplica que no responde se
+saltea durante REPLICA_RETRY_SECONDS y, si no queda ninguna, se lee del
+primario. Tras una escritura el cliente recibe una cookie que, mientras dure
+el retraso de replicación esperado, envía sus lecturas al primario para que
+vea sus propios cambios.
+"""
+
+import os
+import time
+import logging
+import itertools
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import db as app_db
+
+logger = logging.getLogger(__name__)
+
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+
+# Debe superar el retraso de replicación habitual
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "10"))
+REPLICA_RETRY_SECONDS = float(os.environ.get("REPLICA_RETRY_SECONDS", "30"))
+COOKIE_PRIMARIO = "leer_primario"
+
+_turno = itertools.count()
+# Índice de réplica -> momento (monotonic) hasta el que se considera caída
+_caidas: Dict[int, float] = {}
+
+
+def lectura_en_primario(request: Request) -> bool:
+    """Indica si el cliente escribió hace poco y debe leer del primario."""
+    try:
+        return float(request.cookies.get(COOKIE_PRIMARIO, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def abrir_sesion_replica() -> Optional[AsyncSession]:
+    """
+    Sesión ya conectada a la siguiente réplica disponible, o None si no hay
+    réplicas configuradas o ninguna responde.
+    """
+    fabricas = app_db.replica_session_factories
+    if not fabricas:
+        return None
+
+    inicio = next(_turno)
+    for i in range(len(fabricas)):
+        indice = (inicio + i) % len(fabricas)
+        if _caidas.get(indice, 0) > time.monotonic():
+            continue
+        session = fabricas[indice]()
+        try:
+            # Conecta ya para poder caer al primario antes de ejecutar el endpoint
+            await session.connection()
+        except Exception as e:
+            logger.warning(f"Réplica {indice} no disponible: {e}")
+            _caidas[indice] = time.monotonic() + REPLICA_RETRY_SECONDS
+            await session.close()
+            continue
+        _caidas.pop(indice, None)
+        return session
+    return None
+
+
+class StickyPrimarioMiddleware:
+    """Marca con una cookie a los clientes que acaban de escribir."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in METODOS_LECTURA
+            or not app_db.replica_session_factories
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                hasta = int(time.time()) + REPLICA_STICKY_SECONDS
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{COOKIE_PRIMARIO}={hasta}; Max-Age={REPLICA_STICKY_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,154 @@
+"""
+Lista de tokens revocados (logout) consultada en cada petición autenticada.
+
+Las revocaciones se guardan en la tabla TokenRevocado y cada worker mantiene
+en memoria:
+  - un filtro de Bloom, que responde "seguro que no" para casi todos los
+    tokens con unas pocas operaciones sobre un bytearray de tamaño fijo;
+  - el conjunto exacto de jti revocados vigentes, que confirma los positivos
+    del filtro (un falso positivo nunca rechaza un token válido).
+
+Comprobar un token no consulta la base. Cada REVOCATION_REFRESH_SECONDS el
+worker trae solo las filas nuevas: las de id mayor al último visto y, además,
+las creadas en los últimos REVOCATION_OVERLAP_SECONDS antes del refresco
+anterior. El solapamiento cubre los ids que se hacen visibles fuera de orden
+(en Postgres el id se asigna antes del commit: una transacción con id menor
+puede confirmarse después de otra con id mayor); volver a agregar un jti ya
+conocido no cambia nada. Cada REVOCATION_REBUILD_SECONDS recarga las vigentes
+y reconstruye el filtro para descartar las revocaciones de tokens ya
+vencidos. Una revocación hecha en otro worker se aplica, como mucho, tras un
+intervalo de refresco.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models import TokenRevocado
+
+REVOCATION_REFRESH_SECONDS = float(os.environ.get("REVOCATION_REFRESH_SECONDS", "5"))
+REVOCATION_REBUILD_SECONDS = float(
+    os.environ.get("REVOCATION_REBUILD_SECONDS", "3600")
+)
+# 2^20 bits = 128 KiB: con 7 funciones de hash, ~1 % de falsos positivos
+# hasta unas 100.000 revocaciones vigentes
+# Ventana que se vuelve a leer en cada refresco (mayor que la duración de la
+# transacción de un logout)
+REVOCATION_OVERLAP_SECONDS = float(
+    os.environ.get("REVOCATION_OVERLAP_SECONDS", "60")
+)
+REVOCATION_BLOOM_BITS = int(os.environ.get("REVOCATION_BLOOM_BITS", str(1 << 20)))
+REVOCATION_BLOOM_HASHES = 7
+
+
+class FiltroBloom:
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._datos = bytearray((bits + 7) // 8)
+
+    def _posiciones(self, valor: str) -> Iterable[int]:
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de dos
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def agregar(self, valor: str) -> None:
+        for posicion in self._posiciones(valor):
+            self._datos[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, valor: str) -> bool:
+        return all(
+            self._datos[posicion >> 3] & (1 << (posicion & 7))
+            for posicion in self._posiciones(valor)
+        )
+
+
+class _Estado:
+    def __init__(self):
+        self.filtro = FiltroBloom(REVOCATION_BLOOM_BITS, REVOCATION_BLOOM_HASHES)
+        self.revocados: Set[str] = set()
+        self.ultimo_id = 0
+        # Momento (reloj de pared) en que empezó la última lectura
+        self.ultima_lectura: Optional[datetime] = None
+        self.proximo_refresco = 0.0
+        self.proxima_reconstruccion = 0.0
+
+
+_estado = _Estado()
+_lock = asyncio.Lock()
+
+
+def revocado(jti: str) -> bool:
+    """Indica si el token fue revocado, según el estado en memoria."""
+    return jti in _estado.filtro and jti in _estado.revocados
+
+
+def _agregar(estado: _Estado, jti: str) -> None:
+    estado.filtro.agregar(jti)
+    estado.revocados.add(jti)
+
+
+async def actualizar(db: AsyncSession) -> None:
+    """
+    Trae las revocaciones nuevas si venció el intervalo de refresco. Si otra
+    petición ya está actualizando, sigue con el estado actual sin esperar.
+    """
+    global _estado
+    ahora = time.monotonic()
+    if ahora < _estado.proximo_refresco or _lock.locked():
+        return
+    async with _lock:
+        lectura = datetime.now(timezone.utc)
+        if ahora >= _estado.proxima_reconstruccion:
+            # Estado nuevo desde cero; se publica al terminar de cargarlo
+            estado = _Estado()
+            estado.proxima_reconstruccion = ahora + REVOCATION_REBUILD_SECONDS
+            query = select(TokenRevocado.id, TokenRevocado.jti).where(
+                TokenRevocado.expira > lectura
+            )
+        else:
+            estado = _estado
+            desde = estado.ultima_lectura - timedelta(
+                seconds=REVOCATION_OVERLAP_SECONDS
+            )
+            query = select(TokenRevocado.id, TokenRevocado.jti).where(
+                or_(
+                    TokenRevocado.id > estado.ultimo_id,
+                    TokenRevocado.created_at >= desde,
+                )
+            )
+        result = await db.execute(query.order_by(TokenRevocado.id))
+        for id_, jti in result.all():
+            _agregar(estado, jti)
+            estado.ultimo_id = max(estado.ultimo_id, id_)
+        estado.ultima_lectura = lectura
+        estado.proximo_refresco = ahora + REVOCATION_REFRESH_SECONDS
+        _estado = estado
+
+
+async def revocar(
+    db: AsyncSession, jti: str, expira: datetime, admin_id: Optional[int] = None
+) -> None:
+    """Revoca el token en la base y, de inmediato, en este worker."""
+    existente = await db.execute(
+        select(TokenRevocado.id).where(TokenRevocado.jti == jti)
+    )
+    if existente.first() is None:
+        db.add(TokenRevocado(jti=jti, expira=expira, admin_id=admin_id))
+        # Las revocaciones de tokens ya vencidos no se necesitan más
+        await db.execute(
+            delete(TokenRevocado).where(
+                TokenRevocado.expira < datetime.now(timezone.utc)
+            )
+        )
+        await db.commit()
+    _agregar(_estado, jti)
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+    UploadFile,
+    File,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.deps import get_async_session
+from app.deps import get_async_session, get_read_session
 from app.services import academico_service as svc
 from app.services import archivos_service
 from app.schemas.academico import (
@@ -17,6 +26,8 @@ from app.schemas.academico import (
     RequisitoUpdate,
 )
 from app.routes.utils import not_found
+from app import paginacion
+from app.cache_respuestas import cachear
 from fastapi import Depends
 from app.deps import get_current_admin
 
@@ -43,16 +54,25 @@ async def create_carrera(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/carreras", response_model=List[CarreraRead])
+@router.get(
+    "/carreras", response_model=List[CarreraRead], dependencies=[cachear("carrera")]
+)
 async def read_all_carreras(
-    offset: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Obtener lista paginada de carreras"""
-    return await svc.listar_carreras(db, offset, limit)
+    carreras = await svc.listar_carreras(db, offset, limit, cursor)
+    paginacion.agregar_enlace(request, response, carreras, svc.ORDEN_CARRERAS, limit)
+    return carreras
 
 
 @router.get("/carreras/{carrera_id}", response_model=CarreraRead)
-async def read_carrera(carrera_id: int, db: AsyncSession = Depends(get_async_session)):
+async def read_carrera(carrera_id: int, db: AsyncSession = Depends(get_read_session)):
     """Obtener una carrera por su ID"""
     carrera = await svc.obtener_carrera(db, carrera_id)
 
@@ -145,19 +165,26 @@ async def create_materia(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/materias", response_model=List[MateriaRead])
+@router.get(
+    "/materias", response_model=List[MateriaRead], dependencies=[cachear("materia")]
+)
 async def read_all_materias(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
     carrera_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_async_session),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Obtener lista paginada de materias"""
-    return await svc.listar_materias(db, offset, limit, carrera_id)
+    materias = await svc.listar_materias(db, offset, limit, carrera_id, cursor)
+    paginacion.agregar_enlace(request, response, materias, svc.ORDEN_MATERIAS, limit)
+    return materias
 
 
 @router.get("/materias/{materia_id}", response_model=MateriaRead)
-async def read_materia(materia_id: int, db: AsyncSession = Depends(get_async_session)):
+async def read_materia(materia_id: int, db: AsyncSession = Depends(get_read_session)):
     """Obtener una materia por su ID"""
     materia = await svc.obtener_materia(db, materia_id)
 
@@ -291,7 +318,7 @@ async def create_requisito(
 
 @router.get("/requisitos", response_model=List[RequisitoRead])
 async def read_all_requisitos(
-    materia_id: Optional[int] = None, db: AsyncSession = Depends(get_async_session)
+    materia_id: Optional[int] = None, db: AsyncSession = Depends(get_read_session)
 ):
     """Obtener lista de requisitos, opcionalmente filtrados por materia"""
     return await svc.listar_requisitos(db, materia_id)
@@ -299,7 +326,7 @@ async def read_all_requisitos(
 
 @router.get("/requisitos/{requisito_id}", response_model=RequisitoRead)
 async def read_requisito(
-    requisito_id: int, db: AsyncSession = Depends(get_async_session)
+    requisito_id: int, db: AsyncSession = Depends(get_read_session)
 ):
     """Obtener un requisito por su ID"""
     requisito = await svc.obtener_requisito(db, requisito_id)
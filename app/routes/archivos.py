@@ -4,24 +4,40 @@ Rutas para la gestión de archivos.
 
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
+    Query,
+    Request,
     UploadFile,
     File,
     HTTPException,
     status,
 )
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from typing import List
+from typing import List, Optional
 
-from app.storage import local_repo
 from app.models.models import Archivo
 from app.db import get_session
-from app.services import archivos_service
+from app.services import (
+    academico_service,
+    archivos_service,
+    compresion_service,
+    imagenes_service,
+)
 from app.deps import get_current_admin
+from app.schemas.archivos import SesionSubidaCreate, SesionSubidaRead
+from app.routes.utils import not_found
+from app.routes import cache_http
+from app import paginacion
+from app.storage.multipart_stream import ArchivoMultipart
 
 router = APIRouter(prefix="/archivos", tags=["Archivos"])
 
+# Cantidad máxima de archivos por descarga ZIP
+MAX_ARCHIVOS_ZIP = 200
+
 ADMIN = Depends(get_current_admin)
 
 
@@ -30,27 +46,47 @@ ADMIN = Depends(get_current_admin)
     status_code=status.HTTP_201_CREATED,
     response_model=Archivo,
     dependencies=[ADMIN],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
 )
 async def upload_file(
-    file: UploadFile = File(...), db: AsyncSession = Depends(get_session)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_session),
 ):
     """
     Sube un archivo al servidor y lo registra en la base de datos.
+    El cuerpo multipart se procesa a medida que llega, sin volcarlo antes a un
+    temporal: el archivo se escribe, mide y hashea en una sola pasada.
+    Los archivos de texto se precomprimen en segundo plano.
     """
-    if not file or not file.filename:
+    archivo = await ArchivoMultipart(request, "file").abrir()
+
+    if not archivo.filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se ha proporcionado un archivo válido",
         )
 
-    ruta_guardado = None
-
     try:
         # Guardar el archivo físicamente y crear registro en la base de datos
-        archivo_db = await archivos_service.guardar_archivo(db=db, file=file)
+        archivo_db = await archivos_service.guardar_stream(
+            db, archivo.chunks(), archivo.filename, archivo.content_type
+        )
+        background_tasks.add_task(compresion_service.precomprimir, archivo_db.id)
         return archivo_db
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
@@ -60,28 +96,236 @@ async def upload_file(
         )
 
 
+@router.post(
+    "/uploads",
+    status_code=status.HTTP_201_CREATED,
+    response_model=SesionSubidaRead,
+    dependencies=[ADMIN],
+)
+async def create_upload_session(
+    data: SesionSubidaCreate, db: AsyncSession = Depends(get_session)
+):
+    """
+    Inicia una subida reanudable. El archivo se envía luego por fragmentos
+    con PUT /archivos/uploads/{id}?offset=N y se confirma con
+    POST /archivos/uploads/{id}/completar.
+    """
+    return await archivos_service.crear_sesion_subida(db, data.model_dump())
+
+
+@router.get(
+    "/uploads/{upload_id}", response_model=SesionSubidaRead, dependencies=[ADMIN]
+)
+async def read_upload_session(upload_id: str, db: AsyncSession = Depends(get_session)):
+    """
+    Estado de una subida reanudable: `recibido` indica desde dónde continuar.
+    """
+    sesion = await archivos_service.obtener_sesion_subida(db, upload_id)
+
+    if not sesion:
+        not_found("Subida")
+
+    return sesion
+
+
+@router.put(
+    "/uploads/{upload_id}", response_model=SesionSubidaRead, dependencies=[ADMIN]
+)
+async def upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Recibe un fragmento (cuerpo binario crudo) y lo escribe en `offset`.
+    """
+    sesion = await archivos_service.recibir_fragmento(
+        db, upload_id, offset, request.stream()
+    )
+
+    if not sesion:
+        not_found("Subida")
+
+    return sesion
+
+
+@router.post(
+    "/uploads/{upload_id}/completar",
+    status_code=status.HTTP_201_CREATED,
+    response_model=Archivo,
+    dependencies=[ADMIN],
+)
+async def complete_upload_session(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Confirma una subida reanudable completa y la registra como Archivo.
+    """
+    archivo = await archivos_service.completar_sesion_subida(db, upload_id)
+
+    if not archivo:
+        not_found("Subida")
+
+    background_tasks.add_task(compresion_service.precomprimir, archivo.id)
+    return archivo
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[ADMIN],
+)
+async def cancel_upload_session(
+    upload_id: str, db: AsyncSession = Depends(get_session)
+):
+    """
+    Cancela una subida reanudable y descarta lo recibido.
+    """
+    sesion = await archivos_service.cancelar_sesion_subida(db, upload_id)
+
+    if not sesion:
+        not_found("Subida")
+
+    return None
+
+
 @router.get("/download/{file_id}")
-async def download_file(file_id: int, db: AsyncSession = Depends(get_session)):
+async def download_file(
+    file_id: int, request: Request, db: AsyncSession = Depends(get_session)
+):
     """
     Descarga un archivo por su ID.
-    Utiliza el servicio para obtener la información del archivo y local_repo para servirlo.
+    Utiliza el servicio para obtener la información del archivo y el backend de
+    almacenamiento para servirlo.
+    Soporta descargas parciales mediante el header Range (206 Partial Content)
+    y peticiones condicionales (If-None-Match / If-Modified-Since / If-Range).
+    """
+    archivo = await archivos_service.obtener_archivo(db=db, aid=file_id)
+    if not archivo:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    # Los rangos se sirven siempre sobre la representación sin comprimir
+    rango = cache_http.rango_vigente(request, archivo)
+    codificacion = None
+    if rango is None:
+        codificacion = cache_http.elegir_codificacion(
+            request, compresion_service.codificaciones(archivo)
+        )
+
+    # Se responde 304 sin tocar el almacenamiento
+    if cache_http.no_modificado(request, archivo, codificacion):
+        return cache_http.respuesta_no_modificado(archivo, codificacion)
+
+    ruta = archivo.ruta
+    if codificacion:
+        ruta = compresion_service.ruta_variante(archivo.ruta, codificacion)
+
+    # Según el backend: StreamingResponse, FileResponse o redirección a S3
+    return await archivos_service.abrir_archivo(
+        ruta, rango, headers=cache_http.headers_validacion(archivo, codificacion)
+    )
+
+
+@router.get("/zip")
+async def download_zip(
+    ids: Optional[List[int]] = Query(None),
+    carrera_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Descarga varios archivos en un único ZIP generado en streaming: los
+    indicados en `ids`, o los programas de las materias de `carrera_id`.
+    Los formatos ya comprimidos se guardan sin volver a comprimir.
+    """
+    if bool(ids) == (carrera_id is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se debe indicar ids o carrera_id",
+        )
+
+    if ids:
+        if len(set(ids)) > MAX_ARCHIVOS_ZIP:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Se pueden descargar hasta {MAX_ARCHIVOS_ZIP} archivos",
+            )
+        archivos = await archivos_service.archivos_por_ids(db, ids)
+        if len(archivos) != len(set(ids)):
+            not_found("Archivo")
+        nombrados = [(archivo.nombre, archivo) for archivo in archivos]
+        nombre_zip = "archivos.zip"
+    else:
+        if not await academico_service.obtener_carrera(db, carrera_id):
+            not_found("Carrera")
+        nombrados = await archivos_service.programas_de_carrera(db, carrera_id)
+        nombre_zip = f"programas-carrera-{carrera_id}.zip"
+
+    return StreamingResponse(
+        await archivos_service.zip_archivos(nombrados),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{nombre_zip}"'},
+    )
+
+
+@router.get("/imagen/{file_id}")
+async def download_image_variant(
+    file_id: int,
+    request: Request,
+    ancho: int = 640,
+    formato: str = "webp",
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Descarga una variante de una imagen con ancho limitado y recodificada
+    (WebP o JPEG). Se genera la primera vez que se pide y luego se sirve desde
+    el almacén de variantes con cache de larga duración.
     """
     archivo = await archivos_service.obtener_archivo(db=db, aid=file_id)
     if not archivo:
         raise HTTPException(status_code=404, detail="Archivo no encontrado")
 
-    # local_repo.abrir ahora es asíncrono y devuelve StreamingResponse
-    return await local_repo.abrir(archivo.ruta)
+    imagenes_service.validar_transformacion(archivo, ancho, formato)
+    nombre = imagenes_service.nombre_variante(archivo, ancho, formato)
+    headers = {
+        "ETag": f'"{nombre}"',
+        "Cache-Control": imagenes_service.CACHE_CONTROL_VARIANTE,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and cache_http.coincide_etag(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    ruta = await imagenes_service.obtener_variante(archivo, ancho, formato)
+    return FileResponse(
+        ruta,
+        media_type=imagenes_service.FORMATOS_VARIANTE[formato],
+        headers=headers,
+    )
 
 
 @router.get("/files/", response_model=List[Archivo])
 async def list_files(
-    skip: int = 0, limit: int = 10, db: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_session),
 ):
     """
     Lista todos los archivos almacenados.
+
+    Admite paginación por offset (`skip`) o por cursor: si la página está
+    completa, `X-Next-Cursor` y `Link` indican cómo pedir la siguiente.
     """
-    archivos = await archivos_service.listar_archivos(db=db, offset=skip, limit=limit)
+    archivos = await archivos_service.listar_archivos(
+        db=db, offset=skip, limit=limit, cursor=cursor
+    )
+    paginacion.agregar_enlace(
+        request, response, archivos, archivos_service.ORDEN_ARCHIVOS, limit
+    )
     return archivos
 
 
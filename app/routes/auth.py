@@ -1,18 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps import get_async_session
-from app.schemas.auth import LoginRequest, TokenResponse
-from app.services.auth_service import authenticate_admin
+from app import limite_login
+from app.deps import get_async_session, get_current_admin
+from app.models import Admin
+from app.schemas.auth import LoginRequest, PasswordChangeRequest, TokenResponse
+from app.security import verify_password_async
+from app.services.auth_service import (
+    authenticate_admin,
+    cambiar_password,
+    emitir_token,
+    revocar_token,
+)
 import asyncio
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_session)):
+async def login(
+    data: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_session)
+):
+    # Antes de bcrypt: un intento rechazado no consume CPU
+    await limite_login.verificar(db, request, data.username)
     token = await authenticate_admin(db, data.username, data.password)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas"
         )
+    await limite_login.login_correcto(db, data.username)
     return {"access_token": token, "token_type": "bearer"}
+
+
+@router.post("/password", response_model=TokenResponse)
+async def change_password(
+    data: PasswordChangeRequest,
+    admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Cambia la contraseña; los tokens anteriores dejan de ser válidos."""
+    if not await verify_password_async(data.current_password, admin.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas"
+        )
+    admin = await cambiar_password(db, admin.id, data.new_password)  # type: ignore
+    if admin is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido"
+        )
+    return {"access_token": emitir_token(admin), "token_type": "bearer"}
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(get_current_admin)],
+)
+async def logout(
+    authorization: str = Header(...), db: AsyncSession = Depends(get_async_session)
+):
+    """Revoca el token usado en la petición."""
+    token = authorization.removeprefix("Bearer ").strip()
+    if not await revocar_token(db, token):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token sin jti: no se puede revocar",
+        )
@@ -1,20 +1,22 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from sqlmodel import select
-from sqlalchemy import text
 
-from app.deps import get_async_session
+from app.deps import get_async_session, get_read_session
 from app.services import blog_service as svc
+from app.services import busqueda_service
 from app.schemas.blog import (
+    BlogPostBusqueda,
     BlogPostCreate,
     BlogPostRead,
     BlogPostUpdate,
+    TagRead,
 )
 from app.routes.utils import not_found
+from app import paginacion
+from app.cache_respuestas import cachear
 from app.models.blog import BlogPost
-from app.services.email_service import send_html
-from app.services.subscriber_service import list_emails
 from fastapi import Depends
 from app.deps import get_current_admin
 
@@ -31,38 +33,37 @@ router = APIRouter(prefix="/blog", tags=["Blog"])
 )
 async def create_blog_post(
     post: BlogPostCreate,
-    background: BackgroundTasks,
     db: AsyncSession = Depends(get_async_session),
 ):
-    """Crear un nuevo post en el blog"""
+    """Crear un nuevo post en el blog (si está publicado, encola la newsletter)"""
     try:
         nuevo_post = await svc.crear_post(db, post.model_dump())
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-
-    # Si el post está marcado como publicado → notificar
-    if nuevo_post.publicado:
-        emails = await list_emails(db)
-        for e in emails:
-            background.add_task(send_html, e, nuevo_post.titulo, nuevo_post.contenido)
-
     return nuevo_post
 
 
-@router.get("/posts", response_model=List[BlogPostRead])
+@router.get(
+    "/posts", response_model=List[BlogPostRead], dependencies=[cachear("blogpost")]
+)
 async def read_all_blog_posts(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
     tag: Optional[str] = None,
     solo_publicados: bool = False,
-    db: AsyncSession = Depends(get_async_session),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_session),
 ):
     """Obtener lista paginada de posts de blog"""
-    return await svc.listar_posts(db, offset, limit, tag, solo_publicados)
+    posts = await svc.listar_posts(db, offset, limit, tag, solo_publicados, cursor)
+    paginacion.agregar_enlace(request, response, posts, svc.ORDEN_POSTS, limit)
+    return posts
 
 
 @router.get("/posts/{post_id}", response_model=BlogPostRead)
-async def read_blog_post(post_id: int, db: AsyncSession = Depends(get_async_session)):
+async def read_blog_post(post_id: int, db: AsyncSession = Depends(get_read_session)):
     """Obtener un post de blog por su ID"""
     post = await svc.obtener_post(db, post_id)
 
@@ -130,33 +131,56 @@ async def delete_blog_post(post_id: int, db: AsyncSession = Depends(get_async_se
     return None
 
 
-@router.get("/posts/search/{term}", response_model=List[BlogPostRead])
+@router.get("/posts/search/{term}", response_model=List[BlogPostBusqueda])
 async def search_blog_posts(
     term: str,
     offset: int = 0,
     limit: int = 100,
     solo_publicados: bool = False,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    """Buscar posts de blog por término"""
-    return await svc.buscar_posts(db, term, offset, limit, solo_publicados)
+    """
+    Buscar posts de blog por término (texto completo, sin distinguir tildes),
+    ordenados por relevancia y con un fragmento resaltado de cada uno.
+    """
+    resultados = await busqueda_service.buscar_posts(
+        db, term, offset, limit, solo_publicados
+    )
+    return [
+        BlogPostBusqueda(
+            **BlogPostRead.model_validate(r.post).model_dump(),
+            relevancia=r.relevancia,
+            fragmento=r.fragmento,
+        )
+        for r in resultados
+    ]
 
 
 @router.get("/posts/categoria/{categoria}", response_model=List[BlogPostRead])
 async def buscar_blogposts_por_categoria(
-    categoria: str, db: AsyncSession = Depends(get_async_session)
+    categoria: str,
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_session),
 ):
-    """Buscar posts de blog por categoría (tag)"""
-    # Use a raw SQL text filter for LIKE
-    result = await db.execute(
-        select(BlogPost).where(text(f"tags LIKE '%{categoria}%'"))
-    )
-    return result.scalars().all()
+    """Buscar posts de blog por categoría (tag exacto, sin distinguir mayúsculas)"""
+    posts = await svc.listar_posts(db, offset, limit, tag=categoria, cursor=cursor)
+    paginacion.agregar_enlace(request, response, posts, svc.ORDEN_POSTS, limit)
+    return posts
+
+
+@router.get("/tags", response_model=List[TagRead])
+async def read_tags(db: AsyncSession = Depends(get_read_session)):
+    """Tags en uso con la cantidad de posts publicados de cada uno"""
+    return await svc.listar_tags(db)
 
 
 @router.get("/posts/autor/{autor}", response_model=List[BlogPostRead])
 async def buscar_blogposts_por_autor(
-    autor: str, db: AsyncSession = Depends(get_async_session)
+    autor: str, db: AsyncSession = Depends(get_read_session)
 ):
     """Buscar posts de blog por autor"""
     result = await db.execute(select(BlogPost).where(BlogPost.autor == autor))
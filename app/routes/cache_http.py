@@ -0,0 +1,176 @@
+"""
+Validadores HTTP (ETag / Last-Modified) y políticas de Cache-Control para las
+descargas de archivos.
+"""
+
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.models.models import Archivo
+
+# Políticas por defecto, de la más específica a la más general
+DEFAULT_CACHE_CONTROL = (
+    "image/*=public, max-age=604800;"
+    "application/pdf=public, max-age=86400;"
+    "*=no-cache"
+)
+
+
+def parsear_politicas(valor: str) -> List[Tuple[str, str]]:
+    """
+    Interpreta políticas con el formato "tipo/*=directivas;tipo=directivas".
+
+    Las directivas de Cache-Control llevan comas, por eso las reglas se
+    separan con punto y coma.
+    """
+    politicas = []
+    for regla in valor.split(";"):
+        patron, _, directivas = regla.partition("=")
+        if patron.strip() and directivas.strip():
+            politicas.append((patron.strip().lower(), directivas.strip()))
+    return politicas
+
+
+CACHE_CONTROL_POLICIES = parsear_politicas(
+    os.environ.get("CACHE_CONTROL_POLICIES", DEFAULT_CACHE_CONTROL)
+)
+
+
+def politica_cache(tipo: Optional[str]) -> Optional[str]:
+    """Cache-Control a aplicar según el tipo MIME (primera regla que coincide)."""
+    tipo = (tipo or "application/octet-stream").split(";")[0].strip().lower()
+    for patron, directivas in CACHE_CONTROL_POLICIES:
+        if fnmatch(tipo, patron):
+            return directivas
+    return None
+
+
+def _fecha_utc(fecha: datetime) -> datetime:
+    # SQLite devuelve fechas sin zona horaria: se guardan siempre en UTC
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def etag_archivo(archivo: Archivo, codificacion: Optional[str] = None) -> str:
+    """
+    ETag fuerte: el SHA-256 almacenado, o tamaño + fecha de modificación.
+    Cada variante precomprimida es otra representación y lleva su sufijo.
+    """
+    if archivo.sha256:
+        valor = archivo.sha256
+    else:
+        modificado = int(_fecha_utc(archivo.updated_at).timestamp())
+        valor = f"{archivo.tamano or 0:x}-{modificado:x}"
+    return f'"{valor}-{codificacion}"' if codificacion else f'"{valor}"'
+
+
+def headers_validacion(
+    archivo: Archivo, codificacion: Optional[str] = None
+) -> Dict[str, str]:
+    """Headers ETag, Last-Modified y Cache-Control de un archivo."""
+    headers = {
+        "ETag": etag_archivo(archivo, codificacion),
+        "Last-Modified": format_datetime(_fecha_utc(archivo.updated_at), usegmt=True),
+    }
+    cache_control = politica_cache(archivo.tipo)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if archivo.codificaciones:
+        # La respuesta depende de Accept-Encoding, también la sin comprimir
+        headers["Vary"] = "Accept-Encoding"
+    if codificacion:
+        headers["Content-Encoding"] = codificacion
+    return headers
+
+
+def elegir_codificacion(request: Request, disponibles: List[str]) -> Optional[str]:
+    """
+    Variante precomprimida aceptable según Accept-Encoding, respetando los
+    valores q; ante empate se usa el orden de `disponibles`. None = identity.
+    """
+    aceptadas: Dict[str, float] = {}
+    for parte in request.headers.get("accept-encoding", "").split(","):
+        nombre, _, parametros = parte.partition(";")
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        aceptadas[nombre] = q
+
+    mejor, mejor_q = None, 0.0
+    for codificacion in disponibles:
+        q = aceptadas.get(codificacion, aceptadas.get("*", 0.0))
+        if q > mejor_q:
+            mejor, mejor_q = codificacion, q
+    return mejor
+
+
+def _parsear_fecha(valor: Optional[str]) -> Optional[datetime]:
+    if not valor:
+        return None
+    try:
+        return _fecha_utc(parsedate_to_datetime(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def coincide_etag(valor: str, etag: str) -> bool:
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    candidatos = [v.strip().removeprefix("W/") for v in valor.split(",")]
+    return "*" in candidatos or etag.removeprefix("W/") in candidatos
+
+
+def no_modificado(
+    request: Request, archivo: Archivo, codificacion: Optional[str] = None
+) -> bool:
+    """
+    Indica si la petición condicional puede responderse con 304.
+
+    If-None-Match tiene precedencia sobre If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return coincide_etag(if_none_match, etag_archivo(archivo, codificacion))
+
+    desde = _parsear_fecha(request.headers.get("if-modified-since"))
+    return desde is not None and _fecha_utc(archivo.updated_at) <= desde
+
+
+def rango_vigente(request: Request, archivo: Archivo) -> Optional[str]:
+    """
+    Header Range a aplicar, descartándolo si If-Range no coincide con la
+    versión actual del archivo.
+    """
+    rango = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if rango is None or if_range is None:
+        return rango
+
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range requiere comparación fuerte
+        return rango if if_range == etag_archivo(archivo) else None
+
+    fecha = _parsear_fecha(if_range)
+    return rango if fecha is not None and fecha == _fecha_utc(archivo.updated_at) else None
+
+
+def respuesta_no_modificado(
+    archivo: Archivo, codificacion: Optional[str] = None
+) -> Response:
+    headers = headers_validacion(archivo, codificacion)
+    # Un 304 no lleva cuerpo ni, por lo tanto, codificación
+    headers.pop("Content-Encoding", None)
+    return Response(status_code=304, headers=headers)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, update, delete
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from app.deps import get_async_session, get_current_admin
+from app.deps import get_async_session, get_current_admin, get_read_session
 from app.models.models import (
     Equipamiento,
     Actividad,
@@ -19,6 +19,9 @@ from app.schemas.equipamiento import (
     EquipamientoActividadRead,
 )
 from app.routes.utils import not_found
+from app.services import equipamiento_service
+from app import paginacion
+from app.cache_respuestas import cachear, invalidar
 
 router = APIRouter(prefix="/equipamiento", tags=["Equipamiento"])
 
@@ -42,25 +45,38 @@ async def create_equipamiento(
     session.add(nuevo_equipamiento)
     await session.commit()
     await session.refresh(nuevo_equipamiento)
+    invalidar("equipamiento")
     return nuevo_equipamiento
 
 
-@router.get("/", response_model=List[EquipamientoRead])
+@router.get(
+    "/", response_model=List[EquipamientoRead], dependencies=[cachear("equipamiento")]
+)
 async def read_all_equipamiento(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
-    session: AsyncSession = Depends(get_async_session),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
 ):
     """Obtener lista paginada de equipamiento"""
-    query = select(Equipamiento).offset(offset).limit(limit)
-    result = await session.execute(query)
-    equipamiento_list = result.scalars().all()
+    equipamiento_list = await equipamiento_service.listar_equipamientos(
+        session, offset, limit, cursor
+    )
+    paginacion.agregar_enlace(
+        request,
+        response,
+        equipamiento_list,
+        equipamiento_service.ORDEN_EQUIPAMIENTO,
+        limit,
+    )
     return equipamiento_list
 
 
 @router.get("/{equipamiento_id}", response_model=EquipamientoRead)
 async def read_equipamiento(
-    equipamiento_id: int, session: AsyncSession = Depends(get_async_session)
+    equipamiento_id: int, session: AsyncSession = Depends(get_read_session)
 ):
     """Obtener un equipamiento por su ID"""
     query = select(Equipamiento).where(Equipamiento.id == equipamiento_id)
@@ -99,6 +115,7 @@ async def update_equipamiento(
     session.add(equipamiento)
     await session.commit()
     await session.refresh(equipamiento)
+    invalidar("equipamiento")
 
     return equipamiento
 
@@ -128,6 +145,7 @@ async def partial_update_equipamiento(
     session.add(equipamiento)
     await session.commit()
     await session.refresh(equipamiento)
+    invalidar("equipamiento")
 
     return equipamiento
 
@@ -168,6 +186,7 @@ async def delete_equipamiento(
 
     await session.delete(equipamiento)
     await session.commit()
+    invalidar("equipamiento")
 
     return equipamiento
 
@@ -176,7 +195,7 @@ async def delete_equipamiento(
     "/{equipamiento_id}/actividades", response_model=List[EquipamientoActividadRead]
 )
 async def read_equipamiento_actividades(
-    equipamiento_id: int, session: AsyncSession = Depends(get_async_session)
+    equipamiento_id: int, session: AsyncSession = Depends(get_read_session)
 ):
     """Obtener actividades vinculadas a un equipamiento"""
     # Verificar que el equipamiento existe
@@ -200,7 +219,7 @@ async def read_equipamiento_actividades(
 
 @router.get("/{equipamiento_id}/servicios", response_model=List[dict])
 async def read_equipamiento_servicios(
-    equipamiento_id: int, session: AsyncSession = Depends(get_async_session)
+    equipamiento_id: int, session: AsyncSession = Depends(get_read_session)
 ):
     """Obtener servicios vinculados a un equipamiento"""
     # Verificar que el equipamiento existe
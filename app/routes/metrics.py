@@ -0,0 +1,45 @@
+"""
+Endpoint de métricas para Prometheus.
+
+Las métricas exponen detalles internos (pool de conexiones, rutas, cachés),
+por lo que el acceso se niega por defecto:
+  - con METRICS_TOKEN, el scraper debe enviar "Authorization: Bearer <token>";
+  - sin token, /metrics responde 404 salvo que METRICS_PUBLIC=true, pensado
+    solo para despliegues donde el puerto de la API no es accesible desde
+    fuera de la red interna.
+"""
+
+import hmac
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+
+router = APIRouter(tags=["Métricas"])
+
+# Si se define, el scraper debe enviar "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# Sin token, expone /metrics sin autenticación (solo para redes internas)
+METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics(request: Request):
+    """Métricas del proceso actual en el formato de texto de Prometheus."""
+    if METRICS_TOKEN:
+        esperado = f"Bearer {METRICS_TOKEN}"
+        recibido = request.headers.get("authorization", "")
+        if not hmac.compare_digest(recibido.encode(), esperado.encode()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    elif not METRICS_PUBLIC:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return PlainTextResponse(
+        metrics.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
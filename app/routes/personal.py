@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from app.deps import get_async_session, get_current_admin
 from app.services import personal_service as svc
@@ -12,6 +12,7 @@ from app.schemas.personal import (
     PersonalProyectoCreate,
 )
 from app.routes.utils import not_found
+from app import paginacion
 
 router = APIRouter(prefix="/personal", tags=["Personal"])
 
@@ -36,10 +37,17 @@ async def create_personal(
 
 @router.get("/", response_model=List[PersonalRead])
 async def read_all_personal(
-    offset: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session),
 ):
     """Obtener lista paginada de personal"""
-    return await svc.listar_personal(db, offset, limit)
+    personal = await svc.listar_personal(db, offset, limit, cursor)
+    paginacion.agregar_enlace(request, response, personal, svc.ORDEN_PERSONAL, limit)
+    return personal
 
 
 @router.get("/{personal_id}", response_model=PersonalRead)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
@@ -12,6 +12,7 @@ from app.schemas.proyectos import (
     ProyectoPersonalRead,
 )
 from app.routes.utils import not_found
+from app import paginacion
 
 router = APIRouter(prefix="/proyectos", tags=["Proyectos"])
 
@@ -36,10 +37,17 @@ async def create_proyecto(
 
 @router.get("/", response_model=List[ProyectoRead])
 async def read_all_proyectos(
-    offset: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    response: Response,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session),
 ):
     """Obtener lista paginada de proyectos"""
-    return await svc.listar_proyectos(db, offset, limit)
+    proyectos = await svc.listar_proyectos(db, offset, limit, cursor)
+    paginacion.agregar_enlace(request, response, proyectos, svc.ORDEN_PROYECTOS, limit)
+    return proyectos
 
 
 @router.get("/{proyecto_id}", response_model=ProyectoRead)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, update, delete
 from typing import List, Optional
 from datetime import datetime, timezone
 
-from app.deps import get_async_session, get_current_admin
+from app.deps import get_async_session, get_current_admin, get_read_session
 from app.models.models import Publicacion, Personal
 from app.schemas.publicaciones import (
     PublicacionCreate,
@@ -12,7 +12,10 @@ from app.schemas.publicaciones import (
     PublicacionUpdate,
     Author,
 )
-from app.routes.utils import not_found
+from app.routes.utils import ids_not_found, not_found
+from app.services import publicaciones_service
+from app.services.utils import ids_inexistentes
+from app import paginacion
 
 router = APIRouter(prefix="/publicaciones", tags=["Publicaciones"])
 
@@ -21,17 +24,11 @@ ADMIN = Depends(get_current_admin)
 
 async def validate_authors(authors: List[Author], session: AsyncSession):
     """Validar que los personal_id referenciados existen"""
-    for author in authors:
-        if author.personal_id:
-            query = select(Personal).where(Personal.id == author.personal_id)
-            result = await session.execute(query)
-            personal = result.scalar_one_or_none()
-
-            if not personal:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Personal con ID {author.personal_id} no encontrado",
-                )
+    faltantes = await ids_inexistentes(
+        session, Personal.id, (a.personal_id for a in authors if a.personal_id)
+    )
+    if faltantes:
+        ids_not_found("Personal", faltantes)
 
 
 @router.post(
@@ -57,6 +54,8 @@ async def create_publicacion(
     )
 
     session.add(nueva_publicacion)
+    await session.flush()
+    await publicaciones_service.sincronizar_autores(session, nueva_publicacion)
     await session.commit()
     await session.refresh(nueva_publicacion)
 
@@ -65,42 +64,33 @@ async def create_publicacion(
 
 @router.get("/", response_model=List[PublicacionRead])
 async def read_all_publicaciones(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
     anio: Optional[int] = None,
     estado: Optional[str] = None,
     autor_id: Optional[int] = None,
-    session: AsyncSession = Depends(get_async_session),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
 ):
     """Obtener lista paginada de publicaciones con filtros opcionales"""
-    query = select(Publicacion)
-
-    # Aplicar filtros si se proporcionan
-    if anio:
-        query = query.where(Publicacion.anio == anio)
-
-    if estado:
-        query = query.where(Publicacion.estado == estado)
-
-    # Filtrar por autor_id (esto requiere procesamiento adicional)
-    results = await session.execute(query.offset(offset).limit(limit))
-    publicaciones = results.scalars().all()
-
-    # Si se especifició autor_id, filtrar manualmente las publicaciones
-    if autor_id:
-        filtered_publicaciones = []
-        for pub in publicaciones:
-            authors = pub.authors  # Now a list, not a JSON string
-            if any(author.get("personal_id") == autor_id for author in authors):
-                filtered_publicaciones.append(pub)
-        return filtered_publicaciones
-
+    publicaciones = await publicaciones_service.listar_publicaciones(
+        session, offset, limit, anio, estado, cursor, autor_id
+    )
+    paginacion.agregar_enlace(
+        request,
+        response,
+        publicaciones,
+        publicaciones_service.ORDEN_PUBLICACIONES,
+        limit,
+    )
     return publicaciones
 
 
 @router.get("/{publicacion_id}", response_model=PublicacionRead)
 async def read_publicacion(
-    publicacion_id: int, session: AsyncSession = Depends(get_async_session)
+    publicacion_id: int, session: AsyncSession = Depends(get_read_session)
 ):
     """Obtener una publicación por su ID"""
     query = select(Publicacion).where(Publicacion.id == publicacion_id)
@@ -140,6 +130,8 @@ async def update_publicacion(
     publicacion.updated_at = datetime.now(timezone.utc)
 
     session.add(publicacion)
+    if "authors" in publicacion_data:
+        await publicaciones_service.sincronizar_autores(session, publicacion)
     await session.commit()
     await session.refresh(publicacion)
 
@@ -173,6 +165,8 @@ async def partial_update_publicacion(
     publicacion.updated_at = datetime.now(timezone.utc)
 
     session.add(publicacion)
+    if "authors" in publicacion_data:
+        await publicaciones_service.sincronizar_autores(session, publicacion)
     await session.commit()
     await session.refresh(publicacion)
 
@@ -194,8 +188,7 @@ async def delete_publicacion(
         not_found("Publicación")
         return  # Add return to satisfy type checker, though not_found raises HTTPException
 
-    await session.delete(publicacion)
-    await session.commit()
+    await publicaciones_service.borrar_publicacion(session, publicacion_id)
 
     # Para devolver la entidad eliminada
     return publicacion
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, update, delete
 from typing import List, Optional
@@ -8,7 +8,11 @@ from app.deps import get_async_session, get_current_admin
 from app.models.models import Servicio, Equipamiento, ServicioEquipamiento
 from app.schemas.servicios import ServicioCreate, ServicioRead, ServicioUpdate
 from app.schemas.equipamiento import EquipamientoRead
-from app.routes.utils import not_found
+from app.routes.utils import ids_not_found, not_found
+from app.services import servicios_service
+from app.services.utils import ids_inexistentes
+from app import paginacion
+from app.cache_respuestas import cachear, invalidar
 
 router = APIRouter(prefix="/servicios", tags=["Servicios"])
 
@@ -32,16 +36,11 @@ async def create_servicio(
             detail="Se requiere al menos un equipamiento asignado al servicio",
         )
 
-    for equip_id in servicio.equipamiento_ids:
-        equip_query = select(Equipamiento).where(Equipamiento.id == equip_id)
-        equip_result = await session.execute(equip_query)
-        equipamiento = equip_result.scalar_one_or_none()
-
-        if not equipamiento:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Equipamiento con ID {equip_id} no encontrado",
-            )
+    faltantes = await ids_inexistentes(
+        session, Equipamiento.id, servicio.equipamiento_ids
+    )
+    if faltantes:
+        ids_not_found("Equipamiento", faltantes)
 
     # Crear el servicio
     now = datetime.now(timezone.utc)
@@ -69,20 +68,27 @@ async def create_servicio(
 
     await session.commit()
     await session.refresh(nuevo_servicio)
+    invalidar("servicio")
 
     return nuevo_servicio
 
 
-@router.get("/", response_model=List[ServicioRead])
+@router.get(
+    "/", response_model=List[ServicioRead], dependencies=[cachear("servicio")]
+)
 async def read_all_servicios(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_async_session),
 ):
     """Obtener lista paginada de servicios"""
-    query = select(Servicio).offset(offset).limit(limit)
-    result = await session.execute(query)
-    servicios = result.scalars().all()
+    servicios = await servicios_service.listar_servicios(session, offset, limit, cursor)
+    paginacion.agregar_enlace(
+        request, response, servicios, servicios_service.ORDEN_SERVICIOS, limit
+    )
     return servicios
 
 
@@ -129,16 +135,11 @@ async def update_servicio(
     # Si se proporciona equipamiento_ids, reemplazar el conjunto de equipamiento
     if servicio_update.equipamiento_ids is not None:
         # Verificar que los nuevos equipamientos existen
-        for equip_id in servicio_update.equipamiento_ids:
-            equip_query = select(Equipamiento).where(Equipamiento.id == equip_id)
-            equip_result = await session.execute(equip_query)
-            equipamiento = equip_result.scalar_one_or_none()
-
-            if not equipamiento:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Equipamiento con ID {equip_id} no encontrado",
-                )
+        faltantes = await ids_inexistentes(
+            session, Equipamiento.id, servicio_update.equipamiento_ids
+        )
+        if faltantes:
+            ids_not_found("Equipamiento", faltantes)
 
         # Eliminar todas las relaciones existentes
         delete_query = delete(ServicioEquipamiento).where(
@@ -156,6 +157,7 @@ async def update_servicio(
 
     await session.commit()
     await session.refresh(servicio)
+    invalidar("servicio")
 
     return servicio
 
@@ -187,16 +189,11 @@ async def partial_update_servicio(
     # Si se proporciona equipamiento_ids, reemplazar el conjunto de equipamiento
     if servicio_update.equipamiento_ids is not None:
         # Verificar que los nuevos equipamientos existen
-        for equip_id in servicio_update.equipamiento_ids:
-            equip_query = select(Equipamiento).where(Equipamiento.id == equip_id)
-            equip_result = await session.execute(equip_query)
-            equipamiento = equip_result.scalar_one_or_none()
-
-            if not equipamiento:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Equipamiento con ID {equip_id} no encontrado",
-                )
+        faltantes = await ids_inexistentes(
+            session, Equipamiento.id, servicio_update.equipamiento_ids
+        )
+        if faltantes:
+            ids_not_found("Equipamiento", faltantes)
 
         # Eliminar todas las relaciones existentes
         delete_query = delete(ServicioEquipamiento).where(
@@ -214,6 +211,7 @@ async def partial_update_servicio(
 
     await session.commit()
     await session.refresh(servicio)
+    invalidar("servicio")
 
     return servicio
 
@@ -240,6 +238,7 @@ async def delete_servicio(
     # Eliminar el servicio
     await session.delete(servicio)
     await session.commit()
+    invalidar("servicio")
 
     return servicio
 
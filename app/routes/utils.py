@@ -1,5 +1,16 @@
+from typing import List
+
 from fastapi import HTTPException
 
 
 def not_found(name: str):
     raise HTTPException(status_code=404, detail=f"{name} no encontrado")
+
+
+def ids_not_found(name: str, ids: List[int]):
+    """404 que informa todos los ids inexistentes a la vez."""
+    etiqueta = "ID" if len(ids) == 1 else "IDs"
+    raise HTTPException(
+        status_code=404,
+        detail=f"{name} con {etiqueta} {', '.join(str(i) for i in ids)} no encontrado",
+    )
@@ -50,3 +50,7 @@ from app.schemas.blog import (
     BlogPostRead,
     BlogPostUpdate,
 )
+from app.schemas.archivos import (
+    SesionSubidaCreate,
+    SesionSubidaRead,
+)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import ConfigDict, BaseModel, Field
+
+
+# Esquemas para subidas reanudables
+class SesionSubidaCreate(BaseModel):
+    nombre: str
+    tamano: int = Field(gt=0)
+    tipo: Optional[str] = None
+
+
+class SesionSubidaRead(BaseModel):
+    id: str
+    nombre: str
+    tipo: Optional[str] = None
+    tamano: int
+    recibido: int
+    created_at: datetime
+    updated_at: datetime
+    model_config = ConfigDict(from_attributes=True)
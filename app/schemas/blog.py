@@ -28,6 +28,11 @@ class BlogPostRead(BlogPostBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BlogPostBusqueda(BlogPostRead):
+    relevancia: float
+    fragmento: Optional[str] = None  # Extracto con coincidencias entre <mark>
+
+
 class BlogPostUpdate(BaseModel):
     titulo: Optional[str] = None
     contenido: Optional[str] = None
@@ -36,3 +41,9 @@ class BlogPostUpdate(BaseModel):
     autor: Optional[str] = None
     tags: Optional[str] = None
     publicado: Optional[bool] = None
+
+
+class TagRead(BaseModel):
+    nombre: str
+    cantidad_posts: int
+    model_config = ConfigDict(from_attributes=True)
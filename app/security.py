@@ -1,5 +1,9 @@
+import os
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -9,6 +13,14 @@ ACCESS_TTL = timedelta(hours=3)
 
 pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Hilos dedicados a bcrypt: cada hash ocupa un núcleo durante decenas o
+# cientos de ms. bcrypt libera el GIL, así que el event loop sigue atendiendo
+# otras peticiones, y el límite evita que una ráfaga de logins acapare la CPU
+# (o el threadpool por defecto que usan las rutas síncronas)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+
+_pool_hash: Optional[ThreadPoolExecutor] = None
+
 
 def hash_password(password: str) -> str:
     return pwd_ctx.hash(password)
@@ -18,10 +30,41 @@ def verify_password(password: str, hash_: str) -> bool:
     return pwd_ctx.verify(password, hash_)
 
 
+def _obtener_pool() -> ThreadPoolExecutor:
+    global _pool_hash
+    if _pool_hash is None:
+        _pool_hash = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _pool_hash
+
+
+def cerrar_pool() -> None:
+    """Detiene los hilos de hashing (al apagar la aplicación)."""
+    global _pool_hash
+    if _pool_hash is not None:
+        _pool_hash.shutdown(cancel_futures=True)
+        _pool_hash = None
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password fuera del event loop; espera turno si el pool está lleno."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_obtener_pool(), hash_password, password)
+
+
+async def verify_password_async(password: str, hash_: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _obtener_pool(), verify_password, password, hash_
+    )
+
+
 def create_access_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + ACCESS_TTL
-    to_encode.update({"exp": expire})
+    # jti identifica al token para poder revocarlo (app/revocacion.py)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
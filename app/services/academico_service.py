@@ -5,6 +5,8 @@ from typing import List, Optional, Dict, Any
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.academico import Carrera, Materia, Requisito, TipoRequisito
+from app.cache_respuestas import invalidar
+from app.paginacion import paginar
 
 
 # Carrera Services
@@ -13,14 +15,21 @@ async def crear_carrera(db: AsyncSession, data: Dict[str, Any]) -> Carrera:
     obj = Carrera(**data, created_at=now, updated_at=now)
     db.add(obj)
     await db.commit()
+    invalidar("carrera")
     await db.refresh(obj)
     return obj
 
 
+ORDEN_CARRERAS = ((Carrera.id, False),)
+
+
 async def listar_carreras(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Carrera]:
-    query = select(Carrera).offset(offset).limit(limit)
+    query = paginar(select(Carrera), ORDEN_CARRERAS, offset, limit, cursor)
     result = await db.execute(query)
     return list(result.scalars().all())
 
@@ -46,6 +55,7 @@ async def actualizar_carrera(
     carrera.updated_at = datetime.now(timezone.utc)
     db.add(carrera)
     await db.commit()
+    invalidar("carrera")
     await db.refresh(carrera)
     return carrera
 
@@ -58,6 +68,7 @@ async def borrar_carrera(db: AsyncSession, cid: int) -> Optional[Carrera]:
 
     await db.delete(carrera)
     await db.commit()
+    invalidar("carrera", "materia")
     return carrera
 
 
@@ -77,25 +88,25 @@ async def crear_materia(db: AsyncSession, data: Dict[str, Any]) -> Materia:
     obj = Materia(**data, created_at=now, updated_at=now)
     db.add(obj)
     await db.commit()
+    invalidar("materia")
     await db.refresh(obj)
     return obj
 
 
+ORDEN_MATERIAS = ((Materia.id, False),)
+
+
 async def listar_materias(
     db: AsyncSession,
     offset: int = 0,
     limit: int = 100,
     carrera_id: Optional[int] = None,
+    cursor: Optional[str] = None,
 ) -> List[Materia]:
+    query = select(Materia)
     if carrera_id:
-        query = (
-            select(Materia)
-            .where(Materia.id_carrera == carrera_id)
-            .offset(offset)
-            .limit(limit)
-        )
-    else:
-        query = select(Materia).offset(offset).limit(limit)
+        query = query.where(Materia.id_carrera == carrera_id)
+    query = paginar(query, ORDEN_MATERIAS, offset, limit, cursor)
 
     result = await db.execute(query)
     return list(result.scalars().all())
@@ -131,6 +142,7 @@ async def actualizar_materia(
     materia.updated_at = datetime.now(timezone.utc)
     db.add(materia)
     await db.commit()
+    invalidar("materia")
     await db.refresh(materia)
     return materia
 
@@ -153,6 +165,7 @@ async def borrar_materia(db: AsyncSession, mid: int) -> Optional[Materia]:
 
     await db.delete(materia)
     await db.commit()
+    invalidar("materia")
     return materia
 
 
@@ -1,56 +1,303 @@
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
-from fastapi import UploadFile, HTTPException
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+import uuid
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+from fastapi import UploadFile, HTTPException, status
 from sqlmodel import select
+from sqlalchemy import delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.models import Archivo
-from app.storage import local_repo
+from app.models.models import Archivo, SesionSubida
+from app.models.academico import Materia
+from app.paginacion import paginar
+from app.services import compresion_service, imagenes_service
+from app.storage import local_repo, zip_stream
+from app.storage.backend import obtener_backend
+
+logger = logging.getLogger(__name__)
 
 # Tamaño máximo de archivo: 50 MB
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB en bytes
 
+# Una subida reanudable sin actividad durante este tiempo se considera
+# abandonada: la reconciliación elimina la sesión y su archivo parcial
+UPLOAD_SESSION_TTL_SECONDS = float(
+    os.environ.get("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600))
+)
+
 
 # CREATE
 async def guardar_archivo(db: AsyncSession, file: UploadFile) -> Archivo:
-    # Verificar tamaño del archivo
-    file.file.seek(0, 2)  # Mover al final del archivo
-    file_size = file.file.tell()  # Obtener posición (tamaño)
-    file.file.seek(0)  # Volver al inicio
-
-    if file_size > MAX_FILE_SIZE:
-        raise ValueError(
-            f"El archivo excede el tamaño máximo permitido de 50 MB. Tamaño actual: {file_size / (1024 * 1024):.2f} MB"
-        )
+    return await guardar_stream(
+        db, local_repo.iterar_upload(file), file.filename, file.content_type
+    )
 
-    # Guardar archivo en el sistema de archivos
-    filename = await local_repo.guardar(file)
 
-    # Determinar tipo de archivo
-    file_type = file.content_type if file.content_type else "application/octet-stream"
+async def guardar_stream(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    nombre: Optional[str],
+    tipo: Optional[str] = None,
+) -> Archivo:
+    """
+    Guarda un archivo recorriendo su contenido una única vez: el tamaño máximo
+    se controla mientras llega (413 apenas se supera), y tamaño, SHA-256 y
+    tipo MIME se obtienen en la misma pasada.
+
+    Con almacenamiento direccionado por contenido, varios registros Archivo
+    con el mismo SHA-256 comparten el mismo blob en disco.
+    """
+    resultado = await local_repo.guardar_stream(chunks, nombre, tipo, MAX_FILE_SIZE)
+
+    if local_repo.CONTENT_ADDRESSED_STORAGE:
+        ruta = local_repo.ruta_por_contenido(resultado.sha256, nombre)
+    else:
+        ruta = local_repo.nueva_ruta(nombre)
 
     # Crear registro en la base de datos
     now = datetime.now(timezone.utc)
     archivo = Archivo(
-        nombre=file.filename or filename,
-        ruta=filename,
-        tipo=file_type,
-        tamano=file_size,
+        nombre=nombre or ruta,
+        ruta=ruta,
+        tipo=resultado.tipo,
+        tamano=resultado.tamano,
+        sha256=resultado.sha256,
         fecha_subida=now,
         created_at=now,
         updated_at=now,
     )
 
+    try:
+        db.add(archivo)
+        await db.commit()
+        await db.refresh(archivo)
+    except Exception:
+        await local_repo.eliminar(resultado.ruta_temporal)
+        raise
+
+    # El archivo se consolida después del commit: un borrado concurrente del
+    # último registro que referenciaba el mismo blob ya no puede dejar este
+    # sin archivo
+    try:
+        await obtener_backend().guardar(resultado.ruta_temporal, ruta, archivo.tipo)
+    except Exception:
+        await db.delete(archivo)
+        await db.commit()
+        await local_repo.eliminar(resultado.ruta_temporal)
+        raise
+    return archivo
+
+
+async def contar_referencias(db: AsyncSession, archivo: Archivo) -> int:
+    """Cantidad de registros Archivo que apuntan al mismo blob."""
+    query = (
+        select(func.count())
+        .select_from(Archivo)
+        .where(Archivo.sha256 == archivo.sha256, Archivo.ruta == archivo.ruta)
+    )
+    result = await db.execute(query)
+    return result.scalar_one()
+
+
+# SUBIDAS REANUDABLES
+async def crear_sesion_subida(db: AsyncSession, data: Dict[str, Any]) -> SesionSubida:
+    if data["tamano"] > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail="El archivo excede el tamaño máximo permitido de 50 MB",
+        )
+
+    now = datetime.now(timezone.utc)
+    sesion = SesionSubida(
+        id=uuid.uuid4().hex,
+        nombre=data["nombre"],
+        tipo=data.get("tipo") or "application/octet-stream",
+        tamano=data["tamano"],
+        recibido=0,
+        ruta=local_repo.nueva_ruta(data["nombre"]),
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(sesion)
+    await db.commit()
+    await db.refresh(sesion)
+    return sesion
+
+
+async def obtener_sesion_subida(db: AsyncSession, sid: str) -> Optional[SesionSubida]:
+    query = select(SesionSubida).where(SesionSubida.id == sid)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def recibir_fragmento(
+    db: AsyncSession, sid: str, offset: int, chunks: AsyncIterator[bytes]
+) -> Optional[SesionSubida]:
+    """
+    Escribe un fragmento en la posición `offset`, que debe coincidir con lo ya
+    recibido. Si la conexión se corta, se registra lo que llegó a escribirse
+    para que el cliente pueda retomar desde ahí.
+    """
+    sesion = await obtener_sesion_subida(db, sid)
+
+    if not sesion:
+        return None
+
+    if offset != sesion.recibido:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Offset inválido: se esperaba {sesion.recibido}",
+            headers={"Upload-Offset": str(sesion.recibido)},
+        )
+
+    recibido_anterior = sesion.recibido
+    try:
+        escritos = await local_repo.escribir_fragmento(
+            sesion.ruta, offset, chunks, sesion.tamano - offset
+        )
+        recibido = offset + escritos
+    except Exception:
+        recibido = min(local_repo.tamano_actual(sesion.ruta), sesion.tamano)
+        await _registrar_progreso(db, sesion, recibido_anterior, recibido)
+        raise
+
+    if not await _registrar_progreso(db, sesion, recibido_anterior, recibido):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="La subida fue modificada por otra petición",
+        )
+    await db.refresh(sesion)
+    return sesion
+
+
+async def _registrar_progreso(
+    db: AsyncSession, sesion: SesionSubida, anterior: int, recibido: int
+) -> bool:
+    """Actualiza el offset solo si nadie más lo modificó entretanto."""
+    result = await db.execute(
+        update(SesionSubida)
+        .where(SesionSubida.id == sesion.id, SesionSubida.recibido == anterior)
+        .values(recibido=recibido, updated_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def completar_sesion_subida(db: AsyncSession, sid: str) -> Optional[Archivo]:
+    sesion = await obtener_sesion_subida(db, sid)
+
+    if not sesion:
+        return None
+
+    if sesion.recibido != sesion.tamano:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Subida incompleta: recibidos {sesion.recibido} de {sesion.tamano} bytes",
+            headers={"Upload-Offset": str(sesion.recibido)},
+        )
+
+    ruta = sesion.ruta
+    digest = None
+    if local_repo.CONTENT_ADDRESSED_STORAGE:
+        digest = await local_repo.calcular_sha256(sesion.ruta)
+        ruta = local_repo.ruta_por_contenido(digest, sesion.nombre)
+
+    now = datetime.now(timezone.utc)
+    archivo = Archivo(
+        nombre=sesion.nombre,
+        ruta=ruta,
+        tipo=sesion.tipo,
+        tamano=sesion.tamano,
+        sha256=digest,
+        fecha_subida=now,
+        created_at=now,
+        updated_at=now,
+    )
     db.add(archivo)
     await db.commit()
     await db.refresh(archivo)
+
+    # Como en guardar_stream, el archivo se consolida después del commit; la
+    # sesión se elimina recién cuando el archivo ya está en su lugar, así un
+    # fallo del backend deja la subida disponible para reintentar
+    try:
+        await obtener_backend().guardar(sesion.ruta, ruta, archivo.tipo)
+    except Exception:
+        await db.delete(archivo)
+        await db.commit()
+        raise
+
+    await db.delete(sesion)
+    await db.commit()
     return archivo
 
 
+async def cancelar_sesion_subida(db: AsyncSession, sid: str) -> Optional[SesionSubida]:
+    sesion = await obtener_sesion_subida(db, sid)
+
+    if not sesion:
+        return None
+
+    await db.delete(sesion)
+    await db.commit()
+    await local_repo.eliminar(sesion.ruta)
+    return sesion
+
+
+async def limpiar_sesiones_abandonadas(
+    db: AsyncSession, antiguedad: float = UPLOAD_SESSION_TTL_SECONDS
+) -> Tuple[int, int]:
+    """
+    Elimina las sesiones de subida sin actividad en los últimos `antiguedad`
+    segundos, junto con sus archivos parciales. Devuelve la cantidad de
+    sesiones eliminadas y los bytes liberados.
+    """
+    limite = datetime.now(timezone.utc) - timedelta(seconds=antiguedad)
+    result = await db.execute(
+        select(SesionSubida.id, SesionSubida.ruta).where(
+            SesionSubida.updated_at < limite
+        )
+    )
+    vencidas = result.all()
+    if not vencidas:
+        return 0, 0
+
+    # Solo se borran las que siguen sin actividad al momento de eliminar
+    result = await db.execute(
+        delete(SesionSubida).where(
+            SesionSubida.id.in_([sid for sid, _ in vencidas]),
+            SesionSubida.updated_at < limite,
+        )
+    )
+    await db.commit()
+    if result.rowcount != len(vencidas):
+        restantes = await db.execute(
+            select(SesionSubida.id).where(
+                SesionSubida.id.in_([sid for sid, _ in vencidas])
+            )
+        )
+        activas = set(restantes.scalars().all())
+        vencidas = [(sid, ruta) for sid, ruta in vencidas if sid not in activas]
+
+    liberados = 0
+    for _, ruta in vencidas:
+        liberados += local_repo.tamano_actual(ruta)
+        await local_repo.eliminar(ruta)
+    return len(vencidas), liberados
+
+
+ORDEN_ARCHIVOS = ((Archivo.id, False),)
+
+
 # READ ALL
 async def listar_archivos(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Archivo]:
-    query = select(Archivo).offset(offset).limit(limit)
+    query = paginar(select(Archivo), ORDEN_ARCHIVOS, offset, limit, cursor)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -62,10 +309,78 @@ async def obtener_archivo(db: AsyncSession, aid: int) -> Optional[Archivo]:
     return result.scalar_one_or_none()
 
 
+async def archivos_por_ids(db: AsyncSession, ids: List[int]) -> List[Archivo]:
+    """Archivos con los ids pedidos, en el mismo orden (sin repetidos)."""
+    query = select(Archivo).where(Archivo.id.in_(ids))
+    result = await db.execute(query)
+    por_id = {archivo.id: archivo for archivo in result.scalars().all()}
+    return [por_id[aid] for aid in dict.fromkeys(ids) if aid in por_id]
+
+
+async def programas_de_carrera(
+    db: AsyncSession, carrera_id: int
+) -> List[Tuple[str, Archivo]]:
+    """
+    Programas PDF de las materias de una carrera (vía Materia.programa_pdf_url),
+    con el nombre que llevan dentro del ZIP.
+    """
+    query = (
+        select(Materia, Archivo)
+        .join(Archivo, Archivo.ruta == Materia.programa_pdf_url)
+        .where(Materia.id_carrera == carrera_id)
+        .order_by(Materia.semestre, Materia.codigo, Archivo.id)
+    )
+    result = await db.execute(query)
+
+    programas = []
+    vistas = set()
+    # Con almacenamiento por contenido una ruta puede tener varios registros
+    for materia, archivo in result.all():
+        if materia.id in vistas:
+            continue
+        vistas.add(materia.id)
+        extension = os.path.splitext(archivo.ruta)[1] or ".pdf"
+        programas.append((f"{materia.codigo} - {materia.nombre}{extension}", archivo))
+    return programas
+
+
+async def zip_archivos(nombrados: List[Tuple[str, Archivo]]) -> AsyncIterator[bytes]:
+    """
+    ZIP en streaming con los archivos indicados. Los que no están en el
+    almacenamiento se omiten antes de empezar, ya que una vez enviado el
+    primer byte no se puede informar un error.
+    """
+    backend = obtener_backend()
+    existentes = await asyncio.gather(
+        *[backend.existe(archivo.ruta) for _, archivo in nombrados]
+    )
+    for (_, archivo), existe in zip(nombrados, existentes):
+        if not existe:
+            logger.warning(
+                f"Archivo {archivo.id} omitido del ZIP: no existe {archivo.ruta}"
+            )
+
+    nombrados = [par for par, existe in zip(nombrados, existentes) if existe]
+    nombres = zip_stream.nombres_unicos(nombre for nombre, _ in nombrados)
+    entradas = [
+        zip_stream.EntradaZip(
+            nombre=nombre,
+            ruta=archivo.ruta,
+            tamano=archivo.tamano or 0,
+            tipo=archivo.tipo,
+            modificado=archivo.updated_at,
+        )
+        for nombre, (_, archivo) in zip(nombres, nombrados)
+    ]
+    return zip_stream.generar_zip(entradas, backend)
+
+
 # Abrir archivo
-def abrir_archivo(ruta: str):
-    """Abrir un archivo desde el sistema de archivos"""
-    return local_repo.abrir(ruta)
+def abrir_archivo(
+    ruta: str, rango: Optional[str] = None, headers: Optional[Dict[str, str]] = None
+):
+    """Abrir un archivo desde el backend de almacenamiento configurado"""
+    return obtener_backend().abrir(ruta, rango, headers)
 
 
 # DELETE
@@ -75,13 +390,24 @@ async def borrar_archivo(db: AsyncSession, aid: int) -> None:
     if not archivo:
         return
 
-    # Eliminar archivo del sistema de archivos
-    try:
-        local_repo.eliminar(archivo.ruta)
-    except Exception as e:
-        # Log error pero continuar para eliminar el registro de BD
-        print(f"Error al eliminar archivo físico: {str(e)}")
-
     # Eliminar registro de la base de datos
     await db.delete(archivo)
     await db.commit()
+
+    # Las variantes de imagen son propias de este registro (por id)
+    try:
+        await imagenes_service.eliminar_variantes(archivo)
+    except Exception as e:
+        logger.error(f"Error al eliminar variantes de {archivo.id}: {str(e)}")
+
+    # Un blob compartido solo se elimina cuando no quedan referencias
+    if archivo.sha256 and await contar_referencias(db, archivo) > 0:
+        return
+
+    # Eliminar archivo del almacenamiento, con sus variantes precomprimidas
+    try:
+        await obtener_backend().eliminar(archivo.ruta)
+        await compresion_service.eliminar_variantes(archivo)
+    except Exception as e:
+        # El registro ya no existe; el archivo huérfano se informa en el log
+        logger.error(f"Error al eliminar archivo físico: {str(e)}")
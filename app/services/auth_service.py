@@ -1,11 +1,20 @@
+from datetime import datetime, timezone
+from typing import Optional
 from sqlmodel import Session, select
+from sqlalchemy import delete
+from app import cache_admin, revocacion
 from app.models import Admin
-from app.security import verify_password, hash_password, create_access_token
+from app.security import (
+    create_access_token,
+    decode_token,
+    hash_password_async,
+    verify_password_async,
+)
 import asyncio
 
 
 async def create_admin(db, username: str, password: str):
-    admin = Admin(username=username, password_hash=hash_password(password))
+    admin = Admin(username=username, password_hash=await hash_password_async(password))
     db.add(admin)
     if hasattr(db, "commit") and asyncio.iscoroutinefunction(db.commit):
         await db.commit()
@@ -24,6 +33,52 @@ async def authenticate_admin(db, username: str, password: str) -> str | None:
         admin = result.scalars().first()
     else:
         admin = db.exec(stmt).first()
-    if admin and verify_password(password, admin.password_hash):
-        return create_access_token({"sub": str(admin.id)})
+    if admin and await verify_password_async(password, admin.password_hash):
+        return emitir_token(admin)
     return None
+
+
+def emitir_token(admin: Admin) -> str:
+    return create_access_token({"sub": str(admin.id), "ver": admin.token_version})
+
+
+async def cambiar_password(db, admin_id: int, password: str) -> Optional[Admin]:
+    """
+    Cambia la contraseña e invalida todos los tokens emitidos antes. Devuelve
+    None si el admin ya no existe.
+    """
+    # Se recarga: el admin de get_current_admin puede venir de la caché (y
+    # haber sido eliminado desde otro worker)
+    admin = await db.get(Admin, admin_id)
+    if admin is None:
+        return None
+    admin.password_hash = await hash_password_async(password)
+    admin.token_version += 1
+    db.add(admin)
+    await db.commit()
+    cache_admin.invalidar(admin.id, admin.token_version)  # type: ignore
+    return admin
+
+
+async def eliminar_admin(db, admin_id: int) -> bool:
+    result = await db.execute(delete(Admin).where(Admin.id == admin_id))
+    await db.commit()
+    cache_admin.invalidar(admin_id)
+    return result.rowcount > 0
+
+
+async def revocar_token(db, token: str) -> bool:
+    """
+    Revoca un token (logout). Devuelve False si es anterior a los claims jti
+    y no se puede revocar individualmente.
+    """
+    payload = decode_token(token)
+    if "jti" not in payload:
+        return False
+    await revocacion.revocar(
+        db,
+        payload["jti"],
+        datetime.fromtimestamp(payload["exp"], timezone.utc),
+        int(payload["sub"]),
+    )
+    return True
@@ -1,12 +1,110 @@
 # app/services/blog_service.py
 
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, desc, select, literal
+from sqlalchemy import text, desc, select, literal, delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.sql.expression import true
-from app.models.blog import BlogPost
+from app.models.blog import BlogPost, BlogPostTag, Tag
+from app.cache_respuestas import invalidar
+from app.paginacion import paginar
+from app.services import cola_correo_service
+
+# Más recientes primero; el id desempata posts con la misma fecha
+ORDEN_POSTS = ((BlogPost.fecha_publicacion, True), (BlogPost.id, True))
+
+
+def normalizar_tag(nombre: str) -> str:
+    return " ".join(nombre.split()).lower()
+
+
+def parsear_tags(tags: Optional[str]) -> Dict[str, str]:
+    """Clave normalizada -> nombre, de un texto de tags separados por comas."""
+    resultado: Dict[str, str] = {}
+    for nombre in (tags or "").split(","):
+        nombre = " ".join(nombre.split())[:100]
+        if nombre:
+            resultado.setdefault(normalizar_tag(nombre), nombre)
+    return resultado
+
+
+async def _recontar_tags(db: AsyncSession, tag_ids: Set[int]) -> None:
+    """Recalcula Tag.cantidad_posts (posts publicados) de los tags indicados."""
+    if not tag_ids:
+        return
+    publicados = (
+        select(func.count())
+        .select_from(BlogPostTag)
+        .join(BlogPost, BlogPost.id == BlogPostTag.post_id)
+        .where(BlogPostTag.tag_id == Tag.id, BlogPost.publicado == True)  # type: ignore
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Tag).where(Tag.id.in_(tag_ids)).values(cantidad_posts=publicados)
+    )
+
+
+async def _tags_del_post(db: AsyncSession, post_id: int) -> Set[int]:
+    result = await db.execute(
+        select(BlogPostTag.tag_id).where(BlogPostTag.post_id == post_id)
+    )
+    return set(result.scalars().all())
+
+
+async def sincronizar_tags(db: AsyncSession, post: BlogPost) -> None:
+    """
+    Reemplaza las filas de BlogPostTag según post.tags (creando los tags
+    nuevos) y recalcula los contadores afectados. No hace commit.
+    """
+    anteriores = await _tags_del_post(db, post.id)
+    deseados = parsear_tags(post.tags)
+
+    tag_ids: Set[int] = set()
+    if deseados:
+        # Dos posts simultáneos con el mismo tag nuevo no chocan con la
+        # restricción única de Tag.clave: el segundo INSERT no hace nada
+        dialecto = db.get_bind().dialect.name
+        insertar = pg_insert if dialecto == "postgresql" else sqlite_insert
+        await db.execute(
+            insertar(Tag)
+            .values(
+                [
+                    {"clave": clave, "nombre": nombre, "cantidad_posts": 0}
+                    # Orden fijo: evita interbloqueos entre INSERT concurrentes
+                    for clave, nombre in sorted(deseados.items())
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["clave"])
+        )
+        result = await db.execute(select(Tag.id).where(Tag.clave.in_(deseados)))
+        tag_ids = set(result.scalars().all())
+
+    if anteriores - tag_ids:
+        await db.execute(
+            delete(BlogPostTag).where(
+                BlogPostTag.post_id == post.id,
+                BlogPostTag.tag_id.in_(anteriores - tag_ids),
+            )
+        )
+    db.add_all(
+        BlogPostTag(post_id=post.id, tag_id=tag_id)
+        for tag_id in tag_ids - anteriores
+    )
+    await db.flush()
+    await _recontar_tags(db, anteriores | tag_ids)
+
+
+async def listar_tags(db: AsyncSession) -> List[Tag]:
+    """Tags con al menos un post publicado, de los más usados a los menos."""
+    result = await db.execute(
+        select(Tag)
+        .where(Tag.cantidad_posts > 0)
+        .order_by(Tag.cantidad_posts.desc(), Tag.clave)
+    )
+    return list(result.scalars().all())
 
 
 async def crear_post(db: AsyncSession, data: Dict[str, Any]) -> BlogPost:
@@ -18,7 +116,15 @@ async def crear_post(db: AsyncSession, data: Dict[str, Any]) -> BlogPost:
 
     obj = BlogPost(**data, created_at=now, updated_at=now)
     db.add(obj)
+    await db.flush()
+    await sincronizar_tags(db, obj)
+    # Un post publicado encola la newsletter en la misma transacción: o se
+    # guardan ambos o ninguno. Los envíos los hace el worker de correo
+    # (scripts/enviar_correos.py)
+    if obj.publicado:
+        await cola_correo_service.encolar_newsletter(db, obj.titulo, obj.contenido)
     await db.commit()
+    invalidar("blogpost")
     await db.refresh(obj)
     return obj
 
@@ -29,6 +135,7 @@ async def listar_posts(
     limit: int = 100,
     tag: Optional[str] = None,
     solo_publicados: bool = False,
+    cursor: Optional[str] = None,
 ) -> List[BlogPost]:
     query = select(BlogPost)
 
@@ -36,14 +143,16 @@ async def listar_posts(
         query = query.where(BlogPost.publicado == True)  # type: ignore
 
     if tag:
-        query = query.where(text(f"tags LIKE '%{tag}%'"))
+        # Resuelto por los índices de tag.clave y (tag_id, post_id)
+        query = query.where(
+            BlogPost.id.in_(
+                select(BlogPostTag.post_id)
+                .join(Tag, Tag.id == BlogPostTag.tag_id)
+                .where(Tag.clave == normalizar_tag(tag))
+            )
+        )
 
-    # For ordering, use getattr to get the column
-    query = (
-        query.order_by(getattr(BlogPost, "fecha_publicacion").desc())
-        .offset(offset)
-        .limit(limit)
-    )
+    query = paginar(query, ORDEN_POSTS, offset, limit, cursor)
     result = await db.execute(query)
     return list(result.scalars().all())
 
@@ -68,7 +177,10 @@ async def actualizar_post(
 
     post.updated_at = datetime.now(timezone.utc)
     db.add(post)
+    if "tags" in data or "publicado" in data:
+        await sincronizar_tags(db, post)
     await db.commit()
+    invalidar("blogpost")
     await db.refresh(post)
     return post
 
@@ -79,34 +191,12 @@ async def borrar_post(db: AsyncSession, pid: int) -> Optional[BlogPost]:
     if not post:
         return None
 
+    # Explícito además del ON DELETE CASCADE: SQLite no aplica las FK por defecto
+    tag_ids = await _tags_del_post(db, pid)
+    await db.execute(delete(BlogPostTag).where(BlogPostTag.post_id == pid))
     await db.delete(post)
+    await db.flush()
+    await _recontar_tags(db, tag_ids)
     await db.commit()
+    invalidar("blogpost")
     return post
-
-
-async def buscar_posts(
-    db: AsyncSession,
-    termino: str,
-    offset: int = 0,
-    limit: int = 100,
-    solo_publicados: bool = False,
-) -> List[BlogPost]:
-    query = select(BlogPost)
-
-    if solo_publicados:
-        query = query.where(BlogPost.publicado == True)  # type: ignore
-
-    # Buscar en título, contenido y resumen usando LIKE
-    like_term = f"%{termino}%"
-    query = query.where(
-        text(
-            f"titulo LIKE :like_term OR contenido LIKE :like_term OR resumen LIKE :like_term"
-        )
-    ).params(like_term=like_term)
-    query = (
-        query.order_by(getattr(BlogPost, "fecha_publicacion").desc())
-        .offset(offset)
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    return list(result.scalars().all())
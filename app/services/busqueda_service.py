@@ -0,0 +1,110 @@
+"""
+Búsqueda de texto completo en los posts del blog.
+
+El índice lo mantiene la propia base en cada escritura (ver
+app/models/blog.py):
+  - Postgres: columna generada `busqueda` (tsvector con la configuración
+    `es_unaccent`: español con stemming y sin tildes) e índice GIN. Se ordena
+    por ts_rank y los fragmentos salen de ts_headline.
+  - SQLite: tabla FTS5 `blogpost_fts` (unicode61 sin diacríticos) mantenida
+    por triggers. FTS5 no trae stemmer para español: cada término se busca
+    como prefijo ("agua" encuentra "aguas"). Se ordena por bm25 y los
+    fragmentos salen de snippet().
+
+En ambos casos el título pesa más que el resumen, y este más que el contenido.
+"""
+
+import re
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.blog import BlogPost
+
+MARCA_INICIO = "<mark>"
+MARCA_FIN = "</mark>"
+
+CONFIG_POSTGRES = literal_column("'es_unaccent'::regconfig")
+OPCIONES_HEADLINE = (
+    f"StartSel={MARCA_INICIO}, StopSel={MARCA_FIN}, "
+    "MaxFragments=2, MinWords=8, MaxWords=24, FragmentDelimiter= … "
+)
+
+# Pesos de bm25 por columna de blogpost_fts: titulo, contenido, resumen
+PESOS_SQLITE = (10.0, 1.0, 4.0)
+PALABRAS_FRAGMENTO = 16
+
+
+class ResultadoBusqueda(NamedTuple):
+    post: BlogPost
+    relevancia: float
+    fragmento: Optional[str]
+
+
+def consulta_fts5(termino: str) -> Optional[str]:
+    """
+    Expresión MATCH de FTS5 a partir del texto del usuario: cada palabra como
+    prefijo entre comillas (sin operadores), todas requeridas.
+    """
+    palabras = re.findall(r"\w+", termino)
+    if not palabras:
+        return None
+    return " ".join(f'"{palabra}"*' for palabra in palabras)
+
+
+def _query_postgres(termino: str):
+    consulta = func.websearch_to_tsquery(CONFIG_POSTGRES, termino)
+    vector = literal_column("blogpost.busqueda")
+    rank = func.ts_rank(vector, consulta)
+    return select(
+        BlogPost,
+        rank.label("relevancia"),
+        func.ts_headline(
+            CONFIG_POSTGRES, BlogPost.contenido, consulta, OPCIONES_HEADLINE
+        ).label("fragmento"),
+    ).where(vector.op("@@")(consulta)), rank.desc()
+
+
+def _query_sqlite(consulta: str):
+    fts = table("blogpost_fts", column("rowid"))
+    tabla_fts = literal_column("blogpost_fts")
+    # bm25 devuelve valores negativos: cuanto menor, más relevante
+    rank = func.bm25(tabla_fts, *PESOS_SQLITE)
+    return select(
+        BlogPost,
+        (-rank).label("relevancia"),
+        func.snippet(
+            tabla_fts, -1, MARCA_INICIO, MARCA_FIN, "…", PALABRAS_FRAGMENTO
+        ).label("fragmento"),
+    ).join(fts, fts.c.rowid == BlogPost.id).where(
+        tabla_fts.op("MATCH")(consulta)
+    ), rank.asc()
+
+
+async def buscar_posts(
+    db: AsyncSession,
+    termino: str,
+    offset: int = 0,
+    limit: int = 100,
+    solo_publicados: bool = False,
+) -> List[ResultadoBusqueda]:
+    """Posts que coinciden con `termino`, del más al menos relevante."""
+    if db.get_bind().dialect.name == "postgresql":
+        query, orden = _query_postgres(termino)
+    else:
+        consulta = consulta_fts5(termino)
+        if consulta is None:
+            return []
+        query, orden = _query_sqlite(consulta)
+
+    if solo_publicados:
+        query = query.where(BlogPost.publicado == True)  # type: ignore
+
+    # El id desempata resultados con la misma relevancia
+    query = query.order_by(orden, BlogPost.id.desc()).offset(offset).limit(limit)
+    result = await db.execute(query)
+    return [
+        ResultadoBusqueda(post, float(relevancia), fragmento)
+        for post, relevancia, fragmento in result.all()
+    ]
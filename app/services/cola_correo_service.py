@@ -0,0 +1,228 @@
+"""
+Cola persistente de correos salientes.
+
+Publicar un post solo encola: un MensajeCorreo con el contenido y una fila
+EnvioCorreo por suscriptor, insertadas con un único INSERT ... SELECT. Los
+envíos los hace un worker aparte (scripts/enviar_correos.py), fuera de los
+procesos web, que:
+  - reutiliza conexiones SMTP (PoolSMTP) y envía en paralelo hasta el tamaño
+    del pool;
+  - respeta un límite de mensajes por segundo;
+  - reintenta los errores temporales con backoff exponencial y marca como
+    fallidos los permanentes (5xx) o los que agotan los intentos.
+
+Las filas tomadas por un worker se reservan corriendo su proximo_intento: si
+el worker muere, se retoman al vencer la reserva. En Postgres varios workers
+pueden trabajar a la vez (FOR UPDATE SKIP LOCKED).
+"""
+
+import os
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import aiosmtplib
+from sqlalchemy import insert, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select
+
+from app.models.correo import EnvioCorreo, MensajeCorreo
+from app.models.subscriber import Subscriber
+from app.services.email_service import PoolSMTP, construir_mensaje
+
+logger = logging.getLogger(__name__)
+
+TAMANO_POOL = int(os.getenv("SMTP_POOL_SIZE", "4"))
+# Límite del proveedor; 0 desactiva el límite
+MENSAJES_POR_SEGUNDO = float(os.getenv("SMTP_RATE_PER_SECOND", "10"))
+MAX_INTENTOS = int(os.getenv("MAIL_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = float(os.getenv("MAIL_BACKOFF_SECONDS", "30"))
+BACKOFF_MAX = 3600.0
+TAMANO_LOTE = 100
+# Tiempo que un worker se reserva las filas tomadas
+RESERVA = timedelta(minutes=5)
+
+
+class LimiteTasa:
+    """Espacia las llamadas a `esperar` para no superar `por_segundo`."""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1 / por_segundo if por_segundo > 0 else 0.0
+        self._siguiente = 0.0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._lock:
+            ahora = asyncio.get_running_loop().time()
+            turno = max(ahora, self._siguiente)
+            self._siguiente = turno + self.intervalo
+        if turno > ahora:
+            await asyncio.sleep(turno - ahora)
+
+
+def backoff(intentos: int) -> timedelta:
+    """Espera antes del siguiente intento, exponencial con jitter."""
+    segundos = min(BACKOFF_BASE * 2 ** (intentos - 1), BACKOFF_MAX)
+    return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+
+def es_permanente(error: Exception) -> bool:
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(r.code >= 500 for r in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+async def encolar_newsletter(db: AsyncSession, asunto: str, html: str) -> int:
+    """
+    Encola el mensaje para todos los suscriptores; devuelve cuántos. No hace
+    commit: se confirma en la misma transacción que el post que lo origina.
+    """
+    ahora = datetime.now(timezone.utc)
+    mensaje = MensajeCorreo(asunto=asunto, html=html, created_at=ahora)
+    db.add(mensaje)
+    await db.flush()
+
+    tipo_fecha = EnvioCorreo.__table__.c.proximo_intento.type
+    result = await db.execute(
+        insert(EnvioCorreo).from_select(
+            [
+                "mensaje_id",
+                "destinatario",
+                "estado",
+                "intentos",
+                "proximo_intento",
+                "created_at",
+            ],
+            select(
+                literal(mensaje.id),
+                Subscriber.email,
+                literal("pendiente"),
+                literal(0),
+                literal(ahora, tipo_fecha),
+                literal(ahora, tipo_fecha),
+            ),
+        )
+    )
+    await db.flush()
+    return result.rowcount
+
+
+async def reclamar_lote(
+    db: AsyncSession, tamano: int = TAMANO_LOTE
+) -> List[EnvioCorreo]:
+    """Toma hasta `tamano` envíos vencidos y los reserva para este worker."""
+    ahora = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(EnvioCorreo)
+        .where(
+            EnvioCorreo.estado == "pendiente", EnvioCorreo.proximo_intento <= ahora
+        )
+        .order_by(EnvioCorreo.id)
+        .limit(tamano)
+        .with_for_update(skip_locked=True)
+    )
+    envios = list(result.scalars().all())
+    if envios:
+        await db.execute(
+            update(EnvioCorreo)
+            .where(EnvioCorreo.id.in_([e.id for e in envios]))
+            .values(proximo_intento=ahora + RESERVA)
+        )
+    await db.commit()
+    return envios
+
+
+async def _mensajes(
+    db: AsyncSession, envios: List[EnvioCorreo]
+) -> Dict[int, MensajeCorreo]:
+    ids = {e.mensaje_id for e in envios}
+    result = await db.execute(
+        select(MensajeCorreo).where(MensajeCorreo.id.in_(ids))
+    )
+    return {m.id: m for m in result.scalars().all()}
+
+
+async def _enviar(
+    pool: PoolSMTP, limite: LimiteTasa, envio: EnvioCorreo, mensaje: MensajeCorreo
+) -> Optional[Exception]:
+    await limite.esperar()
+    try:
+        await pool.enviar(
+            construir_mensaje(envio.destinatario, mensaje.asunto, mensaje.html)
+        )
+    except (aiosmtplib.SMTPException, OSError) as e:
+        return e
+    return None
+
+
+async def enviar_lote(
+    db: AsyncSession,
+    pool: PoolSMTP,
+    limite: LimiteTasa,
+    tamano: int = TAMANO_LOTE,
+) -> int:
+    """Envía un lote de la cola y registra el resultado. Devuelve cuántos tomó."""
+    envios = await reclamar_lote(db, tamano)
+    if not envios:
+        return 0
+    mensajes = await _mensajes(db, envios)
+    ahora = datetime.now(timezone.utc)
+
+    # Un envío cuyo mensaje ya no existe no puede hacerse: se da por fallido
+    # sin frenar el resto del lote
+    for envio in envios:
+        if envio.mensaje_id not in mensajes:
+            envio.estado = "fallido"
+            envio.ultimo_error = f"Mensaje {envio.mensaje_id} inexistente"
+            logger.error(f"Envío {envio.id}: mensaje {envio.mensaje_id} inexistente")
+    enviables = [e for e in envios if e.mensaje_id in mensajes]
+
+    errores = await asyncio.gather(
+        *[_enviar(pool, limite, e, mensajes[e.mensaje_id]) for e in enviables]
+    )
+    for envio, error in zip(enviables, errores):
+        if error is None:
+            envio.estado = "enviado"
+            envio.enviado_at = ahora
+            continue
+        envio.intentos += 1
+        envio.ultimo_error = str(error)[:500]
+        if es_permanente(error) or envio.intentos >= MAX_INTENTOS:
+            envio.estado = "fallido"
+            logger.warning(
+                f"Envío {envio.id} a {envio.destinatario} fallido: {error}"
+            )
+        else:
+            envio.proximo_intento = ahora + backoff(envio.intentos)
+    db.add_all(envios)
+    await db.commit()
+    return len(envios)
+
+
+async def ejecutar_worker(
+    session_factory: async_sessionmaker,
+    pool: Optional[PoolSMTP] = None,
+    espera: float = 5.0,
+    una_vez: bool = False,
+) -> None:
+    """
+    Procesa la cola indefinidamente (o hasta vaciarla si `una_vez`),
+    durmiendo `espera` segundos cuando no hay envíos vencidos.
+    """
+    pool = pool or PoolSMTP(TAMANO_POOL)
+    limite = LimiteTasa(MENSAJES_POR_SEGUNDO)
+    try:
+        while True:
+            async with session_factory() as db:
+                tomados = await enviar_lote(db, pool, limite)
+            if tomados:
+                continue
+            if una_vez:
+                break
+            await asyncio.sleep(espera)
+    finally:
+        await pool.cerrar()
@@ -0,0 +1,142 @@
+"""
+Variantes precomprimidas (brotli y gzip) de los archivos de texto.
+
+Se generan una única vez, en segundo plano después de la subida, y se guardan
+junto al original como `<ruta>.br` y `<ruta>.gz`. Las descargas eligen la
+variante según Accept-Encoding sin comprimir nada por petición.
+"""
+
+import os
+import uuid
+import zlib
+import logging
+from typing import List, Optional
+
+import aiofiles
+import brotli
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+
+from app import db as app_db
+from app.models.models import Archivo
+from app.storage import local_repo
+from app.storage.backend import obtener_backend
+
+logger = logging.getLogger(__name__)
+
+TIPOS_COMPRIMIBLES = {
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/geo+json",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+# Por debajo de esto el ahorro no compensa el archivo extra
+MIN_TAMANO_COMPRESION = 1024
+# La variante se descarta si no reduce al menos un 10 %
+MAX_PROPORCION = 0.9
+
+CALIDAD_BROTLI = int(os.environ.get("BROTLI_QUALITY", "11"))
+NIVEL_GZIP = 9
+
+# Codificación -> extensión del archivo hermano, en orden de preferencia
+EXTENSIONES = {"br": ".br", "gzip": ".gz"}
+
+
+def es_comprimible(archivo: Archivo) -> bool:
+    tipo = (archivo.tipo or "").split(";")[0].strip().lower()
+    return (archivo.tamano or 0) >= MIN_TAMANO_COMPRESION and (
+        tipo.startswith("text/") or tipo in TIPOS_COMPRIMIBLES
+    )
+
+
+def ruta_variante(ruta: str, codificacion: str) -> str:
+    return f"{ruta}{EXTENSIONES[codificacion]}"
+
+
+def codificaciones(archivo: Archivo) -> List[str]:
+    """Codificaciones precomprimidas disponibles para un archivo."""
+    return [c for c in (archivo.codificaciones or "").split(",") if c]
+
+
+def _compresor(codificacion: str):
+    if codificacion == "br":
+        compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+        return compresor.process, compresor.finish
+    # wbits 31: formato gzip (cabecera y CRC32)
+    compresor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)
+    return compresor.compress, compresor.flush
+
+
+async def _comprimir(ruta: str, codificacion: str) -> Optional[str]:
+    """Escribe la variante en el staging local y devuelve su ruta temporal."""
+    procesar, finalizar = _compresor(codificacion)
+    ruta_temporal = os.path.join(local_repo.TMP_SUBDIR, f"{uuid.uuid4()}.part")
+    destino = os.path.join(local_repo.UPLOAD_DIR, ruta_temporal)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    try:
+        async with aiofiles.open(destino, "wb") as f:
+            async for chunk in obtener_backend().iterar(ruta):
+                # La compresión es CPU: fuera del event loop
+                await f.write(await run_in_threadpool(procesar, chunk))
+            await f.write(await run_in_threadpool(finalizar))
+    except Exception:
+        await local_repo.eliminar(ruta_temporal)
+        raise
+    return ruta_temporal
+
+
+async def precomprimir(archivo_id: int) -> List[str]:
+    """
+    Genera las variantes precomprimidas de un archivo elegible y las registra
+    en Archivo.codificaciones. Pensado para ejecutarse como tarea en segundo
+    plano: usa su propia sesión (la de la petición ya se cerró cuando corre)
+    y los errores se informan en el log.
+    """
+    async with app_db.async_session_factory() as db:
+        result = await db.execute(select(Archivo).where(Archivo.id == archivo_id))
+        archivo = result.scalar_one_or_none()
+        if archivo is None or not es_comprimible(archivo):
+            return []
+        return await _precomprimir(db, archivo)
+
+
+async def _precomprimir(db: AsyncSession, archivo: Archivo) -> List[str]:
+    generadas = []
+    backend = obtener_backend()
+    for codificacion in EXTENSIONES:
+        try:
+            ruta_temporal = await _comprimir(archivo.ruta, codificacion)
+            tamano = local_repo.tamano_actual(ruta_temporal)
+            if tamano > archivo.tamano * MAX_PROPORCION:
+                await local_repo.eliminar(ruta_temporal)
+                continue
+            await backend.guardar(
+                ruta_temporal,
+                ruta_variante(archivo.ruta, codificacion),
+                archivo.tipo,
+                codificacion=codificacion,
+            )
+            generadas.append(codificacion)
+        except Exception as e:
+            logger.error(f"Error al comprimir {archivo.ruta} ({codificacion}): {e}")
+
+    if generadas:
+        await db.execute(
+            update(Archivo)
+            .where(Archivo.id == archivo.id)
+            .values(codificaciones=",".join(generadas))
+        )
+        await db.commit()
+        logger.info(f"Variantes {generadas} generadas para {archivo.ruta}")
+    return generadas
+
+
+async def eliminar_variantes(archivo: Archivo) -> None:
+    backend = obtener_backend()
+    for codificacion in codificaciones(archivo):
+        await backend.eliminar(ruta_variante(archivo.ruta, codificacion))
@@ -1,25 +1,107 @@
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from email.message import EmailMessage
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
 import aiosmtplib
 
+logger = logging.getLogger(__name__)
+
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASS = os.getenv("SMTP_PASS")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
 FROM_EMAIL = os.getenv("FROM_EMAIL", SMTP_USER or "no-reply@example.com")
 
 
-async def send_html(to: str, subject: str, html: str):
+def construir_mensaje(to: str, subject: str, html: str) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = FROM_EMAIL
     msg["To"] = to
     msg["Subject"] = subject
     msg.set_content(html, subtype="html")
+    return msg
+
+
+async def send_html(to: str, subject: str, html: str):
+    """Envío individual con su propia conexión (para correos sueltos)."""
     await aiosmtplib.send(
-        msg,
+        construir_mensaje(to, subject, html),
         hostname=SMTP_HOST,
         port=SMTP_PORT,
         username=SMTP_USER,
         password=SMTP_PASS,
-        start_tls=True,
+        start_tls=SMTP_STARTTLS,
     )
+
+
+async def conectar_smtp() -> aiosmtplib.SMTP:
+    """Conexión SMTP ya establecida (STARTTLS y login incluidos)."""
+    smtp = aiosmtplib.SMTP(
+        hostname=SMTP_HOST,
+        port=SMTP_PORT,
+        username=SMTP_USER,
+        password=SMTP_PASS,
+        start_tls=SMTP_STARTTLS,
+    )
+    await smtp.connect()
+    return smtp
+
+
+class PoolSMTP:
+    """
+    Conexiones SMTP reutilizables: el handshake (TCP + STARTTLS + login) se
+    paga una vez por conexión y no por mensaje. `tamano` limita además la
+    cantidad de envíos simultáneos.
+    """
+
+    def __init__(
+        self,
+        tamano: int = 4,
+        conectar: Callable[[], Awaitable[aiosmtplib.SMTP]] = conectar_smtp,
+    ):
+        self._conectar = conectar
+        self._semaforo = asyncio.Semaphore(tamano)
+        self._libres: "asyncio.LifoQueue[aiosmtplib.SMTP]" = asyncio.LifoQueue()
+
+    @asynccontextmanager
+    async def conexion(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        async with self._semaforo:
+            smtp: Optional[aiosmtplib.SMTP] = None
+            while smtp is None and not self._libres.empty():
+                candidata = self._libres.get_nowait()
+                if candidata.is_connected:
+                    smtp = candidata
+            if smtp is None:
+                smtp = await self._conectar()
+            try:
+                yield smtp
+            except (
+                aiosmtplib.SMTPResponseException,
+                aiosmtplib.SMTPRecipientsRefused,
+            ):
+                # El servidor rechazó este mensaje; la conexión sigue sana
+                if smtp.is_connected:
+                    self._libres.put_nowait(smtp)
+                raise
+            except BaseException:
+                smtp.close()
+                raise
+            else:
+                self._libres.put_nowait(smtp)
+
+    async def enviar(self, msg: EmailMessage) -> None:
+        async with self.conexion() as smtp:
+            await smtp.send_message(msg)
+
+    async def cerrar(self) -> None:
+        while not self._libres.empty():
+            smtp = self._libres.get_nowait()
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException as e:
+                logger.debug(f"Error al cerrar conexión SMTP: {e}")
+                smtp.close()
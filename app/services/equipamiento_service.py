@@ -3,6 +3,8 @@ from typing import List, Optional, Sequence, Dict, Any
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import Equipamiento, EquipamientoActividad, ServicioEquipamiento
+from app.cache_respuestas import invalidar
+from app.paginacion import paginar
 
 
 # CREATE
@@ -11,15 +13,22 @@ async def crear_equipamiento(db: AsyncSession, data: Dict[str, Any]) -> Equipami
     obj = Equipamiento(**data, created_at=now, updated_at=now)
     db.add(obj)
     await db.commit()
+    invalidar("equipamiento")
     await db.refresh(obj)
     return obj
 
 
+ORDEN_EQUIPAMIENTO = ((Equipamiento.id, False),)
+
+
 # READ ALL
 async def listar_equipamientos(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Equipamiento]:
-    query = select(Equipamiento).offset(offset).limit(limit)
+    query = paginar(select(Equipamiento), ORDEN_EQUIPAMIENTO, offset, limit, cursor)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -47,6 +56,7 @@ async def actualizar_equipamiento(
     equipamiento.updated_at = datetime.now(timezone.utc)
     db.add(equipamiento)
     await db.commit()
+    invalidar("equipamiento")
     await db.refresh(equipamiento)
     return equipamiento
 
@@ -78,6 +88,7 @@ async def borrar_equipamiento(db: AsyncSession, eid: int) -> None:
 
     await db.delete(equipamiento)
     await db.commit()
+    invalidar("equipamiento")
 
 
 # ASIGNAR SERVICIO
@@ -0,0 +1,267 @@
+"""
+Variantes derivadas de imágenes (ancho limitado, recodificadas a WebP o JPEG).
+
+Cada variante se identifica por el id del Archivo, la versión de su contenido
+y los parámetros de la transformación; se genera una única vez en un pool de
+procesos y se guarda en UPLOAD_DIR/.variantes, junto a los originales. El
+almacén se limita por tamaño total descartando las variantes usadas hace más
+tiempo (LRU). El límite se aplica por worker: cada proceso lleva su propio
+índice y solo desaloja lo que conoce, así que con varios workers el almacén
+puede superar MAX_VARIANTES_BYTES hasta que alguno de ellos desaloje.
+
+Las variantes de un Archivo se eliminan junto con él (borrar_archivo).
+"""
+
+import io
+import os
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import aiofiles
+import aiofiles.os as aios
+from fastapi import HTTPException
+
+from app.models.models import Archivo
+from app.storage import local_repo
+from app.storage.backend import obtener_backend
+
+logger = logging.getLogger(__name__)
+
+VARIANTES_SUBDIR = ".variantes"
+
+# Anchos ofrecidos (srcset); limitar las combinaciones acota el almacén
+ANCHOS_VARIANTE = tuple(
+    int(a)
+    for a in os.environ.get("IMAGE_VARIANT_WIDTHS", "160,320,640,1024,1600").split(",")
+)
+FORMATOS_VARIANTE = {"webp": "image/webp", "jpeg": "image/jpeg"}
+CALIDAD_VARIANTE = int(os.environ.get("IMAGE_VARIANT_QUALITY", "80"))
+
+# Tamaño total máximo de las variantes guardadas
+MAX_VARIANTES_BYTES = int(
+    os.environ.get("IMAGE_VARIANT_CACHE_BYTES", str(512 * 1024 * 1024))
+)
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "2"))
+
+# Las variantes de una misma versión del original nunca cambian
+CACHE_CONTROL_VARIANTE = "public, max-age=31536000, immutable"
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Generaciones en curso, para que peticiones simultáneas esperen la misma
+_en_curso: Dict[str, asyncio.Future] = {}
+# Índice LRU del almacén: nombre de archivo -> tamaño
+_indice: Optional["OrderedDict[str, int]"] = None
+_total = 0
+
+
+class ImagenInvalida(ValueError):
+    """El original no es una imagen que se pueda decodificar."""
+
+
+def generar_variante(datos: bytes, ancho: int, formato: str, calidad: int) -> bytes:
+    """
+    Redimensiona y recodifica una imagen. Se ejecuta en un proceso del pool:
+    solo recibe y devuelve bytes.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        imagen = Image.open(io.BytesIO(datos))
+        # En JPEG decodifica directamente a una escala reducida
+        imagen.draft("RGB", (ancho, ancho))
+        imagen = ImageOps.exif_transpose(imagen)
+
+        # Nunca se agranda el original
+        if imagen.width > ancho:
+            alto = max(1, round(imagen.height * ancho / imagen.width))
+            imagen = imagen.resize((ancho, alto), Image.Resampling.LANCZOS)
+
+        if formato == "jpeg" or imagen.mode not in ("RGB", "RGBA"):
+            imagen = imagen.convert("RGB" if formato == "jpeg" else "RGBA")
+    except (OSError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError y las imágenes truncadas son OSError
+        raise ImagenInvalida(str(e)) from e
+
+    salida = io.BytesIO()
+    imagen.save(salida, format=formato.upper(), quality=calidad, optimize=True)
+    return salida.getvalue()
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _pool
+
+
+def cerrar_pool() -> None:
+    """Detiene los procesos del pool (al apagar la aplicación)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def directorio_variantes() -> str:
+    return os.path.join(local_repo.UPLOAD_DIR, VARIANTES_SUBDIR)
+
+
+def nombre_variante(archivo: Archivo, ancho: int, formato: str) -> str:
+    """Nombre de la variante: id + versión del contenido + transformación."""
+    version = archivo.sha256[:16] if archivo.sha256 else uuid.uuid5(
+        uuid.NAMESPACE_URL, f"{archivo.ruta}:{archivo.tamano}"
+    ).hex[:16]
+    return f"{archivo.id}-{version}-w{ancho}-q{CALIDAD_VARIANTE}.{formato}"
+
+
+def _cargar_indice() -> "OrderedDict[str, int]":
+    """Reconstruye el índice LRU desde el disco (orden por último acceso)."""
+    global _indice, _total
+    if _indice is None:
+        directorio = directorio_variantes()
+        entradas = []
+        if os.path.isdir(directorio):
+            with os.scandir(directorio) as it:
+                for entrada in it:
+                    if entrada.is_file() and not entrada.name.endswith(".part"):
+                        stat = entrada.stat()
+                        entradas.append((stat.st_mtime, entrada.name, stat.st_size))
+        entradas.sort()
+        _indice = OrderedDict((nombre, tamano) for _, nombre, tamano in entradas)
+        _total = sum(_indice.values())
+    return _indice
+
+
+def _registrar_acceso(nombre: str) -> None:
+    global _total
+    indice = _cargar_indice()
+    ruta = os.path.join(directorio_variantes(), nombre)
+    try:
+        # El mtime persiste el orden LRU entre reinicios
+        os.utime(ruta)
+    except FileNotFoundError:
+        return
+    if nombre not in indice:
+        # Generada por otro proceso de la aplicación
+        indice[nombre] = os.path.getsize(ruta)
+        _total += indice[nombre]
+    indice.move_to_end(nombre)
+
+
+async def _desalojar(conservar: str) -> None:
+    """Elimina las variantes menos usadas hasta respetar el tamaño máximo."""
+    global _total
+    indice = _cargar_indice()
+    while _total > MAX_VARIANTES_BYTES and len(indice) > 1:
+        nombre, tamano = next(iter(indice.items()))
+        if nombre == conservar:
+            indice.move_to_end(nombre)
+            continue
+        del indice[nombre]
+        _total -= tamano
+        try:
+            await aios.remove(os.path.join(directorio_variantes(), nombre))
+        except FileNotFoundError:
+            pass
+        logger.info(f"Variante desalojada: {nombre}")
+
+
+async def _generar(archivo: Archivo, ancho: int, formato: str, nombre: str) -> None:
+    global _total
+    datos = await obtener_backend().leer(archivo.ruta)
+    loop = asyncio.get_running_loop()
+    try:
+        variante = await loop.run_in_executor(
+            _obtener_pool(), generar_variante, datos, ancho, formato, CALIDAD_VARIANTE
+        )
+    except ImagenInvalida:
+        raise HTTPException(status_code=415, detail="El archivo no es una imagen válida")
+
+    directorio = directorio_variantes()
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, nombre)
+    temporal = f"{destino}.{uuid.uuid4().hex}.part"
+    async with aiofiles.open(temporal, "wb") as f:
+        await f.write(variante)
+    await aios.replace(temporal, destino)
+
+    indice = _cargar_indice()
+    _total += len(variante) - indice.get(nombre, 0)
+    indice[nombre] = len(variante)
+    indice.move_to_end(nombre)
+    await _desalojar(conservar=nombre)
+
+
+def validar_transformacion(archivo: Archivo, ancho: int, formato: str) -> None:
+    """
+    Comprueba que la variante pedida esté permitida.
+
+    Raises:
+        HTTPException: 400 si la transformación no está permitida, 415 si el
+        original no es una imagen.
+    """
+    if ancho not in ANCHOS_VARIANTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Ancho no permitido; opciones: {', '.join(map(str, ANCHOS_VARIANTE))}",
+        )
+    if formato not in FORMATOS_VARIANTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no permitido; opciones: {', '.join(FORMATOS_VARIANTE)}",
+        )
+    if not (archivo.tipo or "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="El archivo no es una imagen")
+
+
+async def obtener_variante(archivo: Archivo, ancho: int, formato: str) -> str:
+    """
+    Ruta local de la variante pedida, generándola si todavía no existe. La
+    transformación debe haberse comprobado antes con validar_transformacion.
+    """
+    nombre = nombre_variante(archivo, ancho, formato)
+    ruta = os.path.join(directorio_variantes(), nombre)
+
+    if nombre not in _en_curso and await aios.path.exists(ruta):
+        _registrar_acceso(nombre)
+        return ruta
+
+    futuro = _en_curso.get(nombre)
+    if futuro is None:
+        futuro = asyncio.get_running_loop().create_future()
+        _en_curso[nombre] = futuro
+        try:
+            await _generar(archivo, ancho, formato, nombre)
+            futuro.set_result(ruta)
+        except Exception as e:
+            futuro.set_exception(e)
+            # Evita el aviso de excepción no recuperada si nadie más esperaba
+            futuro.exception()
+        finally:
+            if not futuro.done():
+                # Generación cancelada: quienes esperaban reciben la cancelación
+                futuro.cancel()
+            del _en_curso[nombre]
+    return await asyncio.shield(futuro)
+
+
+async def eliminar_variantes(archivo: Archivo) -> None:
+    """Elimina todas las variantes guardadas de un archivo (id-*)."""
+    global _total
+    directorio = directorio_variantes()
+    if not await aios.path.isdir(directorio):
+        return
+    prefijo = f"{archivo.id}-"
+    indice = _cargar_indice()
+    for nombre in await aios.listdir(directorio):
+        if not nombre.startswith(prefijo):
+            continue
+        try:
+            await aios.remove(os.path.join(directorio, nombre))
+        except FileNotFoundError:
+            pass
+        _total -= indice.pop(nombre, 0)
@@ -0,0 +1,218 @@
+"""
+Reconciliación entre los registros Archivo y el almacenamiento.
+
+Detecta (y opcionalmente elimina) los huérfanos de ambos lados:
+  - blobs guardados que ningún Archivo ni SesionSubida referencia;
+  - registros Archivo cuyo blob ya no existe;
+  - sesiones de subida reanudable abandonadas y sus archivos parciales;
+y, si se pide, verifica el SHA-256 de los blobs contra el registrado.
+
+Ambos lados se recorren en lotes (listado del backend y keyset sobre
+Archivo.id), por lo que la memoria usada no depende de la cantidad de archivos.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.models import Archivo, SesionSubida
+from app.services import archivos_service, compresion_service
+from app.storage import local_repo
+from app.storage.backend import EntradaAlmacen, obtener_backend
+
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE = 1000
+
+# Solo se eliminan blobs huérfanos más antiguos que esto: cubre las subidas en
+# curso y los borrados concurrentes de blobs compartidos
+ANTIGUEDAD_MINIMA = 3600
+
+# Cantidad máxima de ejemplos que se conservan en el informe por categoría
+MAX_EJEMPLOS = 100
+
+
+@dataclass
+class InformeIntegridad:
+    registros_revisados: int = 0
+    blobs_revisados: int = 0
+    blobs_huerfanos: int = 0
+    blobs_eliminados: int = 0
+    bytes_liberados: int = 0
+    registros_sin_blob: int = 0
+    registros_eliminados: int = 0
+    checksums_verificados: int = 0
+    checksums_invalidos: int = 0
+    temporales_eliminados: int = 0
+    sesiones_eliminadas: int = 0
+    ejemplos_blobs_huerfanos: List[str] = field(default_factory=list)
+    ejemplos_registros_sin_blob: List[int] = field(default_factory=list)
+    ejemplos_checksums_invalidos: List[int] = field(default_factory=list)
+
+
+def _agregar_ejemplo(ejemplos: list, valor) -> None:
+    if len(ejemplos) < MAX_EJEMPLOS:
+        ejemplos.append(valor)
+
+
+def _ruta_base(ruta: str) -> str:
+    """Ruta del original si `ruta` es una variante precomprimida."""
+    for extension in compresion_service.EXTENSIONES.values():
+        if ruta.endswith(extension):
+            return ruta[: -len(extension)]
+    return ruta
+
+
+async def _rutas_referenciadas(db: AsyncSession, rutas: List[str]) -> Set[str]:
+    """
+    Rutas del lote referenciadas por algún Archivo o sesión de subida; las
+    variantes precomprimidas cuentan como referenciadas si su original lo está.
+    """
+    consultar = set(rutas) | {_ruta_base(ruta) for ruta in rutas}
+    archivos = await db.execute(
+        select(Archivo.ruta).where(Archivo.ruta.in_(consultar)).distinct()
+    )
+    sesiones = await db.execute(
+        select(SesionSubida.ruta).where(SesionSubida.ruta.in_(consultar))
+    )
+    referenciadas = set(archivos.scalars().all()) | set(sesiones.scalars().all())
+    return {
+        ruta
+        for ruta in rutas
+        if ruta in referenciadas or _ruta_base(ruta) in referenciadas
+    }
+
+
+async def _revisar_blobs(
+    db: AsyncSession,
+    lote: List[EntradaAlmacen],
+    informe: InformeIntegridad,
+    eliminar: bool,
+    limite: float,
+) -> None:
+    informe.blobs_revisados += len(lote)
+    referenciadas = await _rutas_referenciadas(db, [e.ruta for e in lote])
+    huerfanos = [e for e in lote if e.ruta not in referenciadas]
+    informe.blobs_huerfanos += len(huerfanos)
+    for entrada in huerfanos:
+        _agregar_ejemplo(informe.ejemplos_blobs_huerfanos, entrada.ruta)
+
+    if not eliminar:
+        return
+
+    candidatos = [e for e in huerfanos if e.modificado < limite]
+    if not candidatos:
+        return
+    # Se vuelve a consultar justo antes de borrar para achicar la ventana con
+    # subidas que acaban de registrar el mismo blob
+    referenciadas = await _rutas_referenciadas(db, [e.ruta for e in candidatos])
+    backend = obtener_backend()
+    for entrada in candidatos:
+        if entrada.ruta in referenciadas:
+            continue
+        await backend.eliminar(entrada.ruta)
+        informe.blobs_eliminados += 1
+        informe.bytes_liberados += entrada.tamano
+
+
+async def _revisar_registros(
+    db: AsyncSession,
+    lote: List[Archivo],
+    informe: InformeIntegridad,
+    eliminar: bool,
+    verificar_checksums: bool,
+) -> None:
+    backend = obtener_backend()
+    informe.registros_revisados += len(lote)
+
+    # Con almacenamiento por contenido varios registros comparten ruta
+    rutas = list({archivo.ruta for archivo in lote})
+    existentes = await asyncio.gather(*[backend.existe(ruta) for ruta in rutas])
+    existe = dict(zip(rutas, existentes))
+
+    sin_blob = [archivo for archivo in lote if not existe[archivo.ruta]]
+    informe.registros_sin_blob += len(sin_blob)
+    for archivo in sin_blob:
+        _agregar_ejemplo(informe.ejemplos_registros_sin_blob, archivo.id)
+        logger.warning(f"Archivo {archivo.id} sin blob: {archivo.ruta}")
+
+    if eliminar and sin_blob:
+        await db.execute(
+            delete(Archivo).where(Archivo.id.in_([a.id for a in sin_blob]))
+        )
+        await db.commit()
+        informe.registros_eliminados += len(sin_blob)
+
+    if verificar_checksums:
+        digests = {}
+        for archivo in lote:
+            if not archivo.sha256 or not existe[archivo.ruta]:
+                continue
+            if archivo.ruta not in digests:
+                digests[archivo.ruta] = await backend.calcular_sha256(archivo.ruta)
+            informe.checksums_verificados += 1
+            if digests[archivo.ruta] != archivo.sha256:
+                informe.checksums_invalidos += 1
+                _agregar_ejemplo(informe.ejemplos_checksums_invalidos, archivo.id)
+                logger.error(f"Checksum inválido en Archivo {archivo.id}: {archivo.ruta}")
+
+
+async def reconciliar(
+    db: AsyncSession,
+    eliminar_blobs: bool = False,
+    eliminar_registros: bool = False,
+    verificar_checksums: bool = False,
+    tamano_lote: int = TAMANO_LOTE,
+    antiguedad_minima: float = ANTIGUEDAD_MINIMA,
+) -> InformeIntegridad:
+    """
+    Recorre el almacenamiento y la tabla Archivo e informa las diferencias.
+
+    Args:
+        eliminar_blobs: Elimina los blobs huérfanos (y los temporales
+            abandonados) con más de `antiguedad_minima` segundos, y las
+            sesiones de subida sin actividad en UPLOAD_SESSION_TTL_SECONDS
+        eliminar_registros: Elimina los registros Archivo cuyo blob no existe
+        verificar_checksums: Recalcula el SHA-256 de los blobs referenciados
+    """
+    informe = InformeIntegridad()
+    limite = time.time() - antiguedad_minima
+
+    if eliminar_blobs:
+        # Los temporales de staging siempre están en el disco local
+        informe.temporales_eliminados, liberados = local_repo.limpiar_temporales(
+            antiguedad_minima
+        )
+        informe.bytes_liberados += liberados
+        (
+            informe.sesiones_eliminadas,
+            liberados,
+        ) = await archivos_service.limpiar_sesiones_abandonadas(db)
+        informe.bytes_liberados += liberados
+
+    async for lote in obtener_backend().listar(tamano_lote):
+        await _revisar_blobs(db, lote, informe, eliminar_blobs, limite)
+
+    ultimo_id: Optional[int] = None
+    while True:
+        query = select(Archivo).order_by(Archivo.id).limit(tamano_lote)
+        if ultimo_id is not None:
+            query = query.where(Archivo.id > ultimo_id)
+        lote = (await db.execute(query)).scalars().all()
+        if not lote:
+            break
+        ultimo_id = lote[-1].id
+        await _revisar_registros(
+            db, lote, informe, eliminar_registros, verificar_checksums
+        )
+        # Libera los objetos del lote del identity map de la sesión
+        db.expunge_all()
+
+    logger.info(f"Reconciliación de almacenamiento: {informe}")
+    return informe
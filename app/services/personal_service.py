@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import Personal, PersonalProyecto, Proyecto
+from app.paginacion import paginar
 
 
 # CREATE
@@ -24,11 +25,17 @@ async def crear_personal(db: AsyncSession, data: Dict[str, Any]) -> Personal:
     return obj
 
 
+ORDEN_PERSONAL = ((Personal.id, False),)
+
+
 # READ ALL
 async def listar_personal(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Personal]:
-    query = select(Personal).offset(offset).limit(limit)
+    query = paginar(select(Personal), ORDEN_PERSONAL, offset, limit, cursor)
     result = await db.execute(query)
     return result.scalars().all()
 
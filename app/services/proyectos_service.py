@@ -3,7 +3,9 @@ from typing import List, Optional, Sequence, Dict, Any
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import Proyecto, PersonalProyecto, Personal
+from app.paginacion import paginar
 from app.services.personal_service import obtener_personal
+from app.services.utils import ids_inexistentes, lista_ids
 
 
 # CREATE
@@ -29,11 +31,17 @@ async def crear_proyecto(db: AsyncSession, data: Dict[str, Any]) -> Proyecto:
     return obj
 
 
+ORDEN_PROYECTOS = ((Proyecto.id, False),)
+
+
 # READ ALL
 async def listar_proyectos(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Proyecto]:
-    query = select(Proyecto).offset(offset).limit(limit)
+    query = paginar(select(Proyecto), ORDEN_PROYECTOS, offset, limit, cursor)
     result = await db.execute(query)
     return list(result.scalars().all())
 
@@ -107,31 +115,31 @@ async def asignar_personal(
     if not proyecto:
         raise ValueError(f"Proyecto with ID {proyecto_id} not found")
 
+    if any(item.get("personal_id") is None for item in personal_data):
+        raise ValueError("Cada item debe tener un personal_id")
+    personal_ids = [item["personal_id"] for item in personal_data]
+
+    # Verificar que todo el personal existe (una sola consulta)
+    faltantes = await ids_inexistentes(db, Personal.id, personal_ids)
+    if faltantes:
+        raise ValueError(f"Personal with ID {lista_ids(faltantes)} not found")
+
+    # Relaciones ya existentes para este proyecto, también de una vez
+    relation_query = select(PersonalProyecto).where(
+        PersonalProyecto.proyecto_id == proyecto_id,
+        PersonalProyecto.personal_id.in_(personal_ids),
+    )
+    relation_result = await db.execute(relation_query)
+    existentes = {r.personal_id: r for r in relation_result.scalars().all()}
+
     # Crear relaciones en la tabla pivote
     now = datetime.now(timezone.utc)
     created_relations = []
 
     for item in personal_data:
-        personal_id = item.get("personal_id")
-        if personal_id is None:
-            raise ValueError("Cada item debe tener un personal_id")
+        personal_id = item["personal_id"]
         rol = item.get("rol", "Investigador")
-
-        # Verificar que el personal existe
-        personal_query = select(Personal).where(Personal.id == personal_id)
-        personal_result = await db.execute(personal_query)
-        personal = personal_result.scalar_one_or_none()
-
-        if not personal:
-            raise ValueError(f"Personal with ID {personal_id} not found")
-
-        # Verificar si la relación ya existe
-        relation_query = select(PersonalProyecto).where(
-            PersonalProyecto.personal_id == personal_id,
-            PersonalProyecto.proyecto_id == proyecto_id,
-        )
-        relation_result = await db.execute(relation_query)
-        existing_relation = relation_result.scalar_one_or_none()
+        existing_relation = existentes.get(personal_id)
 
         if existing_relation:
             # Actualizar el rol si es diferente
@@ -149,6 +157,8 @@ async def asignar_personal(
             )
             db.add(new_relation)
             created_relations.append(new_relation)
+            # Un mismo personal_id repetido en la petición actualiza esta fila
+            existentes[personal_id] = new_relation
 
     await db.commit()
 
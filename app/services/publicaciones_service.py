@@ -1,8 +1,47 @@
 from datetime import datetime, timezone
-from typing import List, Optional, Sequence, Dict, Any
+from typing import List, Optional, Sequence, Dict, Any, Set
 from sqlmodel import select
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.models import Publicacion, Personal
+from app.models.models import Publicacion, Personal, PublicacionAutor
+from app.paginacion import paginar
+from app.services.utils import ids_inexistentes, lista_ids
+
+# Más recientes primero; las publicaciones sin año van al final
+ORDEN_PUBLICACIONES = ((Publicacion.anio, True), (Publicacion.id, True))
+
+
+def ids_autores(authors: Optional[List[Dict[str, Any]]]) -> Set[int]:
+    """personal_id de los autores internos de una lista `authors`."""
+    return {
+        author["personal_id"]
+        for author in authors or []
+        if isinstance(author, dict) and author.get("personal_id")
+    }
+
+
+async def validar_autores(db: AsyncSession, authors: List[Dict[str, Any]]) -> None:
+    """ValueError con todos los personal_id inexistentes (una sola consulta)."""
+    faltantes = await ids_inexistentes(db, Personal.id, ids_autores(authors))
+    if faltantes:
+        raise ValueError(f"Personal with ID {lista_ids(faltantes)} not found")
+
+
+async def sincronizar_autores(db: AsyncSession, publicacion: Publicacion) -> None:
+    """
+    Reemplaza las filas de PublicacionAutor según publicacion.authors.
+    No hace commit: debe llamarse dentro de la misma transacción que guarda
+    la publicación (y después de un flush, para que tenga id).
+    """
+    await db.execute(
+        delete(PublicacionAutor).where(
+            PublicacionAutor.publicacion_id == publicacion.id
+        )
+    )
+    db.add_all(
+        PublicacionAutor(publicacion_id=publicacion.id, personal_id=personal_id)
+        for personal_id in ids_autores(publicacion.authors)
+    )
 
 
 # CREATE
@@ -23,17 +62,12 @@ async def crear_publicacion(db: AsyncSession, data: Dict[str, Any]) -> Publicaci
 
     # Validar que los personal_id en authors existan
     if authors and isinstance(authors, list):
-        for author in authors:
-            if isinstance(author, dict) and "personal_id" in author:
-                personal_id = author["personal_id"]
-                personal = await db.execute(
-                    select(Personal).where(Personal.id == personal_id)
-                )
-                if not personal.scalar_one_or_none():
-                    raise ValueError(f"Personal with ID {personal_id} not found")
+        await validar_autores(db, authors)
 
     obj = Publicacion(**data, created_at=now, updated_at=now)
     db.add(obj)
+    await db.flush()
+    await sincronizar_autores(db, obj)
     await db.commit()
     await db.refresh(obj)
     return obj
@@ -46,6 +80,8 @@ async def listar_publicaciones(
     limit: int = 100,
     anio: Optional[int] = None,
     estado: Optional[str] = None,
+    cursor: Optional[str] = None,
+    autor_id: Optional[int] = None,
 ) -> List[Publicacion]:
     query = select(Publicacion)
 
@@ -55,8 +91,19 @@ async def listar_publicaciones(
     if estado:
         query = query.where(Publicacion.estado == estado)
 
+    if autor_id is not None:
+        # Resuelto por el índice (personal_id, publicacion_id) de la tabla de
+        # autores, antes de paginar: las páginas siempre salen completas
+        query = query.where(
+            Publicacion.id.in_(
+                select(PublicacionAutor.publicacion_id).where(
+                    PublicacionAutor.personal_id == autor_id
+                )
+            )
+        )
+
     # Paginación
-    query = query.offset(offset).limit(limit)
+    query = paginar(query, ORDEN_PUBLICACIONES, offset, limit, cursor)
 
     result = await db.execute(query)
     return result.scalars().all()
@@ -92,14 +139,7 @@ async def actualizar_publicacion(
             authors = authors_data
 
         if authors and isinstance(authors, list):
-            for author in authors:
-                if isinstance(author, dict) and "personal_id" in author:
-                    personal_id = author["personal_id"]
-                    personal = await db.execute(
-                        select(Personal).where(Personal.id == personal_id)
-                    )
-                    if not personal.scalar_one_or_none():
-                        raise ValueError(f"Personal with ID {personal_id} not found")
+            await validar_autores(db, authors)
 
     # Actualizar campos
     for key, value in data.items():
@@ -107,6 +147,8 @@ async def actualizar_publicacion(
 
     publicacion.updated_at = datetime.now(timezone.utc)
     db.add(publicacion)
+    if "authors" in data:
+        await sincronizar_autores(db, publicacion)
     await db.commit()
     await db.refresh(publicacion)
     return publicacion
@@ -119,5 +161,9 @@ async def borrar_publicacion(db: AsyncSession, pid: int) -> None:
     if not publicacion:
         return
 
+    # Explícito además del ON DELETE CASCADE: SQLite no aplica las FK por defecto
+    await db.execute(
+        delete(PublicacionAutor).where(PublicacionAutor.publicacion_id == pid)
+    )
     await db.delete(publicacion)
     await db.commit()
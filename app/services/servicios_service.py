@@ -4,6 +4,8 @@ from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.models.models import Servicio, ServicioEquipamiento, Equipamiento
+from app.cache_respuestas import invalidar
+from app.paginacion import paginar
 
 
 # CREATE
@@ -22,6 +24,7 @@ async def crear_servicio(
     obj = Servicio(**data, created_at=now, updated_at=now)
     db.add(obj)
     await db.commit()
+    invalidar("servicio")
     await db.refresh(obj)
 
     # Asociar equipamientos
@@ -48,11 +51,17 @@ async def crear_servicio(
     return obj
 
 
+ORDEN_SERVICIOS = ((Servicio.id, False),)
+
+
 # READ ALL
 async def listar_servicios(
-    db: AsyncSession, offset: int = 0, limit: int = 100
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> List[Servicio]:  # Return List instead of Sequence
-    query = select(Servicio).offset(offset).limit(limit)
+    query = paginar(select(Servicio), ORDEN_SERVICIOS, offset, limit, cursor)
     result = await db.execute(query)
     return list(result.scalars().all())  # Convert to list
 
@@ -84,6 +93,7 @@ async def actualizar_servicio(
     servicio.updated_at = datetime.now(timezone.utc)
     db.add(servicio)
     await db.commit()
+    invalidar("servicio")
     await db.refresh(servicio)
     return servicio
 
@@ -107,6 +117,7 @@ async def borrar_servicio(db: AsyncSession, sid: int) -> None:
 
     await db.delete(servicio)
     await db.commit()
+    invalidar("servicio")
 
 
 # LISTAR EQUIPAMIENTOS DEL SERVICIO
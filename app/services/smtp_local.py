@@ -0,0 +1,123 @@
+"""
+Servidor SMTP mínimo en memoria para desarrollo y tests.
+
+Acepta los comandos que usa aiosmtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT), sin TLS ni autenticación, y guarda cada mensaje recibido en
+`mensajes`. `fallar_proximos` hace que los siguientes DATA respondan con un
+error temporal (451) y las direcciones de `rechazados` reciben un error
+permanente (550), para probar los reintentos.
+
+Uso en desarrollo:
+    python -m app.services.smtp_local --puerto 1025
+y SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false.
+"""
+
+import asyncio
+import argparse
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List, Optional, Set
+
+
+class ServidorSMTPLocal:
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0):
+        self.host = host
+        self.puerto = puerto
+        self.mensajes: List[EmailMessage] = []
+        # Conexiones aceptadas: permite verificar que el pool las reutiliza
+        self.conexiones = 0
+        self.fallar_proximos = 0
+        self.rechazados: Set[str] = set()
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self) -> "ServidorSMTPLocal":
+        self._servidor = await asyncio.start_server(
+            self._atender, self.host, self.puerto
+        )
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self
+
+    async def detener(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+
+    async def __aenter__(self) -> "ServidorSMTPLocal":
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.detener()
+
+    async def _atender(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.conexiones += 1
+
+        async def responder(linea: str) -> None:
+            writer.write(linea.encode() + b"\r\n")
+            await writer.drain()
+
+        await responder("220 smtp-local listo")
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                texto = linea.decode(errors="replace").strip()
+                comando = texto.split(" ", 1)[0].upper()
+                if comando == "EHLO":
+                    await responder("250-smtp-local")
+                    await responder("250 8BITMIME")
+                elif comando == "RCPT" and any(
+                    f"<{direccion}>" in texto for direccion in self.rechazados
+                ):
+                    await responder("550 Buzón inexistente")
+                elif comando in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await responder("250 OK")
+                elif comando == "DATA":
+                    await responder("354 Fin con <CRLF>.<CRLF>")
+                    datos = await self._leer_datos(reader)
+                    if self.fallar_proximos > 0:
+                        self.fallar_proximos -= 1
+                        await responder("451 Error temporal")
+                        continue
+                    self.mensajes.append(
+                        message_from_bytes(datos, policy=policy.default)
+                    )
+                    await responder("250 Encolado")
+                elif comando == "QUIT":
+                    await responder("221 Adiós")
+                    break
+                else:
+                    await responder("502 Comando no implementado")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _leer_datos(reader: asyncio.StreamReader) -> bytes:
+        lineas = []
+        while True:
+            linea = await reader.readline()
+            if linea in (b".\r\n", b".\n", b""):
+                break
+            # Dot-stuffing (RFC 5321 4.5.2)
+            lineas.append(linea[1:] if linea.startswith(b"..") else linea)
+        return b"".join(lineas)
+
+
+async def _main(puerto: int) -> None:
+    async with ServidorSMTPLocal("127.0.0.1", puerto) as servidor:
+        print(f"SMTP local escuchando en 127.0.0.1:{servidor.puerto}", flush=True)
+        while True:
+            cantidad = len(servidor.mensajes)
+            await asyncio.sleep(1)
+            for msg in servidor.mensajes[cantidad:]:
+                print(f"→ {msg['To']}: {msg['Subject']}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor SMTP local en memoria")
+    parser.add_argument("--puerto", type=int, default=1025)
+    asyncio.run(_main(parser.parse_args().puerto))
@@ -0,0 +1,24 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+
+async def ids_inexistentes(
+    db: AsyncSession, columna, ids: Iterable[Optional[int]]
+) -> List[Optional[int]]:
+    """
+    ids que no existen en `columna` (p. ej. Personal.id); None nunca existe.
+    Resuelve todos con una sola consulta IN en lugar de una por id.
+    """
+    buscados = set(ids)
+    validos = buscados - {None}
+    existentes = set()
+    if validos:
+        result = await db.execute(select(columna).where(columna.in_(validos)))
+        existentes = set(result.scalars().all())
+    return sorted(buscados - existentes, key=lambda i: (i is None, i or 0))
+
+
+def lista_ids(ids: Iterable[Optional[int]]) -> str:
+    return ", ".join(str(i) for i in ids)
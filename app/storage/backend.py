@@ -0,0 +1,108 @@
+"""
+Interfaz común de los backends de almacenamiento y selección por configuración.
+
+Las subidas siempre se reciben en el directorio local de staging
+(UPLOAD_DIR/.tmp, o el archivo de la sesión reanudable); el backend se encarga
+de publicar ese temporal en su ubicación definitiva y de servir, comprobar y
+eliminar los archivos ya guardados.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
+
+from fastapi.responses import Response
+
+# local (disco), s3 (almacenamiento de objetos compatible con S3) o
+# s3-local (el driver S3 sobre un directorio, para desarrollo y pruebas)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local").lower()
+
+
+class EntradaAlmacen(NamedTuple):
+    ruta: str
+    tamano: int
+    # Fecha de modificación (epoch en segundos)
+    modificado: float
+
+
+class Almacenamiento(ABC):
+    """Operaciones que los servicios necesitan de un backend de almacenamiento."""
+
+    @abstractmethod
+    async def guardar(
+        self,
+        ruta_temporal: str,
+        ruta: str,
+        tipo: Optional[str] = None,
+        codificacion: Optional[str] = None,
+    ) -> None:
+        """
+        Publica el temporal local `ruta_temporal` como `ruta` y lo elimina.
+        `codificacion` indica el Content-Encoding de las variantes precomprimidas.
+        """
+
+    @abstractmethod
+    async def abrir(
+        self,
+        ruta: str,
+        rango: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """Respuesta HTTP para descargar `ruta` (opcionalmente un rango)."""
+
+    @abstractmethod
+    def iterar(self, ruta: str) -> AsyncIterator[bytes]:
+        """Contenido de `ruta` en bloques, sin cargarlo completo en memoria."""
+
+    @abstractmethod
+    async def leer(self, ruta: str) -> bytes:
+        """Contenido completo de `ruta` (para procesarlo, p. ej. imágenes)."""
+
+    @abstractmethod
+    async def eliminar(self, ruta: str) -> None:
+        """Elimina `ruta`; no falla si ya no existe."""
+
+    @abstractmethod
+    async def existe(self, ruta: str) -> bool:
+        """Indica si `ruta` está guardada."""
+
+    @abstractmethod
+    async def calcular_sha256(self, ruta: str) -> str:
+        """SHA-256 del contenido guardado en `ruta`, leído por partes."""
+
+    @abstractmethod
+    def listar(self, lote: int = 1000) -> AsyncIterator[List[EntradaAlmacen]]:
+        """
+        Recorre los archivos guardados en lotes de a lo sumo `lote` entradas,
+        sin cargar el listado completo en memoria. Omite los directorios
+        internos (los que empiezan con punto: temporales, variantes...).
+        """
+
+
+_instancia: Optional[Almacenamiento] = None
+
+
+def crear_backend(nombre: str = STORAGE_BACKEND) -> Almacenamiento:
+    """Construye el backend indicado por la configuración."""
+    if nombre == "local":
+        from app.storage.local_repo import AlmacenamientoLocal
+
+        return AlmacenamientoLocal()
+    if nombre == "s3":
+        from app.storage.s3_repo import AlmacenamientoS3, crear_cliente
+
+        return AlmacenamientoS3(crear_cliente())
+    if nombre == "s3-local":
+        from app.storage.s3_local import ClienteS3Local
+        from app.storage.s3_repo import AlmacenamientoS3
+
+        return AlmacenamientoS3(ClienteS3Local())
+    raise ValueError(f"STORAGE_BACKEND desconocido: {nombre}")
+
+
+def obtener_backend() -> Almacenamiento:
+    """Backend configurado (se crea una única vez por proceso)."""
+    global _instancia
+    if _instancia is None:
+        _instancia = crear_backend()
+    return _instancia
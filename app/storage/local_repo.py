@@ -3,15 +3,32 @@ Módulo para gestionar el almacenamiento local de archivos.
 """
 
 import os
+import re
+import time
 import uuid
+import hashlib
 import logging
 import aiofiles
 import aiofiles.os as aios  # Import aiofiles.os
 import mimetypes
 from pathlib import Path
-from typing import BinaryIO, Generator, AsyncGenerator
+from typing import (
+    BinaryIO,
+    Dict,
+    Generator,
+    AsyncGenerator,
+    AsyncIterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 from fastapi import UploadFile, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+
+from app.storage.backend import Almacenamiento, EntradaAlmacen
 
 # Configuración de logging
 logger = logging.getLogger(__name__)
@@ -19,6 +36,142 @@ logger = logging.getLogger(__name__)
 # Ruta base para almacenamiento de archivos
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "./uploads")
 
+# Almacenamiento direccionado por contenido: cada archivo se guarda una sola
+# vez, nombrado por su SHA-256, en un árbol de directorios de dos niveles
+CONTENT_ADDRESSED_STORAGE = os.environ.get(
+    "CONTENT_ADDRESSED_STORAGE", "false"
+).lower() in ("1", "true", "yes")
+
+# Subdirectorio (dentro de UPLOAD_DIR) para escrituras en curso
+TMP_SUBDIR = ".tmp"
+
+# Tamaño de lectura al servir archivos
+CHUNK_SIZE = 64 * 1024
+
+# Modo de descarga: "stream" (generador aiofiles) o "sendfile" (FileResponse,
+# que el servidor puede entregar con sendfile vía la extensión ASGI pathsend)
+DOWNLOAD_MODE = os.environ.get("DOWNLOAD_MODE", "stream")
+
+# Máximo de rangos aceptados en un único header Range (evita abusos)
+MAX_RANGOS = 16
+
+
+class ResultadoGuardado(NamedTuple):
+    """Datos obtenidos al guardar un archivo en una sola pasada."""
+
+    ruta_temporal: str
+    tamano: int
+    sha256: str
+    tipo: str
+
+
+# Firmas (magic bytes) para detectar el tipo real del contenido
+FIRMAS_MIME: List[Tuple[bytes, str]] = [
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+]
+
+# Buffer de escritura al guardar archivos subidos
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def detectar_tipo(
+    cabecera: bytes, nombre: Optional[str] = None, declarado: Optional[str] = None
+) -> str:
+    """
+    Determina el tipo MIME de un archivo a partir de sus primeros bytes.
+
+    Si la firma no es reconocible se usa el tipo declarado por el cliente y,
+    en su defecto, el que corresponde a la extensión del nombre.
+    """
+    for firma, tipo in FIRMAS_MIME:
+        if cabecera.startswith(firma):
+            return tipo
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return "image/webp"
+    if declarado and declarado != "application/octet-stream":
+        return declarado
+    if nombre:
+        tipo, _ = mimetypes.guess_type(nombre)
+        if tipo:
+            return tipo
+    return "application/octet-stream"
+
+
+async def guardar_stream(
+    chunks: AsyncIterator[bytes],
+    nombre: Optional[str] = None,
+    tipo_declarado: Optional[str] = None,
+    max_tamano: Optional[int] = None,
+) -> ResultadoGuardado:
+    """
+    Guarda un flujo de bytes en una sola pasada.
+
+    En el mismo recorrido se escribe a disco (con un buffer grande), se mide el
+    tamaño, se calcula el SHA-256 y se detecta el tipo MIME. Si se supera
+    `max_tamano` se aborta de inmediato con 413 sin seguir leyendo. El archivo
+    queda en UPLOAD_DIR/.tmp hasta que se consolida con `consolidar`.
+
+    Args:
+        chunks: Iterador asíncrono con el contenido del archivo
+        nombre: Nombre original del archivo
+        tipo_declarado: Content-Type informado por el cliente
+        max_tamano: Tamaño máximo permitido en bytes
+
+    Returns:
+        ResultadoGuardado: Ruta temporal, tamaño, digest y tipo MIME
+    """
+    tmp_dir = os.path.join(UPLOAD_DIR, TMP_SUBDIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+    ruta_temporal = os.path.join(TMP_SUBDIR, f"{uuid.uuid4()}.part")
+    file_path = os.path.join(UPLOAD_DIR, ruta_temporal)
+
+    digest = hashlib.sha256()
+    tamano = 0
+    cabecera = b""
+    try:
+        async with aiofiles.open(
+            file_path, "wb", buffering=WRITE_BUFFER_SIZE
+        ) as out_file:
+            async for content in chunks:
+                tamano += len(content)
+                if max_tamano is not None and tamano > max_tamano:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"El archivo excede el tamaño máximo permitido de {max_tamano // (1024 * 1024)} MB",
+                    )
+                if len(cabecera) < 16:
+                    cabecera += content[: 16 - len(cabecera)]
+                digest.update(content)
+                await out_file.write(content)
+    except HTTPException:
+        await eliminar(ruta_temporal)
+        raise
+    except Exception as e:
+        logger.error(f"Error al guardar archivo: {str(e)}")
+        await eliminar(ruta_temporal)
+        raise HTTPException(
+            status_code=500, detail=f"Error al guardar archivo: {str(e)}"
+        )
+
+    return ResultadoGuardado(
+        ruta_temporal=ruta_temporal,
+        tamano=tamano,
+        sha256=digest.hexdigest(),
+        tipo=detectar_tipo(cabecera, nombre, tipo_declarado),
+    )
+
+
+async def iterar_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """Recorre un UploadFile en bloques grandes."""
+    while content := await file.read(WRITE_BUFFER_SIZE):
+        yield content
+
 
 async def guardar(file: UploadFile) -> str:
     """
@@ -30,38 +183,194 @@ async def guardar(file: UploadFile) -> str:
     Returns:
         str: La ruta relativa del archivo guardado
     """
-    # Crear el directorio si no existe
+    resultado = await guardar_stream(iterar_upload(file), file.filename)
+    unique_filename = nueva_ruta(file.filename)
+    await consolidar(resultado.ruta_temporal, unique_filename)
+    return unique_filename
+
+
+def ruta_por_contenido(digest: str, nombre: Optional[str] = None) -> str:
+    """
+    Ruta relativa de un blob direccionado por contenido ("ab/cd/abcd...pdf").
+
+    Se conserva la extensión del nombre original para poder deducir el tipo
+    MIME al servirlo.
+    """
+    extension = os.path.splitext(nombre)[1] if nombre else ""
+    return os.path.join(digest[:2], digest[2:4], f"{digest}{extension}")
+
+
+async def consolidar(ruta_temporal: str, ruta: str) -> None:
+    """
+    Mueve un temporal a su ruta definitiva de forma atómica.
+
+    Si el blob ya existe se reemplaza por el temporal (mismo contenido), lo que
+    también lo restaura si otra petición acababa de eliminarlo.
+    """
+    destino = os.path.join(UPLOAD_DIR, ruta)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    await aios.replace(os.path.join(UPLOAD_DIR, ruta_temporal), destino)
+    logger.info(f"Archivo guardado: {destino}")
+
+
+def nueva_ruta(nombre: Optional[str] = None) -> str:
+    """Genera un nombre único para un archivo conservando su extensión."""
+    extension = os.path.splitext(nombre)[1] if nombre else ""
+    return f"{uuid.uuid4()}{extension}"
+
+
+async def escribir_fragmento(
+    ruta: str, offset: int, chunks: AsyncIterator[bytes], limite: int
+) -> int:
+    """
+    Escribe un fragmento de una subida reanudable directamente en su ruta final.
+
+    Args:
+        ruta: Ruta relativa del archivo en construcción
+        offset: Posición a partir de la cual se escribe
+        chunks: Iterador asíncrono con los bytes del fragmento
+        limite: Cantidad máxima de bytes que se aceptan en este fragmento
+
+    Returns:
+        int: Bytes escritos
+    """
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(UPLOAD_DIR, ruta)
+    modo = "r+b" if os.path.exists(file_path) else "wb"
 
-    # Generar nombre único para el archivo
-    file_extension = os.path.splitext(file.filename)[1] if file.filename else ""
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    escritos = 0
+    async with aiofiles.open(file_path, modo) as out_file:
+        await out_file.seek(offset)
+        await out_file.truncate()
+        async for chunk in chunks:
+            if escritos + len(chunk) > limite:
+                raise HTTPException(
+                    status_code=413,
+                    detail="El fragmento excede el tamaño declarado de la subida",
+                )
+            await out_file.write(chunk)
+            escritos += len(chunk)
+    return escritos
 
-    try:
-        # Guardar el archivo
-        async with aiofiles.open(file_path, "wb") as out_file:
-            while content := await file.read(1024):  # Read file in chunks
-                await out_file.write(content)
 
-        logger.info(f"Archivo guardado: {file_path}")
-        return unique_filename
-    except Exception as e:
-        logger.error(f"Error al guardar archivo: {str(e)}")
+def tamano_actual(ruta: str) -> int:
+    """Tamaño en disco de un archivo (0 si todavía no existe)."""
+    file_path = os.path.join(UPLOAD_DIR, ruta)
+    return os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+
+async def calcular_sha256(ruta: str) -> str:
+    """Calcula el SHA-256 de un archivo ya almacenado."""
+    digest = hashlib.sha256()
+    async with aiofiles.open(os.path.join(UPLOAD_DIR, ruta), "rb") as f:
+        while chunk := await f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parsear_rango(header: Optional[str], tamano: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Interpreta un header HTTP Range de bytes (RFC 7233).
+
+    Args:
+        header: Valor del header Range (por ejemplo "bytes=0-499,1000-")
+        tamano: Tamaño total del archivo en bytes
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: Lista ordenada de rangos (inicio, fin)
+        inclusivos, o None si el archivo debe servirse completo
+
+    Raises:
+        HTTPException: 416 si ninguno de los rangos es satisfacible
+    """
+    if not header:
+        return None
+
+    unidad, _, especificacion = header.partition("=")
+    if unidad.strip().lower() != "bytes" or not especificacion.strip():
+        # Unidad desconocida o header mal formado: se ignora
+        return None
+
+    rangos: List[Tuple[int, int]] = []
+    for parte in especificacion.split(","):
+        parte = parte.strip()
+        match = re.fullmatch(r"(\d*)-(\d*)", parte)
+        if not match or match.group(0) == "-":
+            return None
+        inicio_txt, fin_txt = match.groups()
+
+        if not inicio_txt:
+            # Sufijo: últimos N bytes
+            sufijo = int(fin_txt)
+            # Un archivo vacío no tiene últimos bytes que servir
+            if sufijo == 0 or tamano == 0:
+                continue
+            rangos.append((max(tamano - sufijo, 0), tamano - 1))
+            continue
+
+        inicio = int(inicio_txt)
+        fin = int(fin_txt) if fin_txt else None
+        if fin is not None and fin < inicio:
+            return None
+        if inicio >= tamano:
+            continue
+        if fin is None:
+            fin = tamano - 1
+        rangos.append((inicio, min(fin, tamano - 1)))
+
+    if not rangos:
         raise HTTPException(
-            status_code=500, detail=f"Error al guardar archivo: {str(e)}"
+            status_code=416,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{tamano}"},
         )
 
+    if len(rangos) > MAX_RANGOS:
+        return None
 
-async def abrir(ruta: str) -> StreamingResponse:
+    # Unir rangos superpuestos o contiguos
+    rangos.sort()
+    unidos = [rangos[0]]
+    for inicio, fin in rangos[1:]:
+        ultimo_inicio, ultimo_fin = unidos[-1]
+        if inicio <= ultimo_fin + 1:
+            unidos[-1] = (ultimo_inicio, max(ultimo_fin, fin))
+        else:
+            unidos.append((inicio, fin))
+    return unidos
+
+
+async def _leer_rango(file_path: str, inicio: int, fin: int) -> AsyncGenerator[bytes, None]:
+    """Lee el rango inclusivo [inicio, fin] de un archivo en bloques."""
+    async with aiofiles.open(file_path, mode="rb") as f:
+        await f.seek(inicio)
+        restante = fin - inicio + 1
+        while restante > 0:
+            chunk = await f.read(min(CHUNK_SIZE, restante))
+            if not chunk:
+                break
+            restante -= len(chunk)
+            yield chunk
+
+
+async def abrir(
+    ruta: str, rango: Optional[str] = None, headers: Optional[Dict[str, str]] = None
+) -> Union[StreamingResponse, FileResponse]:
     """
     Abre un archivo y lo retorna como StreamingResponse.
 
+    Si se recibe un header Range válido responde 206 Partial Content con el
+    rango pedido, o multipart/byteranges cuando se piden varios rangos.
+    Con DOWNLOAD_MODE="sendfile" las descargas completas se delegan en un
+    FileResponse; el generador queda como alternativa para rangos.
+
     Args:
         ruta: Ruta relativa del archivo a abrir
+        rango: Valor del header Range de la petición, si lo hay
+        headers: Headers adicionales para la respuesta (ETag, Cache-Control...)
 
     Returns:
-        StreamingResponse: Stream del archivo
+        StreamingResponse | FileResponse: Respuesta con el contenido del archivo
     """
     file_path = os.path.join(UPLOAD_DIR, ruta)
 
@@ -69,21 +378,87 @@ async def abrir(ruta: str) -> StreamingResponse:
         logger.error(f"Archivo no encontrado: {file_path}")
         raise HTTPException(status_code=404, detail="Archivo no encontrado")
 
-    async def file_iterator(file_path: str) -> AsyncGenerator[bytes, None]:
-        async with aiofiles.open(file_path, mode="rb") as f:
-            while chunk := await f.read(1024):
-                yield chunk
-
     try:
         # Guess media type from file extension
         mime_type, _ = mimetypes.guess_type(file_path)
         if not mime_type:
             mime_type = "application/octet-stream"
-        return StreamingResponse(file_iterator(file_path), media_type=mime_type)
+        tamano = os.path.getsize(file_path)
     except Exception as e:
         logger.error(f"Error al abrir archivo: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error al abrir archivo: {str(e)}")
 
+    if rango is None and DOWNLOAD_MODE == "sendfile":
+        # El tamaño se conoce de antemano: el servidor puede usar os.sendfile
+        return FileResponse(
+            file_path,
+            media_type=mime_type,
+            stat_result=os.stat(file_path),
+            headers={**(headers or {}), "Accept-Ranges": "bytes"},
+        )
+
+    rangos = parsear_rango(rango, tamano)
+
+    if rangos is None:
+        return StreamingResponse(
+            _leer_rango(file_path, 0, tamano - 1),
+            media_type=mime_type,
+            headers={
+                **(headers or {}),
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(tamano),
+            },
+        )
+
+    if len(rangos) == 1:
+        inicio, fin = rangos[0]
+        return StreamingResponse(
+            _leer_rango(file_path, inicio, fin),
+            status_code=206,
+            media_type=mime_type,
+            headers={
+                **(headers or {}),
+                "Accept-Ranges": "bytes",
+                "Content-Range": f"bytes {inicio}-{fin}/{tamano}",
+                "Content-Length": str(fin - inicio + 1),
+            },
+        )
+
+    # Varios rangos: multipart/byteranges
+    boundary = uuid.uuid4().hex
+    cabeceras = [
+        (
+            f"--{boundary}\r\n"
+            f"Content-Type: {mime_type}\r\n"
+            f"Content-Range: bytes {inicio}-{fin}/{tamano}\r\n\r\n"
+        ).encode("latin-1")
+        for inicio, fin in rangos
+    ]
+    cierre = f"--{boundary}--\r\n".encode("latin-1")
+    longitud = len(cierre) + sum(
+        len(cabecera) + (fin - inicio + 1) + 2
+        for cabecera, (inicio, fin) in zip(cabeceras, rangos)
+    )
+
+    async def multipart_iterator() -> AsyncGenerator[bytes, None]:
+        for cabecera, (inicio, fin) in zip(cabeceras, rangos):
+            yield cabecera
+            async for chunk in _leer_rango(file_path, inicio, fin):
+                yield chunk
+            yield b"\r\n"
+        yield cierre
+
+    return StreamingResponse(
+        multipart_iterator(),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers={
+            **(headers or {}),
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(longitud),
+        },
+    )
+
 
 async def eliminar(ruta: str) -> None:
     """
@@ -106,3 +481,107 @@ async def eliminar(ruta: str) -> None:
         raise HTTPException(
             status_code=500, detail=f"Error al eliminar archivo: {str(e)}"
         )
+
+
+class AlmacenamientoLocal(Almacenamiento):
+    """Backend sobre el disco local (UPLOAD_DIR), usando las funciones del módulo."""
+
+    async def guardar(
+        self,
+        ruta_temporal: str,
+        ruta: str,
+        tipo: Optional[str] = None,
+        codificacion: Optional[str] = None,
+    ) -> None:
+        # Las sesiones reanudables sin direccionamiento por contenido ya
+        # escriben en su ruta definitiva
+        if ruta_temporal != ruta:
+            await consolidar(ruta_temporal, ruta)
+
+    async def abrir(
+        self,
+        ruta: str,
+        rango: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Union[StreamingResponse, FileResponse]:
+        return await abrir(ruta, rango, headers)
+
+    async def iterar(self, ruta: str) -> AsyncIterator[bytes]:
+        file_path = os.path.join(UPLOAD_DIR, ruta)
+        if not await aios.path.exists(file_path):
+            raise HTTPException(status_code=404, detail="Archivo no encontrado")
+        async for chunk in _leer_rango(file_path, 0, os.path.getsize(file_path) - 1):
+            yield chunk
+
+    async def leer(self, ruta: str) -> bytes:
+        file_path = os.path.join(UPLOAD_DIR, ruta)
+        if not await aios.path.exists(file_path):
+            raise HTTPException(status_code=404, detail="Archivo no encontrado")
+        async with aiofiles.open(file_path, "rb") as f:
+            return await f.read()
+
+    async def eliminar(self, ruta: str) -> None:
+        await eliminar(ruta)
+
+    async def existe(self, ruta: str) -> bool:
+        return await aios.path.exists(os.path.join(UPLOAD_DIR, ruta))
+
+    async def calcular_sha256(self, ruta: str) -> str:
+        return await calcular_sha256(ruta)
+
+    async def listar(self, lote: int = 1000) -> AsyncIterator[List[EntradaAlmacen]]:
+        # Cada lote se arma en un hilo: un único salto por lote, no por archivo
+        async for entradas in iterate_in_threadpool(_listar_lotes(UPLOAD_DIR, lote)):
+            yield entradas
+
+
+def _listar_lotes(raiz: str, lote: int) -> Generator[List[EntradaAlmacen], None, None]:
+    """Recorre `raiz` con os.scandir, manteniendo solo la pila de directorios."""
+    pendientes = [raiz]
+    entradas: List[EntradaAlmacen] = []
+    while pendientes:
+        directorio = pendientes.pop()
+        with os.scandir(directorio) as it:
+            for entrada in it:
+                if entrada.name.startswith("."):
+                    continue
+                if entrada.is_dir(follow_symlinks=False):
+                    pendientes.append(entrada.path)
+                elif entrada.is_file(follow_symlinks=False):
+                    stat = entrada.stat()
+                    ruta = os.path.relpath(entrada.path, raiz).replace(os.sep, "/")
+                    entradas.append(EntradaAlmacen(ruta, stat.st_size, stat.st_mtime))
+                    if len(entradas) >= lote:
+                        yield entradas
+                        entradas = []
+    if entradas:
+        yield entradas
+
+
+def limpiar_temporales(antiguedad: float) -> Tuple[int, int]:
+    """
+    Elimina los temporales de subidas interrumpidas (proceso caído antes de
+    consolidar) con más de `antiguedad` segundos.
+
+    Returns:
+        Tuple[int, int]: cantidad de archivos y bytes liberados
+    """
+    directorio = os.path.join(UPLOAD_DIR, TMP_SUBDIR)
+    limite = time.time() - antiguedad
+    cantidad = liberados = 0
+    if not os.path.isdir(directorio):
+        return 0, 0
+    with os.scandir(directorio) as it:
+        for entrada in it:
+            if not entrada.is_file(follow_symlinks=False):
+                continue
+            stat = entrada.stat()
+            if stat.st_mtime < limite:
+                try:
+                    os.remove(entrada.path)
+                except FileNotFoundError:
+                    continue
+                cantidad += 1
+                liberados += stat.st_size
+                logger.info(f"Temporal abandonado eliminado: {entrada.path}")
+    return cantidad, liberados
@@ -0,0 +1,145 @@
+"""
+Lectura en streaming de un archivo enviado como multipart/form-data.
+
+A diferencia de UploadFile, que Starlette vuelca completo a un temporal antes
+de llamar al endpoint, aquí el cuerpo de la petición se parsea a medida que
+llega y los bytes del archivo se entregan directamente a quien los consume.
+"""
+
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Tamaño máximo de los headers de cada parte (nombres y valores sumados)
+MAX_TAMANO_HEADERS = 16 * 1024
+
+
+class ArchivoMultipart:
+    """Parte de tipo archivo de un cuerpo multipart, leída bajo demanda."""
+
+    def __init__(self, request: Request, campo: str = "file"):
+        content_type, params = parse_options_header(
+            request.headers.get("content-type", "")
+        )
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Se esperaba un cuerpo multipart/form-data",
+            )
+
+        self.campo = campo
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+
+        self._stream = request.stream().__aiter__()
+        self._pendiente: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._tamano_headers = 0
+        self._en_campo = False
+        self._terminado = False
+
+        self._parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    # Callbacks del parser
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._tamano_headers = 0
+
+    def _acumular_header(self, tamano: int) -> None:
+        self._tamano_headers += tamano
+        if self._tamano_headers > MAX_TAMANO_HEADERS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Headers de la parte multipart demasiado grandes",
+            )
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._acumular_header(end - start)
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._acumular_header(end - start)
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, params = parse_options_header(
+            self._headers.get(b"content-disposition", b"")
+        )
+        if self.filename is None and params.get(b"name") == self.campo.encode():
+            self._en_campo = True
+            self.filename = params.get(b"filename", b"").decode("utf-8", "replace")
+            tipo = self._headers.get(b"content-type")
+            self.content_type = tipo.decode("latin-1") if tipo else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._en_campo:
+            self._pendiente.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._en_campo:
+            self._en_campo = False
+            self._terminado = True
+
+    async def _alimentar(self) -> bool:
+        """Pasa el siguiente bloque del cuerpo al parser."""
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._parser.finalize()
+            return False
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cuerpo multipart mal formado",
+            )
+        return True
+
+    async def abrir(self) -> "ArchivoMultipart":
+        """Avanza hasta los headers de la parte del archivo."""
+        while self.filename is None:
+            if not await self._alimentar():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No se ha proporcionado un archivo válido",
+                )
+        return self
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Bytes del archivo, a medida que llegan por la red."""
+        while True:
+            if self._pendiente:
+                data = b"".join(self._pendiente)
+                self._pendiente.clear()
+                yield data
+            if self._terminado:
+                return
+            if not await self._alimentar():
+                if self._pendiente:
+                    continue
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cuerpo multipart incompleto",
+                )
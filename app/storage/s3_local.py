@@ -0,0 +1,185 @@
+"""
+Cliente compatible con el subconjunto de la API S3 de boto3 que usa
+`AlmacenamientoS3`, guardando los objetos en un directorio local.
+
+Sirve para desarrollar y probar el backend S3 sin un servicio de objetos
+(STORAGE_BACKEND=s3-local).
+"""
+
+import os
+import hmac
+import uuid
+import shutil
+import hashlib
+import mimetypes
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+S3_LOCAL_DIR = os.environ.get("S3_LOCAL_DIR", "./uploads-s3")
+S3_LOCAL_URL = os.environ.get("S3_LOCAL_URL", "http://localhost:9000")
+
+
+class ErrorS3(Exception):
+    """Error con la misma forma que botocore.exceptions.ClientError."""
+
+    def __init__(self, codigo: str, mensaje: str):
+        super().__init__(mensaje)
+        self.response = {"Error": {"Code": codigo, "Message": mensaje}}
+
+
+class CuerpoLocal:
+    """Equivalente de botocore StreamingBody sobre un archivo local."""
+
+    def __init__(self, ruta: str, inicio: int, longitud: int):
+        self._archivo = open(ruta, "rb")
+        self._archivo.seek(inicio)
+        self._pendiente = longitud
+
+    def read(self, cantidad: Optional[int] = None) -> bytes:
+        if cantidad is None or cantidad > self._pendiente:
+            cantidad = self._pendiente
+        datos = self._archivo.read(cantidad)
+        self._pendiente -= len(datos)
+        return datos
+
+    def iter_chunks(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        while chunk := self.read(chunk_size):
+            yield chunk
+
+    def close(self) -> None:
+        self._archivo.close()
+
+
+class ClienteS3Local:
+    def __init__(self, directorio: str = S3_LOCAL_DIR, url_base: str = S3_LOCAL_URL):
+        self.directorio = directorio
+        self.url_base = url_base
+        self._clave_firma = uuid.uuid4().bytes
+
+    def _ruta(self, bucket: str, key: str) -> str:
+        return os.path.join(self.directorio, bucket, key)
+
+    def _ruta_subida(self, upload_id: str) -> str:
+        return os.path.join(self.directorio, ".multipart", upload_id)
+
+    def _escribir(self, destino: str, datos: bytes) -> str:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = f"{destino}.{uuid.uuid4().hex}.part"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, destino)
+        return f'"{hashlib.md5(datos).hexdigest()}"'
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs: Any) -> Dict:
+        return {"ETag": self._escribir(self._ruta(Bucket, Key), Body)}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs: Any) -> Dict:
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._ruta_subida(upload_id))
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def upload_part(
+        self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes
+    ) -> Dict:
+        if not os.path.isdir(self._ruta_subida(UploadId)):
+            raise ErrorS3("NoSuchUpload", "La subida multipart no existe")
+        destino = os.path.join(self._ruta_subida(UploadId), f"{PartNumber:05d}")
+        return {"ETag": self._escribir(destino, Body)}
+
+    def complete_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict
+    ) -> Dict:
+        directorio = self._ruta_subida(UploadId)
+        partes: List[Dict] = MultipartUpload["Parts"]
+        destino = self._ruta(Bucket, Key)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = f"{destino}.{UploadId}.part"
+        with open(temporal, "wb") as salida:
+            for parte in sorted(partes, key=lambda p: p["PartNumber"]):
+                with open(
+                    os.path.join(directorio, f"{parte['PartNumber']:05d}"), "rb"
+                ) as entrada:
+                    shutil.copyfileobj(entrada, salida)
+        os.replace(temporal, destino)
+        shutil.rmtree(directorio)
+        return {"Bucket": Bucket, "Key": Key}
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str) -> Dict:
+        shutil.rmtree(self._ruta_subida(UploadId), ignore_errors=True)
+        return {}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict:
+        ruta = self._ruta(Bucket, Key)
+        if not os.path.isfile(ruta):
+            raise ErrorS3("404", "Not Found")
+        # Sin metadatos propios: el tipo se deduce de la extensión
+        tipo, _ = mimetypes.guess_type(Key)
+        return {
+            "ContentLength": os.path.getsize(ruta),
+            "ContentType": tipo or "binary/octet-stream",
+        }
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None) -> Dict:
+        ruta = self._ruta(Bucket, Key)
+        if not os.path.isfile(ruta):
+            raise ErrorS3("NoSuchKey", "The specified key does not exist.")
+        tamano = os.path.getsize(ruta)
+        inicio, fin = 0, tamano - 1
+        if Range:
+            desde, _, hasta = Range.removeprefix("bytes=").partition("-")
+            inicio, fin = int(desde), min(int(hasta), tamano - 1)
+        longitud = fin - inicio + 1
+        return {"Body": CuerpoLocal(ruta, inicio, longitud), "ContentLength": longitud}
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict:
+        try:
+            os.remove(self._ruta(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+    def generate_presigned_url(
+        self, ClientMethod: str, Params: Dict, ExpiresIn: int = 3600
+    ) -> str:
+        ruta = f"/{Params['Bucket']}/{quote(Params['Key'])}"
+        firma = hmac.new(
+            self._clave_firma, f"{ruta}:{ExpiresIn}".encode(), hashlib.sha256
+        ).hexdigest()
+        return f"{self.url_base}{ruta}?X-Amz-Expires={ExpiresIn}&X-Amz-Signature={firma}"
+
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = "",
+        MaxKeys: int = 1000,
+        ContinuationToken: Optional[str] = None,
+    ) -> Dict:
+        raiz = os.path.join(self.directorio, Bucket)
+        claves = []
+        for directorio, _, archivos in os.walk(raiz):
+            for nombre in archivos:
+                if nombre.endswith(".part"):
+                    continue
+                clave = os.path.relpath(os.path.join(directorio, nombre), raiz)
+                clave = clave.replace(os.sep, "/")
+                if clave.startswith(Prefix) and (
+                    ContinuationToken is None or clave > ContinuationToken
+                ):
+                    claves.append(clave)
+        claves.sort()
+
+        contenido = []
+        for clave in claves[:MaxKeys]:
+            stat = os.stat(os.path.join(raiz, clave))
+            contenido.append(
+                {
+                    "Key": clave,
+                    "Size": stat.st_size,
+                    "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                }
+            )
+        respuesta = {"Contents": contenido, "IsTruncated": len(claves) > MaxKeys}
+        if respuesta["IsTruncated"]:
+            respuesta["NextContinuationToken"] = contenido[-1]["Key"]
+        return respuesta
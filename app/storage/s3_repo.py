@@ -0,0 +1,283 @@
+"""
+Backend de almacenamiento sobre un servicio de objetos compatible con S3.
+
+Las llamadas del cliente (boto3 o un doble compatible) son bloqueantes, por lo
+que se ejecutan en el threadpool de Starlette.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from app.storage import local_repo
+from app.storage.backend import Almacenamiento, EntradaAlmacen
+
+logger = logging.getLogger(__name__)
+
+S3_BUCKET = os.environ.get("S3_BUCKET", "archivos")
+S3_PREFIX = os.environ.get("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+S3_REGION = os.environ.get("S3_REGION") or None
+
+# Validez de las URLs prefirmadas; con 0 las descargas pasan por la API
+S3_PRESIGNED_TTL = int(os.environ.get("S3_PRESIGNED_TTL", "300"))
+
+# Tamaño de cada parte de la subida multipart (S3 exige al menos 5 MiB,
+# salvo la última); los archivos más chicos se suben con un único PUT
+S3_PART_SIZE = int(os.environ.get("S3_PART_SIZE", str(8 * 1024 * 1024)))
+
+CODIGOS_NO_EXISTE = {"404", "NoSuchKey", "NotFound"}
+
+
+def crear_cliente() -> Any:
+    """Cliente boto3 configurado a partir del entorno."""
+    try:
+        import boto3
+    except ImportError as e:
+        raise RuntimeError(
+            "STORAGE_BACKEND=s3 requiere el paquete boto3 (pip install boto3)"
+        ) from e
+
+    return boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, region_name=S3_REGION)
+
+
+def _no_existe(error: Exception) -> bool:
+    respuesta = getattr(error, "response", None) or {}
+    return str(respuesta.get("Error", {}).get("Code")) in CODIGOS_NO_EXISTE
+
+
+async def _leer_objeto(cuerpo: Any) -> AsyncGenerator[bytes, None]:
+    try:
+        async for chunk in iterate_in_threadpool(
+            cuerpo.iter_chunks(local_repo.CHUNK_SIZE)
+        ):
+            yield chunk
+    finally:
+        cuerpo.close()
+
+
+class AlmacenamientoS3(Almacenamiento):
+    """
+    Backend S3: subida multipart desde el temporal local y descargas mediante
+    redirección a una URL prefirmada (o a través de la API si está desactivada).
+    """
+
+    def __init__(
+        self,
+        cliente: Any,
+        bucket: str = S3_BUCKET,
+        prefijo: str = S3_PREFIX,
+        ttl_prefirmada: int = S3_PRESIGNED_TTL,
+        tamano_parte: int = S3_PART_SIZE,
+    ):
+        self.cliente = cliente
+        self.bucket = bucket
+        self.prefijo = prefijo
+        self.ttl_prefirmada = ttl_prefirmada
+        self.tamano_parte = tamano_parte
+
+    def _clave(self, ruta: str) -> str:
+        return f"{self.prefijo}{ruta}"
+
+    def _subir(self, origen: str, clave: str, metadatos: Dict[str, str]) -> None:
+        tamano = os.path.getsize(origen)
+        with open(origen, "rb") as f:
+            if tamano <= self.tamano_parte:
+                self.cliente.put_object(
+                    Bucket=self.bucket, Key=clave, Body=f.read(), **metadatos
+                )
+                return
+
+            subida = self.cliente.create_multipart_upload(
+                Bucket=self.bucket, Key=clave, **metadatos
+            )
+            upload_id = subida["UploadId"]
+            partes = []
+            try:
+                while parte := f.read(self.tamano_parte):
+                    respuesta = self.cliente.upload_part(
+                        Bucket=self.bucket,
+                        Key=clave,
+                        UploadId=upload_id,
+                        PartNumber=len(partes) + 1,
+                        Body=parte,
+                    )
+                    partes.append(
+                        {"ETag": respuesta["ETag"], "PartNumber": len(partes) + 1}
+                    )
+                self.cliente.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=clave,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": partes},
+                )
+            except Exception:
+                # Evita que las partes ya subidas queden ocupando espacio
+                self.cliente.abort_multipart_upload(
+                    Bucket=self.bucket, Key=clave, UploadId=upload_id
+                )
+                raise
+
+    async def guardar(
+        self,
+        ruta_temporal: str,
+        ruta: str,
+        tipo: Optional[str] = None,
+        codificacion: Optional[str] = None,
+    ) -> None:
+        origen = os.path.join(local_repo.UPLOAD_DIR, ruta_temporal)
+        metadatos = {"ContentType": tipo or "application/octet-stream"}
+        if codificacion:
+            # Las descargas prefirmadas devuelven el Content-Encoding guardado
+            metadatos["ContentEncoding"] = codificacion
+        await run_in_threadpool(self._subir, origen, self._clave(ruta), metadatos)
+        await local_repo.eliminar(ruta_temporal)
+        logger.info(f"Archivo guardado en s3://{self.bucket}/{self._clave(ruta)}")
+
+    async def abrir(
+        self,
+        ruta: str,
+        rango: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        clave = self._clave(ruta)
+
+        if self.ttl_prefirmada > 0:
+            # El cliente descarga directamente del almacenamiento de objetos,
+            # que también atiende el header Range
+            url = await run_in_threadpool(
+                self.cliente.generate_presigned_url,
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": clave},
+                ExpiresIn=self.ttl_prefirmada,
+            )
+            return RedirectResponse(
+                url, status_code=307, headers={"Cache-Control": "no-store"}
+            )
+
+        try:
+            cabecera = await run_in_threadpool(
+                self.cliente.head_object, Bucket=self.bucket, Key=clave
+            )
+        except Exception as e:
+            if _no_existe(e):
+                raise HTTPException(status_code=404, detail="Archivo no encontrado")
+            raise
+
+        tamano = cabecera["ContentLength"]
+        tipo = cabecera.get("ContentType") or "application/octet-stream"
+        rangos = local_repo.parsear_rango(rango, tamano)
+        respuesta_headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+
+        # Varios rangos se sirven como el archivo completo (RFC 9110 permite
+        # ignorar Range); el caso habitual de un único rango se delega a S3
+        if rangos is not None and len(rangos) == 1:
+            inicio, fin = rangos[0]
+            objeto = await run_in_threadpool(
+                self.cliente.get_object,
+                Bucket=self.bucket,
+                Key=clave,
+                Range=f"bytes={inicio}-{fin}",
+            )
+            respuesta_headers["Content-Range"] = f"bytes {inicio}-{fin}/{tamano}"
+            respuesta_headers["Content-Length"] = str(fin - inicio + 1)
+            return StreamingResponse(
+                _leer_objeto(objeto["Body"]),
+                status_code=206,
+                media_type=tipo,
+                headers=respuesta_headers,
+            )
+
+        objeto = await run_in_threadpool(
+            self.cliente.get_object, Bucket=self.bucket, Key=clave
+        )
+        respuesta_headers["Content-Length"] = str(tamano)
+        return StreamingResponse(
+            _leer_objeto(objeto["Body"]), media_type=tipo, headers=respuesta_headers
+        )
+
+    async def iterar(self, ruta: str) -> AsyncIterator[bytes]:
+        try:
+            objeto = await run_in_threadpool(
+                self.cliente.get_object, Bucket=self.bucket, Key=self._clave(ruta)
+            )
+        except Exception as e:
+            if _no_existe(e):
+                raise HTTPException(status_code=404, detail="Archivo no encontrado")
+            raise
+        async for chunk in _leer_objeto(objeto["Body"]):
+            yield chunk
+
+    def _leer(self, clave: str) -> bytes:
+        objeto = self.cliente.get_object(Bucket=self.bucket, Key=clave)
+        try:
+            return objeto["Body"].read()
+        finally:
+            objeto["Body"].close()
+
+    async def leer(self, ruta: str) -> bytes:
+        try:
+            return await run_in_threadpool(self._leer, self._clave(ruta))
+        except Exception as e:
+            if _no_existe(e):
+                raise HTTPException(status_code=404, detail="Archivo no encontrado")
+            raise
+
+    async def eliminar(self, ruta: str) -> None:
+        # delete_object no falla si la clave no existe
+        await run_in_threadpool(
+            self.cliente.delete_object, Bucket=self.bucket, Key=self._clave(ruta)
+        )
+        logger.info(f"Archivo eliminado: s3://{self.bucket}/{self._clave(ruta)}")
+
+    async def existe(self, ruta: str) -> bool:
+        try:
+            await run_in_threadpool(
+                self.cliente.head_object, Bucket=self.bucket, Key=self._clave(ruta)
+            )
+        except Exception as e:
+            if _no_existe(e):
+                return False
+            raise
+        return True
+
+    def _sha256(self, clave: str) -> str:
+        objeto = self.cliente.get_object(Bucket=self.bucket, Key=clave)
+        digest = hashlib.sha256()
+        try:
+            for chunk in objeto["Body"].iter_chunks(local_repo.WRITE_BUFFER_SIZE):
+                digest.update(chunk)
+        finally:
+            objeto["Body"].close()
+        return digest.hexdigest()
+
+    async def calcular_sha256(self, ruta: str) -> str:
+        return await run_in_threadpool(self._sha256, self._clave(ruta))
+
+    async def listar(self, lote: int = 1000) -> AsyncIterator[List[EntradaAlmacen]]:
+        # Cada página de list_objects_v2 es un lote (S3 devuelve hasta 1000)
+        parametros = {"Bucket": self.bucket, "Prefix": self.prefijo, "MaxKeys": lote}
+        while True:
+            pagina = await run_in_threadpool(
+                self.cliente.list_objects_v2, **parametros
+            )
+            entradas = []
+            for objeto in pagina.get("Contents", []):
+                ruta = objeto["Key"][len(self.prefijo):]
+                if any(parte.startswith(".") for parte in ruta.split("/")):
+                    continue
+                entradas.append(
+                    EntradaAlmacen(
+                        ruta, objeto["Size"], objeto["LastModified"].timestamp()
+                    )
+                )
+            if entradas:
+                yield entradas
+            if not pagina.get("IsTruncated"):
+                break
+            parametros["ContinuationToken"] = pagina["NextContinuationToken"]
@@ -0,0 +1,115 @@
+"""
+Generación de archivos ZIP en streaming.
+
+zipfile admite escribir sobre un destino no posicionable: cada entrada lleva
+un data descriptor tras sus datos y el directorio central se escribe al
+cerrar. Así el ZIP se arma a medida que se envía, sin mantenerlo en memoria
+ni en un temporal: solo se retiene el bloque que se está procesando.
+"""
+
+import os
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.storage.backend import Almacenamiento
+
+# Formatos ya comprimidos: comprimirlos otra vez gasta CPU sin reducir tamaño
+TIPOS_COMPRIMIDOS = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/vnd.rar",
+}
+PREFIJOS_COMPRIMIDOS = ("video/", "audio/")
+# Documentos de ofimática que internamente ya son ZIP
+EXTENSIONES_COMPRIMIDAS = {".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp"}
+
+
+class EntradaZip(NamedTuple):
+    nombre: str
+    ruta: str
+    tamano: int
+    tipo: Optional[str]
+    modificado: datetime
+
+
+class _Salida:
+    """Destino de escritura que acumula lo escrito hasta que se consume."""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def ya_comprimido(tipo: Optional[str], nombre: str) -> bool:
+    tipo = (tipo or "").split(";")[0].strip().lower()
+    return (
+        tipo in TIPOS_COMPRIMIDOS
+        or tipo.startswith(PREFIJOS_COMPRIMIDOS)
+        or os.path.splitext(nombre)[1].lower() in EXTENSIONES_COMPRIMIDAS
+    )
+
+
+def nombres_unicos(nombres: Iterable[str]) -> List[str]:
+    """Nombres seguros para el ZIP (sin directorios) y sin repetidos."""
+    usados: Set[str] = set()
+    resultado = []
+    for nombre in nombres:
+        nombre = nombre.replace("/", "_").replace("\\", "_").strip() or "archivo"
+        base, extension = os.path.splitext(nombre)
+        candidato, n = nombre, 1
+        while candidato.lower() in usados:
+            n += 1
+            candidato = f"{base} ({n}){extension}"
+        usados.add(candidato.lower())
+        resultado.append(candidato)
+    return resultado
+
+
+async def generar_zip(
+    entradas: List[EntradaZip], backend: Almacenamiento
+) -> AsyncIterator[bytes]:
+    """Produce el ZIP de las entradas bloque a bloque."""
+    salida = _Salida()
+    with zipfile.ZipFile(salida, "w", allowZip64=True) as zf:
+        for entrada in entradas:
+            info = zipfile.ZipInfo(
+                entrada.nombre, date_time=entrada.modificado.timetuple()[:6]
+            )
+            # Con el tamaño conocido zipfile decide de antemano si usa ZIP64
+            info.file_size = entrada.tamano
+            comprimir = not ya_comprimido(entrada.tipo, entrada.nombre)
+            info.compress_type = zipfile.ZIP_DEFLATED if comprimir else zipfile.ZIP_STORED
+
+            with zf.open(info, "w") as destino:
+                async for chunk in backend.iterar(entrada.ruta):
+                    if comprimir:
+                        # Deflate es CPU: fuera del event loop
+                        await run_in_threadpool(destino.write, chunk)
+                    else:
+                        destino.write(chunk)
+                    datos = salida.vaciar()
+                    if datos:
+                        yield datos
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+    yield salida.vaciar()
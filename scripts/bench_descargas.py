@@ -0,0 +1,119 @@
+"""
+Benchmark de descargas: compara el modo "stream" (generador aiofiles) con el
+modo "sendfile" (FileResponse) de local_repo.abrir.
+
+"stream-1k" reproduce el generador anterior con lecturas de 1 KiB como
+referencia. Cada modo se ejecuta contra la respuesta ASGI real, descartando el cuerpo, y
+se mide el throughput y el tiempo de CPU del proceso por GB servido. El modo
+"sendfile+pathsend" simula un servidor que soporta la extensión ASGI
+http.response.pathsend y entrega el archivo con os.sendfile a un socket.
+
+Uso:
+    python scripts/bench_descargas.py --mb 256 --repeticiones 5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import local_repo
+
+
+def _drenar(sock: socket.socket) -> threading.Thread:
+    """Consume todo lo que llega al socket en un hilo aparte."""
+
+    def run():
+        while sock.recv(1 << 20):
+            pass
+
+    hilo = threading.Thread(target=run, daemon=True)
+    hilo.start()
+    return hilo
+
+
+async def _servir(ruta: str, pathsend: bool) -> int:
+    response = await local_repo.abrir(ruta)
+    enviados = 0
+    origen, destino = socket.socketpair()
+    hilo = _drenar(destino)
+
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal enviados
+        if message["type"] == "http.response.body":
+            cuerpo = message.get("body", b"")
+            origen.sendall(cuerpo)
+            enviados += len(cuerpo)
+        elif message["type"] == "http.response.pathsend":
+            with open(message["path"], "rb") as f:
+                tamano = os.fstat(f.fileno()).st_size
+                offset = 0
+                while offset < tamano:
+                    offset += os.sendfile(origen.fileno(), f.fileno(), offset, tamano - offset)
+            enviados += tamano
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [],
+        "asgi": {"spec_version": "2.4"},
+        "extensions": {"http.response.pathsend": {}} if pathsend else {},
+    }
+    await response(scope, receive, send)
+    origen.close()
+    hilo.join()
+    destino.close()
+    return enviados
+
+
+async def medir(modo: str, ruta: str, repeticiones: int) -> None:
+    local_repo.DOWNLOAD_MODE = "sendfile" if modo.startswith("sendfile") else "stream"
+    local_repo.CHUNK_SIZE = 1024 if modo == "stream-1k" else 64 * 1024
+    pathsend = modo == "sendfile+pathsend"
+
+    inicio_wall = time.perf_counter()
+    inicio_cpu = time.process_time()
+    total = 0
+    for _ in range(repeticiones):
+        total += await _servir(ruta, pathsend)
+    wall = time.perf_counter() - inicio_wall
+    cpu = time.process_time() - inicio_cpu
+
+    gb = total / 1e9
+    print(
+        f"{modo:<20} {total / wall / 1e6:>10.1f} MB/s "
+        f"{cpu / gb:>10.3f} s CPU/GB {wall:>8.2f} s total"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=int, default=256, help="Tamaño del archivo")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        local_repo.UPLOAD_DIR = directorio
+        ruta = "bench.bin"
+        with open(os.path.join(directorio, ruta), "wb") as f:
+            bloque = os.urandom(1 << 20)
+            for _ in range(args.mb):
+                f.write(bloque)
+
+        print(f"Archivo de {args.mb} MB, {args.repeticiones} descargas por modo")
+        for modo in ("stream-1k", "stream", "sendfile", "sendfile+pathsend"):
+            await medir(modo, ruta, args.repeticiones)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
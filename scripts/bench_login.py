@@ -0,0 +1,155 @@
+"""
+Benchmark de latencia de las lecturas públicas durante una ráfaga de logins.
+
+Levanta la aplicación en el mismo proceso (httpx + ASGITransport, un único
+event loop como un worker de uvicorn) sobre una base SQLite temporal y mide
+la latencia de GET /publicaciones/ mientras varios clientes hacen login sin
+parar. Se comparan tres escenarios:
+
+  - sin-logins: referencia, solo lecturas;
+  - bloqueante: bcrypt en el event loop (el comportamiento anterior);
+  - pool: bcrypt en el pool de hilos de app.security.
+
+Con bcrypt en el event loop cada login congela todas las demás peticiones
+del worker, y el p99 de las lecturas crece con la cantidad de logins
+concurrentes; con el pool se mantiene cerca de la referencia.
+
+Uso:
+    python scripts/bench_login.py --logins 16 --segundos 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# La aplicación usa la base temporal del benchmark (dependency_overrides)
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+# La ráfaga sale de una sola IP: sin límite de intentos de login
+os.environ.setdefault("LOGIN_MAX_PER_IP", "0")
+os.environ.setdefault("LOGIN_MAX_PER_USER", "0")
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app import security
+from app.deps import get_async_session
+from app.main import app
+from app.models.models import Publicacion
+from app.services import auth_service
+
+USUARIO = "bench"
+CLAVE = "bench-password"
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def _verificar_en_el_loop(password: str, hash_: str) -> bool:
+    return security.verify_password(password, hash_)
+
+
+async def lector(cliente: AsyncClient, fin: float, latencias: List[float]) -> None:
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        r = await cliente.get("/publicaciones/?limit=20")
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        assert r.status_code == 200
+        # Ritmo de un cliente real, no un bucle cerrado
+        await asyncio.sleep(0.01)
+
+
+async def login(cliente: AsyncClient, fin: float, contador: List[int]) -> None:
+    while time.perf_counter() < fin:
+        r = await cliente.post(
+            "/auth/login", json={"username": USUARIO, "password": CLAVE}
+        )
+        assert r.status_code == 200
+        contador[0] += 1
+
+
+async def escenario(
+    cliente: AsyncClient, nombre: str, logins: int, lectores: int, segundos: float
+) -> None:
+    original = auth_service.verify_password_async
+    if nombre == "bloqueante":
+        auth_service.verify_password_async = _verificar_en_el_loop
+    try:
+        latencias: List[float] = []
+        contador = [0]
+        fin = time.perf_counter() + segundos
+        await asyncio.gather(
+            *[lector(cliente, fin, latencias) for _ in range(lectores)],
+            *[login(cliente, fin, contador) for _ in range(logins)],
+        )
+    finally:
+        auth_service.verify_password_async = original
+
+    print(
+        f"{nombre:>11} {len(latencias):>8} {percentil(latencias, 0.5):>9.1f} "
+        f"{percentil(latencias, 0.99):>9.1f} {max(latencias):>9.1f} "
+        f"{contador[0] / segundos:>9.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(directorio, 'bench.db')}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        fabrica = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def sesion():
+            async with fabrica() as db:
+                yield db
+
+        app.dependency_overrides[get_async_session] = sesion
+
+        async with fabrica() as db:
+            await auth_service.create_admin(db, USUARIO, CLAVE)
+            db.add_all(
+                [Publicacion(titulo=f"Publicación {i}", anio=2000) for i in range(100)]
+            )
+            await db.commit()
+
+        print(
+            f"{args.logins} clientes de login, {args.lectores} lectores, "
+            f"{security.PASSWORD_HASH_WORKERS} hilos de bcrypt"
+        )
+        print(
+            f"{'escenario':>11} {'lecturas':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+            f"{'máx (ms)':>9} {'logins/s':>9}"
+        )
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as cliente:
+            for nombre in ("sin-logins", "bloqueante", "pool"):
+                logins = 0 if nombre == "sin-logins" else args.logins
+                await escenario(
+                    cliente, nombre, logins, args.lectores, args.segundos
+                )
+
+        app.dependency_overrides.clear()
+        security.cerrar_pool()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
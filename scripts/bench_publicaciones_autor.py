@@ -0,0 +1,130 @@
+"""
+Benchmark del filtro de publicaciones por autor.
+
+Compara el filtrado anterior (página por OFFSET y filtro de `authors` en
+Python) con el filtro en SQL sobre la tabla publicacionautor, paginando por
+cursor. Se mide el tiempo de pedir la página N de las publicaciones de un
+autor a distintas profundidades: con el índice el tiempo no depende ni de la
+profundidad ni del tamaño de la tabla.
+
+Uso:
+    python scripts/bench_publicaciones_autor.py --publicaciones 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.models.models import Personal, Publicacion, PublicacionAutor
+from app.paginacion import codificar_cursor
+from app.services import publicaciones_service as svc
+
+
+async def poblar(db: AsyncSession, publicaciones: int, autores: int) -> None:
+    await db.execute(
+        insert(Personal), [{"nombre": f"Autor {i}"} for i in range(1, autores + 1)]
+    )
+    filas, enlaces = [], []
+    for pid in range(1, publicaciones + 1):
+        ids = random.sample(range(1, autores + 1), k=random.randint(1, 3))
+        filas.append(
+            {
+                "id": pid,
+                "titulo": f"Publicación {pid}",
+                "anio": random.randint(1990, 2025),
+                "authors": [{"name": f"Autor {i}", "personal_id": i} for i in ids],
+            }
+        )
+        enlaces.extend({"publicacion_id": pid, "personal_id": i} for i in ids)
+    await db.execute(insert(Publicacion), filas)
+    await db.execute(insert(PublicacionAutor), enlaces)
+    await db.commit()
+
+
+async def pagina_en_python(db, autor_id: int, pagina: int, limit: int) -> int:
+    """Filtro anterior: hay que recorrer la tabla hasta juntar la página."""
+    encontradas, offset = [], 0
+    while len(encontradas) < (pagina + 1) * limit:
+        lote = (
+            (await db.execute(select(Publicacion).offset(offset).limit(limit)))
+            .scalars()
+            .all()
+        )
+        if not lote:
+            break
+        encontradas.extend(
+            p
+            for p in lote
+            if any(a.get("personal_id") == autor_id for a in p.authors)
+        )
+        offset += limit
+        db.expunge_all()
+    return len(encontradas[pagina * limit : (pagina + 1) * limit])
+
+
+async def pagina_indexada(db, autor_id: int, cursor, limit: int):
+    filas = await svc.listar_publicaciones(
+        db, limit=limit, cursor=cursor, autor_id=autor_id
+    )
+    db.expunge_all()
+    return filas
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--publicaciones", type=int, default=100_000)
+    parser.add_argument("--autores", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--paginas", type=int, default=10)
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(directorio, 'bench.db')}"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        fabrica = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async with fabrica() as db:
+            inicio = time.perf_counter()
+            await poblar(db, args.publicaciones, args.autores)
+            print(
+                f"{args.publicaciones} publicaciones, {args.autores} autores "
+                f"(carga {time.perf_counter() - inicio:.1f} s)"
+            )
+            autor_id = 1
+
+            print(f"{'página':>6} {'python (ms)':>12} {'indexado (ms)':>14}")
+            cursor = None
+            for pagina in range(args.paginas):
+                inicio = time.perf_counter()
+                await pagina_en_python(db, autor_id, pagina, args.limit)
+                python_ms = (time.perf_counter() - inicio) * 1000
+
+                inicio = time.perf_counter()
+                filas = await pagina_indexada(db, autor_id, cursor, args.limit)
+                indexado_ms = (time.perf_counter() - inicio) * 1000
+                print(f"{pagina:>6} {python_ms:>12.2f} {indexado_ms:>14.2f}")
+
+                if len(filas) < args.limit:
+                    break
+                cursor = codificar_cursor(filas[-1], svc.ORDEN_PUBLICACIONES)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Micro-benchmark de la serialización de los listados, por entidad.
+
+Arma en memoria una página de filas ORM (sin base) y mide, para el
+response_model de cada listado, cuánto cuesta pasar de las filas a los bytes
+del cuerpo JSON por cada camino:
+
+  - jsonable_encoder: jsonable_encoder + json.dumps, lo que hace FastAPI en
+    las rutas sin response_model;
+  - fastapi<0.130: validación + dump_python(mode="json") + json.dumps, el
+    camino de las rutas con response_model en versiones anteriores;
+  - dump_json: validación + TypeAdapter.dump_json en una sola pasada en Rust,
+    lo que hace FastAPI >= 0.130 con response_model y la clase de respuesta
+    por defecto (el de la aplicación);
+  - orjson: validación + dump_python + orjson.dumps, lo que haría una clase de
+    respuesta propia con orjson (solo si está instalado).
+
+Todos los tiempos incluyen la validación de las filas con el response_model,
+que ningún camino con response_model evita.
+
+Uso:
+    python scripts/bench_serializacion.py --filas 100 --repeticiones 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.blog import BlogPost
+from app.models.models import Equipamiento, Publicacion
+from app.schemas.blog import BlogPostRead
+from app.schemas.equipamiento import EquipamientoRead
+from app.schemas.publicaciones import PublicacionRead
+
+try:
+    import orjson
+except ImportError:  # opcional, solo para comparar
+    orjson = None
+
+
+def _json(contenido) -> bytes:
+    # Mismos parámetros que JSONResponse.render
+    return json.dumps(
+        contenido,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def publicaciones(n: int) -> list:
+    ahora = datetime.now(timezone.utc)
+    return [
+        Publicacion(
+            id=i,
+            titulo=f"Publicación {i} sobre materiales compuestos y ensayos",
+            cita_formateada="Apellido, N., Otro, M. (2020). Título largo. " * 4,
+            doi_url=f"https://doi.org/10.1000/{i}",
+            anio=2000 + i % 25,
+            estado="publicado",
+            authors=[{"name": f"Autor {j}", "personal_id": j} for j in range(3)],
+            fecha_registro=ahora,
+            created_at=ahora,
+            updated_at=ahora,
+        )
+        for i in range(n)
+    ]
+
+
+def posts(n: int) -> list:
+    ahora = datetime.now(timezone.utc)
+    return [
+        BlogPost(
+            id=i,
+            titulo=f"Post {i}",
+            contenido="Lorem ipsum dolor sit amet, consectetur adipiscing. " * 100,
+            resumen="Resumen del post con algunas líneas de texto. " * 4,
+            autor="Laboratorio",
+            tags="noticias,investigación",
+            publicado=True,
+            fecha_publicacion=ahora,
+            created_at=ahora,
+            updated_at=ahora,
+        )
+        for i in range(n)
+    ]
+
+
+def equipamiento(n: int) -> list:
+    ahora = datetime.now(timezone.utc)
+    return [
+        Equipamiento(
+            id=i,
+            nombre=f"Equipo {i}",
+            marca="Marca",
+            modelo=f"M-{i}",
+            n_serie=f"SN{i:06d}",
+            fecha_adquisicion=date(2020, 1, 1),
+            estado="operativo",
+            ubicacion="Laboratorio 1",
+            created_at=ahora,
+            updated_at=ahora,
+        )
+        for i in range(n)
+    ]
+
+
+ENTIDADES = [
+    ("publicaciones", PublicacionRead, publicaciones),
+    ("blog", BlogPostRead, posts),
+    ("equipamiento", EquipamientoRead, equipamiento),
+]
+
+
+def medir(funcion: Callable[[], bytes], repeticiones: int) -> float:
+    """Milisegundos por llamada."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def caminos(modelo, filas: list) -> List[tuple]:
+    adaptador = TypeAdapter(List[modelo])
+
+    def validar():
+        return adaptador.validate_python(filas, from_attributes=True)
+
+    resultado = [
+        (
+            "jsonable_encoder",
+            lambda: _json(jsonable_encoder([modelo.model_validate(f) for f in filas])),
+        ),
+        (
+            "fastapi<0.130",
+            lambda: _json(adaptador.dump_python(validar(), mode="json")),
+        ),
+        ("dump_json", lambda: adaptador.dump_json(validar())),
+    ]
+    if orjson is not None:
+        resultado.append(
+            ("orjson", lambda: orjson.dumps(adaptador.dump_python(validar())))
+        )
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filas", type=int, default=100)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.filas} filas por página, {args.repeticiones} repeticiones")
+    print(
+        f"{'entidad':>13} {'camino':>16} {'ms/página':>10} {'KiB':>7} "
+        f"{'vs dump_json':>12}"
+    )
+    for nombre, modelo, fabrica in ENTIDADES:
+        filas = fabrica(args.filas)
+        medidas = [
+            (camino, medir(funcion, args.repeticiones), len(funcion()))
+            for camino, funcion in caminos(modelo, filas)
+        ]
+        referencia = dict((camino, ms) for camino, ms, _ in medidas)["dump_json"]
+        for camino, ms, tamano in medidas:
+            print(
+                f"{nombre:>13} {camino:>16} {ms:>10.2f} {tamano / 1024:>7.1f} "
+                f"{ms / referencia:>11.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -22,4 +23,5 @@ if __name__ == "__main__":
         os.environ["DATABASE_URL"] = sync_url
     SessionLocal = get_sync_session_local()
     with SessionLocal() as s:
-        create_admin(s, "admin", "admin123")  # type: ignore
+        # create_admin es async (el hash corre en el pool de bcrypt)
+        asyncio.run(create_admin(s, "admin", "admin123"))  # type: ignore
@@ -0,0 +1,44 @@
+"""
+Worker de la cola de correos salientes (newsletter de posts).
+
+Debe correr como proceso aparte de la API, por ejemplo como servicio de
+systemd o contenedor propio. Con Postgres pueden correr varios en paralelo.
+
+Uso:
+    python scripts/enviar_correos.py [--espera 5] [--una-vez]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import async_session_factory
+from app.services import cola_correo_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--espera",
+        type=float,
+        default=5.0,
+        help="segundos entre consultas cuando la cola está vacía",
+    )
+    parser.add_argument(
+        "--una-vez", action="store_true", help="termina al vaciar la cola"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        cola_correo_service.ejecutar_worker(
+            async_session_factory, espera=args.espera, una_vez=args.una_vez
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
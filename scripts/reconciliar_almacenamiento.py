@@ -0,0 +1,77 @@
+"""
+Reconciliación entre la tabla Archivo y el almacenamiento configurado.
+
+Sin opciones solo informa; las eliminaciones deben pedirse explícitamente.
+Para ejecutarlo de forma periódica puede usarse --cada, o programarlo con cron:
+
+    0 3 * * * cd /srv/api && python scripts/reconciliar_almacenamiento.py --eliminar-blobs
+
+Uso:
+    python scripts/reconciliar_almacenamiento.py [--eliminar-blobs]
+        [--eliminar-registros] [--verificar-checksums] [--lote 1000]
+        [--antiguedad 3600] [--cada SEGUNDOS]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import async_session_factory
+from app.services import integridad_service
+
+
+async def ejecutar(args: argparse.Namespace) -> None:
+    while True:
+        async with async_session_factory() as db:
+            informe = await integridad_service.reconciliar(
+                db,
+                eliminar_blobs=args.eliminar_blobs,
+                eliminar_registros=args.eliminar_registros,
+                verificar_checksums=args.verificar_checksums,
+                tamano_lote=args.lote,
+                antiguedad_minima=args.antiguedad,
+            )
+        print(json.dumps(dataclasses.asdict(informe), indent=2), flush=True)
+
+        if not args.cada:
+            break
+        await asyncio.sleep(args.cada)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--eliminar-blobs",
+        action="store_true",
+        help="elimina blobs huérfanos, temporales y subidas reanudables abandonadas",
+    )
+    parser.add_argument(
+        "--eliminar-registros",
+        action="store_true",
+        help="elimina registros Archivo cuyo blob no existe",
+    )
+    parser.add_argument(
+        "--verificar-checksums",
+        action="store_true",
+        help="recalcula el SHA-256 de cada blob referenciado",
+    )
+    parser.add_argument("--lote", type=int, default=integridad_service.TAMANO_LOTE)
+    parser.add_argument(
+        "--antiguedad",
+        type=float,
+        default=integridad_service.ANTIGUEDAD_MINIMA,
+        help="segundos mínimos de antigüedad para eliminar un blob huérfano",
+    )
+    parser.add_argument(
+        "--cada", type=float, default=0, help="repite la reconciliación cada N segundos"
+    )
+    asyncio.run(ejecutar(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
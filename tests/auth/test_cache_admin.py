@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event
+
+# Endpoint solo para admins: 404 si el token es válido, 401 si no
+PROTEGIDO = "/archivos/uploads/no-existe"
+
+
+async def _login(client, username, password):
+    r = await client.post(
+        "/auth/login", json={"username": username, "password": password}
+    )
+    assert r.status_code == 200
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.mark.anyio
+async def test_token_cacheado_no_consulta_admin(client, db):
+    from app.services.auth_service import create_admin
+
+    await create_admin(db, "cache-consultas", "secret")
+    headers = await _login(client, "cache-consultas", "secret")
+
+    consultas = []
+
+    def registrar(conn, cursor, sentencia, parametros, contexto, multiples):
+        if "FROM admin" in sentencia:
+            consultas.append(sentencia)
+
+    motor = db.get_bind()
+    event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        for _ in range(3):
+            r = await client.get(PROTEGIDO, headers=headers)
+            assert r.status_code == 404
+    finally:
+        event.remove(motor, "before_cursor_execute", registrar)
+    # Solo la primera petición carga el admin
+    assert len(consultas) == 1
+
+
+@pytest.mark.anyio
+async def test_cambio_de_password_invalida_tokens(client, db):
+    from app.services.auth_service import create_admin
+
+    await create_admin(db, "cache-password", "secret")
+    viejo = await _login(client, "cache-password", "secret")
+    assert (await client.get(PROTEGIDO, headers=viejo)).status_code == 404
+
+    r = await client.post(
+        "/auth/password",
+        json={"current_password": "incorrecta", "new_password": "nueva-clave"},
+        headers=viejo,
+    )
+    assert r.status_code == 401
+
+    r = await client.post(
+        "/auth/password",
+        json={"current_password": "secret", "new_password": "nueva-clave"},
+        headers=viejo,
+    )
+    assert r.status_code == 200
+    nuevo = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    assert (await client.get(PROTEGIDO, headers=viejo)).status_code == 401
+    assert (await client.get(PROTEGIDO, headers=nuevo)).status_code == 404
+    await _login(client, "cache-password", "nueva-clave")
+
+
+@pytest.mark.anyio
+async def test_admin_eliminado_pierde_acceso(client, db):
+    from app.services.auth_service import create_admin, eliminar_admin
+
+    admin = await create_admin(db, "cache-borrado", "secret")
+    headers = await _login(client, "cache-borrado", "secret")
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+
+    assert await eliminar_admin(db, admin.id)
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 401
+
+
+@pytest.mark.anyio
+async def test_cambio_de_password_de_admin_eliminado_en_otro_worker(client, db):
+    from sqlalchemy import delete
+
+    from app.models import Admin
+    from app.services.auth_service import create_admin
+
+    admin = await create_admin(db, "cache-borrado-otro", "secret")
+    headers = await _login(client, "cache-borrado-otro", "secret")
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+
+    # Eliminado por otro worker: esta caché todavía lo da por válido
+    await db.execute(delete(Admin).where(Admin.id == admin.id))
+    await db.commit()
+    db.expunge_all()
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+
+    r = await client.post(
+        "/auth/password",
+        json={"current_password": "secret", "new_password": "nueva-clave"},
+        headers=headers,
+    )
+    assert r.status_code == 401
@@ -0,0 +1,102 @@
+import pytest
+
+from app import limite_login, security
+
+
+async def _login(client, username, password):
+    return await client.post(
+        "/auth/login", json={"username": username, "password": password}
+    )
+
+
+@pytest.fixture
+def verificaciones(monkeypatch):
+    llamadas = []
+    verificar = security.verify_password
+
+    def contar(password, hash_):
+        llamadas.append(password)
+        return verificar(password, hash_)
+
+    monkeypatch.setattr(security, "verify_password", contar)
+    return llamadas
+
+
+@pytest.mark.anyio
+async def test_limite_por_usuario_rechaza_antes_de_bcrypt(
+    client, db, monkeypatch, verificaciones
+):
+    from app.services.auth_service import create_admin
+
+    monkeypatch.setattr(limite_login, "LOGIN_MAX_PER_USER", 3)
+    await create_admin(db, "limite-usuario", "secret")
+
+    for _ in range(3):
+        assert (await _login(client, "limite-usuario", "mala")).status_code == 401
+    r = await _login(client, "Limite-Usuario", "secret")
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= limite_login.LOGIN_WINDOW_SECONDS
+    assert len(verificaciones) == 3
+
+    # Otro usuario desde la misma IP no queda bloqueado
+    assert (await _login(client, "otro-usuario", "x")).status_code == 401
+
+
+@pytest.mark.anyio
+async def test_login_correcto_reinicia_el_usuario(client, db, monkeypatch):
+    from app.services.auth_service import create_admin
+
+    monkeypatch.setattr(limite_login, "LOGIN_MAX_PER_USER", 2)
+    await create_admin(db, "limite-reinicio", "secret")
+
+    assert (await _login(client, "limite-reinicio", "mala")).status_code == 401
+    assert (await _login(client, "limite-reinicio", "secret")).status_code == 200
+    assert (await _login(client, "limite-reinicio", "mala")).status_code == 401
+    assert (await _login(client, "limite-reinicio", "secret")).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_limite_por_ip(client, monkeypatch, verificaciones):
+    monkeypatch.setattr(limite_login, "LOGIN_MAX_PER_IP", 4)
+
+    for i in range(4):
+        assert (await _login(client, f"ip-{i}", "x")).status_code == 401
+    r = await _login(client, "ip-nuevo", "x")
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+
+
+@pytest.mark.anyio
+async def test_backend_db_compartido(db):
+    backend = limite_login.LimiteBaseDatos()
+    clave = "usuario:backend-db"
+    assert await backend.intentar(db, clave, 2, 60) == 0
+    assert await backend.intentar(db, clave, 2, 60) == 0
+    espera = await backend.intentar(db, clave, 2, 60)
+    assert 0 < espera <= 60
+
+    # Otro worker (otra instancia) ve los mismos intentos
+    assert await limite_login.LimiteBaseDatos().intentar(db, clave, 2, 60) > 0
+
+    await backend.reiniciar(db, clave)
+    assert await backend.intentar(db, clave, 2, 60) == 0
+
+
+@pytest.mark.anyio
+async def test_backend_memoria_acotado(monkeypatch):
+    monkeypatch.setattr(limite_login, "MAX_CLAVES_MEMORIA", 100)
+    limite = limite_login.LimiteMemoria()
+
+    # Una clave activa que se sigue usando no se descarta
+    assert await limite.intentar(None, "ip:atacante", 1000, 900) == 0
+    for i in range(1000):
+        assert await limite.intentar(None, f"usuario:inventado-{i}", 10, 900) == 0
+        await limite.intentar(None, "ip:atacante", 1000, 900)
+        assert len(limite._intentos) <= 100
+    assert "ip:atacante" in limite._intentos
+
+    # Un intento rechazado no registra nada
+    assert await limite.intentar(None, "usuario:lleno", 1, 900) == 0
+    antes = {clave: len(m) for clave, m in limite._intentos.items()}
+    assert await limite.intentar(None, "usuario:lleno", 1, 900) > 0
+    assert {clave: len(m) for clave, m in limite._intentos.items()} == antes
@@ -16,3 +16,32 @@ async def test_login_and_protected(client, db):
     headers = {"Authorization": f"Bearer {token}"}
     r2 = await client.get("/personal/", headers=headers)
     assert r2.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_login_verifica_fuera_del_event_loop(client, db, monkeypatch):
+    import threading
+
+    from app import security
+    from app.services.auth_service import create_admin
+
+    hilos = []
+    verificar = security.verify_password
+
+    def verificar_registrando(password, hash_):
+        hilos.append(threading.current_thread().name)
+        return verificar(password, hash_)
+
+    monkeypatch.setattr(security, "verify_password", verificar_registrando)
+    await create_admin(db, "hilos", "secret")
+
+    r = await client.post(
+        "/auth/login", json={"username": "hilos", "password": "secret"}
+    )
+    assert r.status_code == 200
+    r = await client.post(
+        "/auth/login", json={"username": "hilos", "password": "otra"}
+    )
+    assert r.status_code == 401
+    assert len(hilos) == 2
+    assert all(nombre.startswith("bcrypt") for nombre in hilos)
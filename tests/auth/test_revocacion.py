@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app import revocacion
+from app.models import TokenRevocado
+from app.security import decode_token
+
+# Endpoint solo para admins: 404 si el token es válido, 401 si no
+PROTEGIDO = "/archivos/uploads/no-existe"
+
+
+async def _login(client, db, username):
+    from app.services.auth_service import create_admin
+
+    await create_admin(db, username, "secret")
+    r = await client.post(
+        "/auth/login", json={"username": username, "password": "secret"}
+    )
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def test_filtro_bloom():
+    filtro = revocacion.FiltroBloom(1 << 14, 7)
+    agregados = [f"agregado-{i}" for i in range(1000)]
+    for valor in agregados:
+        filtro.agregar(valor)
+    assert all(valor in filtro for valor in agregados)
+    falsos = sum(f"ausente-{i}" in filtro for i in range(10_000))
+    # ~1 % esperado con 16 bits por elemento y 7 hashes
+    assert falsos < 300
+
+
+@pytest.mark.anyio
+async def test_logout_revoca_solo_ese_token(client, db):
+    token = await _login(client, db, "revocacion-logout")
+    otro = await _login(client, db, "revocacion-logout-2")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+
+    r = await client.post("/auth/logout", headers=headers)
+    assert r.status_code == 204
+    r = await client.get(PROTEGIDO, headers=headers)
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token revocado"
+
+    r = await client.get(PROTEGIDO, headers={"Authorization": f"Bearer {otro}"})
+    assert r.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_revocacion_de_otro_worker_sin_consultar_en_cada_peticion(
+    client, db, monkeypatch
+):
+    token = await _login(client, db, "revocacion-worker")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+
+    consultas = []
+
+    def registrar(conn, cursor, sentencia, parametros, contexto, multiples):
+        if "FROM tokenrevocado" in sentencia:
+            consultas.append(sentencia)
+
+    motor = db.get_bind()
+    event.listen(motor, "before_cursor_execute", registrar)
+    try:
+        for _ in range(3):
+            assert (await client.get(PROTEGIDO, headers=headers)).status_code == 404
+        assert consultas == []
+
+        # Otro worker revoca el token: solo se ve al vencer el refresco
+        db.add(
+            TokenRevocado(
+                jti=decode_token(token)["jti"],
+                expira=datetime.now(timezone.utc) + timedelta(hours=1),
+            )
+        )
+        await db.commit()
+        monkeypatch.setattr(revocacion._estado, "proximo_refresco", 0.0)
+        assert (await client.get(PROTEGIDO, headers=headers)).status_code == 401
+        assert len(consultas) == 1
+    finally:
+        event.remove(motor, "before_cursor_execute", registrar)
+
+
+@pytest.mark.anyio
+async def test_refresco_ve_ids_confirmados_fuera_de_orden(db, monkeypatch):
+    from sqlalchemy import func, select
+
+    await revocacion.actualizar(db)
+    maximo = (await db.execute(select(func.max(TokenRevocado.id)))).scalar() or 0
+    expira = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    # B (id mayor) se confirma antes que A, que tomó su id primero
+    db.add(TokenRevocado(id=maximo + 20, jti="desorden-b", expira=expira))
+    await db.commit()
+    monkeypatch.setattr(revocacion._estado, "proximo_refresco", 0.0)
+    await revocacion.actualizar(db)
+    assert revocacion.revocado("desorden-b")
+    assert revocacion._estado.ultimo_id == maximo + 20
+
+    db.add(TokenRevocado(id=maximo + 10, jti="desorden-a", expira=expira))
+    await db.commit()
+    assert not revocacion.revocado("desorden-a")
+    monkeypatch.setattr(revocacion._estado, "proximo_refresco", 0.0)
+    await revocacion.actualizar(db)
+    assert revocacion.revocado("desorden-a")
@@ -72,6 +72,30 @@ def _init_app_db():
     asyncio.get_event_loop().run_until_complete(app.db.init_db())
 
 
+@pytest.fixture(autouse=True)
+def _sesiones_en_segundo_plano(monkeypatch):
+    # Las tareas en segundo plano abren su propia sesión sobre la base de tests
+    import app.db
+
+    monkeypatch.setattr(app.db, "async_session_factory", async_session_factory)
+
+
+@pytest.fixture(autouse=True)
+def _limite_login(monkeypatch):
+    # Cada test empieza sin intentos de login registrados
+    from app import limite_login
+
+    monkeypatch.setattr(limite_login, "_instancia", limite_login.LimiteMemoria())
+
+
+@pytest.fixture(autouse=True)
+def _cache_respuestas():
+    # Los tests escriben directamente en la base, sin pasar por los servicios
+    from app import cache_respuestas
+
+    cache_respuestas.limpiar()
+
+
 @pytest.fixture
 async def auth_headers(client, db):
     from app.services.auth_service import create_admin
@@ -0,0 +1,389 @@
+import pytest
+from pathlib import Path
+from httpx import AsyncClient
+
+from app.storage import local_repo
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_subida_reanudable(client: AsyncClient, auth_headers, upload_dir):
+    contenido = b"0123456789" * 1000
+
+    response = await client.post(
+        "/archivos/uploads",
+        json={"nombre": "datos.csv", "tamano": len(contenido), "tipo": "text/csv"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    sesion = response.json()
+    assert sesion["recibido"] == 0
+    url = f"/archivos/uploads/{sesion['id']}"
+
+    # Primer fragmento
+    response = await client.put(
+        f"{url}?offset=0", content=contenido[:4000], headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["recibido"] == 4000
+
+    # Un offset que no coincide con lo recibido se rechaza
+    response = await client.put(
+        f"{url}?offset=1000", content=contenido[1000:2000], headers=auth_headers
+    )
+    assert response.status_code == 409
+    assert response.headers["upload-offset"] == "4000"
+
+    # No se puede completar una subida a medias
+    response = await client.post(f"{url}/completar", headers=auth_headers)
+    assert response.status_code == 409
+
+    # Retomar desde el estado guardado en el servidor
+    response = await client.get(url, headers=auth_headers)
+    offset = response.json()["recibido"]
+    response = await client.put(
+        f"{url}?offset={offset}", content=contenido[offset:], headers=auth_headers
+    )
+    assert response.json()["recibido"] == len(contenido)
+
+    response = await client.post(f"{url}/completar", headers=auth_headers)
+    assert response.status_code == 201
+    archivo = response.json()
+    assert archivo["nombre"] == "datos.csv"
+    assert archivo["tamano"] == len(contenido)
+    assert (upload_dir / archivo["ruta"]).read_bytes() == contenido
+
+    # La sesión ya no existe
+    response = await client.get(url, headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_subida_reanudable_limites(client: AsyncClient, auth_headers, upload_dir):
+    response = await client.post(
+        "/archivos/uploads",
+        json={"nombre": "enorme.bin", "tamano": 51 * 1024 * 1024},
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+
+    response = await client.post(
+        "/archivos/uploads",
+        json={"nombre": "chico.bin", "tamano": 10},
+        headers=auth_headers,
+    )
+    url = f"/archivos/uploads/{response.json()['id']}"
+
+    # Más bytes que los declarados
+    response = await client.put(f"{url}?offset=0", content=b"x" * 11, headers=auth_headers)
+    assert response.status_code == 413
+
+    response = await client.delete(url, headers=auth_headers)
+    assert response.status_code == 204
+    assert list(upload_dir.iterdir()) == []
+
+
+@pytest.mark.anyio
+async def test_upload_streaming(client: AsyncClient, auth_headers, upload_dir):
+    import hashlib
+
+    contenido = b"%PDF-1.7\n" + b"x" * 300_000
+    response = await client.post(
+        "/archivos/upload",
+        data={"descripcion": "campo previo al archivo"},
+        # Content-Type genérico: el tipo se detecta por el contenido
+        files={"file": ("programa.pdf", contenido, "application/octet-stream")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    archivo = response.json()
+    assert archivo["nombre"] == "programa.pdf"
+    assert archivo["tamano"] == len(contenido)
+    assert archivo["tipo"] == "application/pdf"
+    assert archivo["sha256"] == hashlib.sha256(contenido).hexdigest()
+    assert (upload_dir / archivo["ruta"]).read_bytes() == contenido
+
+    response = await client.get(f"/archivos/download/{archivo['id']}")
+    assert response.content == contenido
+
+
+@pytest.mark.anyio
+async def test_upload_excede_tamano_maximo(
+    client: AsyncClient, auth_headers, upload_dir, monkeypatch
+):
+    from app.services import archivos_service
+
+    monkeypatch.setattr(archivos_service, "MAX_FILE_SIZE", 100_000)
+    response = await client.post(
+        "/archivos/upload",
+        files={"file": ("grande.bin", b"y" * 200_000, "application/octet-stream")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+    # No quedan temporales ni archivos a medias
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+
+
+@pytest.mark.anyio
+async def test_upload_sin_archivo(client: AsyncClient, auth_headers, upload_dir):
+    response = await client.post(
+        "/archivos/upload", data={"otro": "valor"}, files={"x": ("a.txt", b"a")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_upload_multipart_invalido(client: AsyncClient, auth_headers, upload_dir):
+    from app.storage import multipart_stream
+
+    tipo = {"Content-Type": "multipart/form-data; boundary=limite", **auth_headers}
+    # Headers de parte sin límite: se cortan antes de acumularlos
+    relleno = b"x" * (multipart_stream.MAX_TAMANO_HEADERS + 1)
+    cuerpo = b"--limite\r\nX-Relleno: " + relleno + b"\r\n\r\ndatos\r\n--limite--\r\n"
+    response = await client.post("/archivos/upload", content=cuerpo, headers=tipo)
+    assert response.status_code == 400
+
+    # Errores del parser (p. ej. un header sin ':')
+    cuerpo = b"--limite\r\nsin-dos-puntos\r\n\r\ndatos\r\n--limite--\r\n"
+    response = await client.post("/archivos/upload", content=cuerpo, headers=tipo)
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_descarga_condicional(client: AsyncClient, auth_headers, upload_dir):
+    contenido = b"%PDF-1.7\n" + b"z" * 1000
+    response = await client.post(
+        "/archivos/upload",
+        files={"file": ("doc.pdf", contenido, "application/pdf")},
+        headers=auth_headers,
+    )
+    archivo = response.json()
+    url = f"/archivos/download/{archivo['id']}"
+
+    response = await client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    assert etag == f'"{archivo["sha256"]}"'
+    assert response.headers["cache-control"] == "public, max-age=86400"
+
+    # If-None-Match coincide: 304 sin cuerpo y con los validadores
+    response = await client.get(url, headers={"If-None-Match": f'W/{etag}, "otro"'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # If-None-Match tiene precedencia sobre If-Modified-Since
+    response = await client.get(
+        url, headers={"If-None-Match": '"otro"', "If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 200
+
+    response = await client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    response = await client.get(
+        url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+    # If-Range: el rango sólo se aplica si la versión coincide
+    response = await client.get(url, headers={"Range": "bytes=0-3", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == b"%PDF"
+    assert response.headers["etag"] == etag
+    response = await client.get(
+        url, headers={"Range": "bytes=0-3", "If-Range": '"version-anterior"'}
+    )
+    assert response.status_code == 200
+    assert response.content == contenido
+
+
+@pytest.mark.anyio
+async def test_archivos_con_backend_s3(
+    client: AsyncClient, auth_headers, upload_dir, tmp_path_factory, monkeypatch
+):
+    from app.storage import backend
+    from app.storage.s3_local import ClienteS3Local
+    from app.storage.s3_repo import AlmacenamientoS3
+
+    bucket_dir = tmp_path_factory.mktemp("s3") / "b"
+    s3 = AlmacenamientoS3(ClienteS3Local(str(bucket_dir.parent)), bucket="b")
+    monkeypatch.setattr(backend, "_instancia", s3)
+
+    response = await client.post(
+        "/archivos/upload",
+        files={"file": ("a.txt", b"hola s3", "text/plain")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    archivo = response.json()
+    assert (bucket_dir / archivo["ruta"]).read_bytes() == b"hola s3"
+    # El staging local queda vacío
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+
+    response = await client.get(f"/archivos/download/{archivo['id']}")
+    assert response.status_code == 307
+    assert f"/b/{archivo['ruta']}?" in response.headers["location"]
+
+    response = await client.delete(
+        f"/archivos/files/{archivo['id']}", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert not (bucket_dir / archivo["ruta"]).exists()
+
+
+@pytest.mark.anyio
+async def test_variante_imagen(client: AsyncClient, auth_headers, upload_dir, monkeypatch):
+    import io
+    from PIL import Image
+    from app.services import imagenes_service
+
+    monkeypatch.setattr(imagenes_service, "_indice", None)
+    salida = io.BytesIO()
+    Image.new("RGB", (400, 200), "white").save(salida, format="JPEG")
+    response = await client.post(
+        "/archivos/upload",
+        files={"file": ("foto.jpg", salida.getvalue(), "image/jpeg")},
+        headers=auth_headers,
+    )
+    archivo = response.json()
+    url = f"/archivos/imagen/{archivo['id']}"
+
+    try:
+        response = await client.get(url, params={"ancho": 160, "formato": "webp"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert "immutable" in response.headers["cache-control"]
+        assert Image.open(io.BytesIO(response.content)).size == (160, 80)
+
+        etag = response.headers["etag"]
+        response = await client.get(
+            url, params={"ancho": 160, "formato": "webp"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        response = await client.get(url, params={"ancho": 161})
+        assert response.status_code == 400
+
+        # Al borrar el original se borran sus variantes
+        variantes = upload_dir / imagenes_service.VARIANTES_SUBDIR
+        assert list(variantes.iterdir())
+        response = await client.delete(
+            f"/archivos/files/{archivo['id']}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert list(variantes.iterdir()) == []
+    finally:
+        imagenes_service.cerrar_pool()
+
+
+@pytest.mark.anyio
+async def test_descarga_zip(client: AsyncClient, auth_headers, upload_dir, db):
+    import io
+    import zipfile
+    from app.models.academico import Carrera, Materia
+
+    ids = []
+    for nombre, contenido in [("a.pdf", b"%PDF-1.4 a"), ("b.pdf", b"%PDF-1.4 b")]:
+        response = await client.post(
+            "/archivos/upload",
+            files={"file": (nombre, contenido, "application/pdf")},
+            headers=auth_headers,
+        )
+        ids.append(response.json()["id"])
+
+    response = await client.get("/archivos/zip", params={"ids": [ids[1], ids[0]]})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == ["b.pdf", "a.pdf"]
+        assert zf.read("a.pdf") == b"%PDF-1.4 a"
+
+    response = await client.get("/archivos/zip", params={"ids": [ids[0], 999999]})
+    assert response.status_code == 404
+    response = await client.get("/archivos/zip")
+    assert response.status_code == 400
+
+    # Programas de una carrera, resueltos por Materia.programa_pdf_url
+    rutas = {}
+    for aid in ids:
+        rutas[aid] = (await client.get(f"/archivos/download/{aid}")).content
+    carrera = Carrera(nombre="Ingeniería Hídrica")
+    db.add(carrera)
+    await db.commit()
+    archivo_a = (await client.get("/archivos/files/", params={"limit": 1000})).json()
+    ruta_a = next(a["ruta"] for a in archivo_a if a["id"] == ids[0])
+    db.add_all(
+        [
+            Materia(nombre="Hidráulica", codigo="H1", semestre=2, id_carrera=carrera.id,
+                    programa_pdf_url=ruta_a),
+            Materia(nombre="Sin programa", codigo="S1", semestre=1, id_carrera=carrera.id),
+        ]
+    )
+    await db.commit()
+
+    response = await client.get("/archivos/zip", params={"carrera_id": carrera.id})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.namelist() == ["H1 - Hidráulica.pdf"]
+        assert zf.read("H1 - Hidráulica.pdf") == b"%PDF-1.4 a"
+
+    response = await client.get("/archivos/zip", params={"carrera_id": 999999})
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_descarga_precomprimida(client: AsyncClient, auth_headers, upload_dir):
+    contenido = b"fecha,caudal\n" + b"".join(
+        f"2024-01-{d % 28 + 1:02d},{d * 1.5}\n".encode() for d in range(2000)
+    )
+    response = await client.post(
+        "/archivos/upload",
+        files={"file": ("caudales.csv", contenido, "text/csv")},
+        headers=auth_headers,
+    )
+    archivo = response.json()
+    url = f"/archivos/download/{archivo['id']}"
+    # Las variantes se generan en segundo plano, tras la respuesta
+    assert (upload_dir / f"{archivo['ruta']}.br").exists()
+    assert (upload_dir / f"{archivo['ruta']}.gz").exists()
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"] == f'"{archivo["sha256"]}-br"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(contenido) // 2
+    assert response.content == contenido
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == contenido
+
+    response = await client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == contenido
+
+    # 304 para la variante que ya tiene el cliente
+    etag_gzip = f'"{archivo["sha256"]}-gzip"'
+    response = await client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag_gzip}
+    )
+    assert response.status_code == 304
+
+    # Los rangos se sirven sobre el original sin comprimir
+    response = await client.get(
+        url, headers={"Accept-Encoding": "gzip, br", "Range": "bytes=0-11"}
+    )
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.content == b"fecha,caudal"
+
+    await client.delete(f"/archivos/files/{archivo['id']}", headers=auth_headers)
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
@@ -169,3 +169,94 @@ async def test_buscar_blogposts_por_autor(client: AsyncClient, auth_headers):
     assert isinstance(data, list)
     assert len(data) > 0
     assert all(post["autor"] == autor_especial for post in data)
+
+
+@pytest.mark.anyio
+async def test_buscar_blogposts_texto_completo(client: AsyncClient, auth_headers):
+    en_contenido = await client.post(
+        "/blog/posts",
+        json={
+            "titulo": "Informe anual",
+            "contenido": "Se midieron los acuíferos zeolíticos de la cuenca norte.",
+        },
+        headers=auth_headers,
+    )
+    en_titulo = await client.post(
+        "/blog/posts",
+        json={
+            "titulo": "Acuíferos zeolíticos",
+            "contenido": "Resultados preliminares del muestreo.",
+        },
+        headers=auth_headers,
+    )
+
+    # Sin tildes y por prefijo: "zeolitico" encuentra "zeolíticos"
+    response = await client.get("/blog/posts/search/acuiferos zeolitico")
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["id"] for p in data] == [
+        en_titulo.json()["id"],
+        en_contenido.json()["id"],
+    ]
+    assert data[0]["relevancia"] > data[1]["relevancia"]
+    assert "<mark>zeolíticos</mark>" in data[1]["fragmento"]
+
+    # El índice se mantiene al editar y al borrar
+    post_id = en_contenido.json()["id"]
+    await client.patch(
+        f"/blog/posts/{post_id}",
+        json={"contenido": "Texto reemplazado"},
+        headers=auth_headers,
+    )
+    await client.delete(f"/blog/posts/{en_titulo.json()['id']}", headers=auth_headers)
+    response = await client.get("/blog/posts/search/zeolitico")
+    assert response.json() == []
+
+    response = await client.get("/blog/posts/search/reemplazado")
+    assert [p["id"] for p in response.json()] == [post_id]
+
+
+@pytest.mark.anyio
+async def test_tags_normalizados_y_contados(client: AsyncClient, auth_headers):
+    async def crear(tags, publicado=True):
+        r = await client.post(
+            "/blog/posts",
+            json={
+                "titulo": "Post con tags",
+                "contenido": "x",
+                "tags": tags,
+                "publicado": publicado,
+            },
+            headers=auth_headers,
+        )
+        return r.json()["id"]
+
+    async def cantidades():
+        r = await client.get("/blog/tags")
+        assert r.status_code == 200
+        return {t["nombre"]: t["cantidad_posts"] for t in r.json()}
+
+    a = await crear("Hidrogeología, Aguas-Residuales")
+    b = await crear("hidrogeología,Humedales")
+    await crear("Hidrogeología", publicado=False)
+
+    # Coincidencia exacta sin distinguir mayúsculas, no por subcadena
+    r = await client.get("/blog/posts/categoria/HIDROGEOLOGÍA")
+    assert {p["id"] for p in r.json()} >= {a, b}
+    r = await client.get("/blog/posts", params={"tag": "aguas"})
+    assert a not in {p["id"] for p in r.json()}
+    r = await client.get("/blog/posts", params={"tag": "' OR 1=1 --"})
+    assert r.json() == []
+
+    conteo = await cantidades()
+    assert conteo["Hidrogeología"] == 2  # el borrador no cuenta
+    assert conteo["Humedales"] == 1
+
+    await client.patch(
+        f"/blog/posts/{b}", json={"tags": "Humedales"}, headers=auth_headers
+    )
+    await client.delete(f"/blog/posts/{a}", headers=auth_headers)
+    conteo = await cantidades()
+    assert "Hidrogeología" not in conteo
+    assert "Aguas-Residuales" not in conteo
+    assert conteo["Humedales"] == 1
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime
+
+from app.models.models import Archivo
+from app.routes import cache_http
+
+
+@pytest.mark.anyio
+async def test_politicas_cache(monkeypatch):
+    monkeypatch.setattr(
+        cache_http,
+        "CACHE_CONTROL_POLICIES",
+        cache_http.parsear_politicas(
+            "image/png=no-store; image/*=public, max-age=60 ;*=private"
+        ),
+    )
+    assert cache_http.politica_cache("image/png") == "no-store"
+    assert cache_http.politica_cache("image/jpeg; q=1") == "public, max-age=60"
+    assert cache_http.politica_cache(None) == "private"
+
+
+@pytest.mark.anyio
+async def test_etag_sin_sha256():
+    archivo = Archivo(
+        nombre="a.txt", ruta="a.txt", tamano=255, updated_at=datetime(2024, 1, 1)
+    )
+    assert cache_http.etag_archivo(archivo) == '"ff-65920080"'
+    headers = cache_http.headers_validacion(archivo)
+    assert headers["Last-Modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert headers["Cache-Control"] == "no-cache"
+
+
+@pytest.mark.anyio
+async def test_elegir_codificacion():
+    from starlette.requests import Request
+
+    def request(accept_encoding):
+        headers = [(b"accept-encoding", accept_encoding.encode())]
+        return Request({"type": "http", "headers": headers})
+
+    disponibles = ["br", "gzip"]
+    assert cache_http.elegir_codificacion(request("gzip, deflate, br"), disponibles) == "br"
+    assert cache_http.elegir_codificacion(request("br;q=0.5, gzip"), disponibles) == "gzip"
+    assert cache_http.elegir_codificacion(request("*"), disponibles) == "br"
+    assert cache_http.elegir_codificacion(request("br;q=0, identity"), disponibles) is None
+    assert cache_http.elegir_codificacion(request("gzip"), []) is None
@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient
+
+from app import cache_respuestas
+from app.services import academico_service
+
+
+def _nombres(resp):
+    return {c["nombre"] for c in resp.json()}
+
+
+@pytest.mark.anyio
+async def test_listado_se_sirve_desde_la_cache(client: AsyncClient, monkeypatch):
+    from app.routes import metrics as metrics_routes
+
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "t")
+    aciertos = cache_respuestas.ACIERTOS.valor
+
+    primera = await client.get("/academico/carreras", params={"limit": 5, "offset": 0})
+    assert primera.headers["x-cache"] == "MISS"
+
+    # El orden de los parámetros no cambia la clave
+    segunda = await client.get("/academico/carreras?offset=0&limit=5")
+    assert segunda.status_code == 200
+    assert segunda.headers["x-cache"] == "HIT"
+    assert segunda.content == primera.content
+    assert segunda.headers["content-type"] == primera.headers["content-type"]
+    assert cache_respuestas.ACIERTOS.valor == aciertos + 1
+
+    metricas = await client.get("/metrics", headers={"Authorization": "Bearer t"})
+    assert "response_cache_hits_total" in metricas.text
+
+
+@pytest.mark.anyio
+async def test_escritura_invalida_solo_su_etiqueta(client: AsyncClient, auth_headers):
+    await client.get("/academico/carreras", params={"limit": 1000})
+    await client.get("/servicios/")
+
+    resp = await client.post(
+        "/academico/carreras",
+        json={"nombre": "Carrera cacheada"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 201
+
+    resp = await client.get("/academico/carreras", params={"limit": 1000})
+    assert resp.headers["x-cache"] == "MISS"
+    assert "Carrera cacheada" in _nombres(resp)
+    assert (await client.get("/servicios/")).headers["x-cache"] == "HIT"
+
+
+@pytest.mark.anyio
+async def test_no_guarda_respuestas_calculadas_durante_una_escritura(
+    client: AsyncClient, monkeypatch
+):
+    listar = academico_service.listar_carreras
+
+    async def listar_e_invalidar(*args, **kwargs):
+        carreras = await listar(*args, **kwargs)
+        # Otra petición escribe mientras esta consulta
+        cache_respuestas.invalidar("carrera")
+        return carreras
+
+    monkeypatch.setattr(academico_service, "listar_carreras", listar_e_invalidar)
+    await client.get("/academico/carreras")
+    monkeypatch.setattr(academico_service, "listar_carreras", listar)
+
+    assert (await client.get("/academico/carreras")).headers["x-cache"] == "MISS"
+    assert (await client.get("/academico/carreras")).headers["x-cache"] == "HIT"
+
+
+@pytest.mark.anyio
+async def test_respeta_el_limite_de_tamano(client: AsyncClient, db, monkeypatch):
+    await academico_service.crear_carrera(db, {"nombre": "Grande"})
+    monkeypatch.setattr(cache_respuestas, "RESPONSE_CACHE_MAX_ENTRY_BYTES", 10)
+    await client.get("/academico/carreras")
+    assert (await client.get("/academico/carreras")).headers["x-cache"] == "MISS"
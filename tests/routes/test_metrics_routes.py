@@ -0,0 +1,86 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import db as app_db
+from app import metrics
+
+
+@pytest.mark.anyio
+async def test_opciones_engine(monkeypatch):
+    monkeypatch.setattr(app_db, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(app_db, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+    opciones = app_db.opciones_engine("postgresql+asyncpg://u:p@db/agua")
+    assert opciones["echo"] is False
+    assert opciones["poolclass"] is app_db.PoolMedido
+    assert opciones["pool_size"] == 20
+    assert opciones["pool_pre_ping"] is True
+    assert opciones["connect_args"]["server_settings"] == {
+        "timezone": "UTC",
+        "statement_timeout": "5000",
+    }
+    # SQLite no recibe opciones de pool
+    assert "pool_size" not in app_db.opciones_engine("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.mark.anyio
+async def test_metricas_pool(client: AsyncClient, tmp_path, monkeypatch):
+    from app.routes import metrics as metrics_routes
+
+    monkeypatch.setattr(metrics_routes, "METRICS_PUBLIC", True)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=app_db.PoolMedido,
+        pool_size=2,
+        max_overflow=1,
+    )
+    esperas = app_db.DB_POOL_ESPERA._conteos[:]
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            lineas = app_db.metricas_pool(engine.pool)
+            assert any(
+                l.startswith("db_pool_checked_out{") and l.endswith(" 1") for l in lineas
+            )
+    finally:
+        await engine.dispose()
+    assert sum(app_db.DB_POOL_ESPERA._conteos) == sum(esperas) + 1
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'db_pool_wait_seconds_bucket{pid="' in response.text
+    assert "# TYPE db_pool_wait_seconds histogram" in response.text
+    assert "db_pool_timeouts_total{" in response.text
+
+
+@pytest.mark.anyio
+async def test_histograma():
+    histograma = metrics.Histograma("prueba_segundos", "Prueba", (0.1, 1))
+    for valor in (0.05, 0.1, 0.5, 3):
+        histograma.observar(valor)
+
+    lineas = [l.split("{")[0] + " " + l.rsplit(" ", 1)[1] for l in histograma.exponer()[2:]]
+    assert lineas == [
+        "prueba_segundos_bucket 2",
+        "prueba_segundos_bucket 3",
+        "prueba_segundos_bucket 4",
+        "prueba_segundos_sum 3.65",
+        "prueba_segundos_count 4",
+    ]
+    metrics._colectores.remove(histograma.exponer)
+
+
+@pytest.mark.anyio
+async def test_metrics_token(client: AsyncClient, monkeypatch):
+    from app.routes import metrics as metrics_routes
+
+    # Sin token ni METRICS_PUBLIC, el endpoint no existe
+    assert (await client.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "secreto")
+    assert (await client.get("/metrics")).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert response.status_code == 200
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.blog import BlogPost
+from app.models.models import Equipamiento, Publicacion
+
+
+async def _recorrer(client: AsyncClient, url: str, limit: int, **params):
+    """Recorre un listado siguiendo X-Next-Cursor; devuelve ids y páginas."""
+    ids, paginas, cursor = [], 0, None
+    while True:
+        query = {**params, "limit": limit}
+        if cursor:
+            query["cursor"] = cursor
+        resp = await client.get(url, params=query)
+        assert resp.status_code == 200
+        ids.extend(item["id"] for item in resp.json())
+        paginas += 1
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            return ids, paginas
+        assert 'rel="next"' in resp.headers["link"]
+
+
+@pytest.mark.anyio
+async def test_cursor_recorre_todo_sin_repetir(client: AsyncClient, db):
+    db.add_all([Equipamiento(nombre=f"Equipo {i}") for i in range(7)])
+    await db.commit()
+
+    resp = await client.get("/equipamiento/", params={"limit": 1000})
+    todos = [item["id"] for item in resp.json()]
+
+    ids, paginas = await _recorrer(client, "/equipamiento/", 3)
+    assert ids == todos
+    assert paginas >= 3
+
+
+@pytest.mark.anyio
+async def test_cursor_desempata_por_id(client: AsyncClient, db):
+    # Posts con la misma fecha: el orden (fecha, id) no debe perder ninguno
+    fecha = datetime(2001, 1, 1, tzinfo=timezone.utc)
+    posts = [
+        BlogPost(titulo=f"Post {i}", contenido="x", fecha_publicacion=fecha)
+        for i in range(5)
+    ]
+    db.add_all(posts)
+    await db.commit()
+
+    ids, _ = await _recorrer(client, "/blog/posts", 2)
+    nuevos = [p.id for p in posts]
+    assert len(ids) == len(set(ids))
+    assert [i for i in ids if i in nuevos] == sorted(nuevos, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_cursor_con_nulos_al_final(client: AsyncClient, db):
+    publicaciones = [
+        Publicacion(titulo="Sin año", anio=None),
+        Publicacion(titulo="2019", anio=2019),
+        Publicacion(titulo="2021", anio=2021),
+        Publicacion(titulo="Sin año 2", anio=None),
+    ]
+    db.add_all(publicaciones)
+    await db.commit()
+
+    ids, _ = await _recorrer(client, "/publicaciones/", 1)
+    assert len(ids) == len(set(ids))
+    posiciones = {p.titulo: ids.index(p.id) for p in publicaciones}
+    assert posiciones["2021"] < posiciones["2019"] < posiciones["Sin año"]
+    assert posiciones["Sin año 2"] < posiciones["Sin año"]
+
+
+@pytest.mark.anyio
+async def test_cursor_invalido(client: AsyncClient):
+    resp = await client.get("/equipamiento/", params={"cursor": "no-es-un-cursor"})
+    assert resp.status_code == 400
@@ -0,0 +1,38 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.models import Personal, Proyecto
+
+
+@pytest.mark.anyio
+async def test_asignar_personal_valida_todos_los_ids(client: AsyncClient, db):
+    proyecto = Proyecto(nombre="Proyecto asignaciones")
+    personas = [Personal(nombre=f"Investigador {i}") for i in range(3)]
+    db.add_all([proyecto, *personas])
+    await db.commit()
+    url = f"/proyectos/{proyecto.id}/personal"
+
+    resp = await client.post(
+        url,
+        json=[
+            {"personal_id": personas[0].id},
+            {"personal_id": 999101},
+            {"personal_id": 999102},
+        ],
+    )
+    assert resp.status_code == 404
+    assert "999101, 999102" in resp.json()["detail"]
+
+    resp = await client.post(
+        url, json=[{"personal_id": p.id, "rol": "Tesista"} for p in personas]
+    )
+    assert resp.status_code == 201
+    assert {r["personal_id"] for r in resp.json()} == {p.id for p in personas}
+
+    # Reasignar actualiza el rol en lugar de duplicar la relación
+    resp = await client.post(
+        url, json=[{"personal_id": personas[0].id, "rol": "Director"}]
+    )
+    roles = {r["personal_id"]: r["rol"] for r in resp.json()}
+    assert len(roles) == 3
+    assert roles[personas[0].id] == "Director"
@@ -0,0 +1,98 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models.models import Personal
+
+
+async def _crear(client, headers, titulo, authors, anio=2020):
+    resp = await client.post(
+        "/publicaciones/",
+        json={"titulo": titulo, "anio": anio, "authors": authors},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_filtrar_por_autor_devuelve_paginas_completas(
+    client: AsyncClient, db, auth_headers
+):
+    autor = Personal(nombre="Autora Filtro")
+    db.add(autor)
+    await db.commit()
+
+    propias = []
+    for i in range(4):
+        propias.append(
+            await _crear(
+                client,
+                auth_headers,
+                f"Propia {i}",
+                [{"name": "Autora Filtro", "personal_id": autor.id}],
+            )
+        )
+        # Publicaciones ajenas intercaladas: antes dejaban páginas cortas
+        await _crear(client, auth_headers, f"Ajena {i}", [{"name": "Externo"}])
+
+    resp = await client.get(
+        "/publicaciones/", params={"autor_id": autor.id, "limit": 3}
+    )
+    assert [p["id"] for p in resp.json()] == sorted(propias, reverse=True)[:3]
+
+    resp = await client.get(
+        "/publicaciones/",
+        params={
+            "autor_id": autor.id,
+            "limit": 3,
+            "cursor": resp.headers["x-next-cursor"],
+        },
+    )
+    assert [p["id"] for p in resp.json()] == [min(propias)]
+
+
+@pytest.mark.anyio
+async def test_actualizar_autores_actualiza_el_filtro(
+    client: AsyncClient, db, auth_headers
+):
+    autor = Personal(nombre="Autor Cambiante")
+    db.add(autor)
+    await db.commit()
+
+    pid = await _crear(client, auth_headers, "Sin autor interno", [{"name": "X"}])
+    resp = await client.get("/publicaciones/", params={"autor_id": autor.id})
+    assert resp.json() == []
+
+    resp = await client.patch(
+        f"/publicaciones/{pid}",
+        json={"authors": [{"name": "Autor Cambiante", "personal_id": autor.id}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+    resp = await client.get("/publicaciones/", params={"autor_id": autor.id})
+    assert [p["id"] for p in resp.json()] == [pid]
+
+    resp = await client.delete(f"/publicaciones/{pid}", headers=auth_headers)
+    assert resp.status_code == 200
+    resp = await client.get("/publicaciones/", params={"autor_id": autor.id})
+    assert resp.json() == []
+
+
+@pytest.mark.anyio
+async def test_autores_inexistentes_se_informan_juntos(
+    client: AsyncClient, auth_headers
+):
+    resp = await client.post(
+        "/publicaciones/",
+        json={
+            "titulo": "Con autores inexistentes",
+            "authors": [
+                {"name": "A", "personal_id": 999001},
+                {"name": "B"},
+                {"name": "C", "personal_id": 999002},
+            ],
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 404
+    assert "999001, 999002" in resp.json()["detail"]
@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from app import db as app_db
+from app import replicas
+from app.models.models import Equipamiento
+
+
+@pytest.fixture
+async def replica(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    fabrica = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with fabrica() as session:
+        session.add(Equipamiento(nombre="Solo en la réplica"))
+        await session.commit()
+
+    monkeypatch.setattr(app_db, "replica_session_factories", [fabrica])
+    monkeypatch.setattr(replicas, "_caidas", {})
+    yield fabrica
+    await engine.dispose()
+
+
+def _nombres(resp):
+    return {e["nombre"] for e in resp.json()}
+
+
+@pytest.mark.anyio
+async def test_lecturas_van_a_la_replica(client: AsyncClient, replica):
+    resp = await client.get("/equipamiento/", params={"limit": 1000})
+    assert resp.status_code == 200
+    assert _nombres(resp) == {"Solo en la réplica"}
+
+
+@pytest.mark.anyio
+async def test_lee_del_primario_tras_escribir(client: AsyncClient, auth_headers, replica):
+    resp = await client.post(
+        "/equipamiento/", json={"nombre": "Recién creado"}, headers=auth_headers
+    )
+    assert resp.status_code == 201
+    assert replicas.COOKIE_PRIMARIO in resp.cookies
+
+    resp = await client.get("/equipamiento/", params={"limit": 1000})
+    nombres = _nombres(resp)
+    assert "Recién creado" in nombres
+    assert "Solo en la réplica" not in nombres
+
+    # Vencida la marca, se vuelve a leer de la réplica
+    client.cookies.set(replicas.COOKIE_PRIMARIO, "0")
+    resp = await client.get("/equipamiento/", params={"limit": 1000})
+    assert _nombres(resp) == {"Solo en la réplica"}
+
+
+@pytest.mark.anyio
+async def test_replica_caida_usa_el_primario(client: AsyncClient, tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'no' / 'existe.db'}")
+    fabrica = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(app_db, "replica_session_factories", [fabrica])
+    monkeypatch.setattr(replicas, "_caidas", {})
+
+    resp = await client.get("/equipamiento/", params={"limit": 1000})
+    assert resp.status_code == 200
+    assert "Solo en la réplica" not in _nombres(resp)
+    # Queda marcada como caída y no se reintenta en cada petición
+    assert 0 in replicas._caidas
+    await engine.dispose()
@@ -0,0 +1,25 @@
+import pytest
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+
+from app import main
+
+
+@pytest.mark.anyio
+async def test_rutas_con_response_model_usan_la_respuesta_por_defecto():
+    # FastAPI (>= 0.130) serializa el response_model directo a bytes con
+    # dump_json solo si la ruta no fija una response_class propia
+    assert isinstance(main.app.router.default_response_class, DefaultPlaceholder)
+    routers = [v for k, v in vars(main).items() if k.endswith("_router")]
+    routers.append(main.auth.router)
+    rutas = [
+        r
+        for router in routers
+        for r in router.routes
+        if isinstance(r, APIRoute) and r.response_model
+    ]
+    assert {"/publicaciones/", "/blog/posts"} <= {r.path for r in rutas}
+    propias = [
+        r.path for r in rutas if not isinstance(r.response_class, DefaultPlaceholder)
+    ]
+    assert propias == []
@@ -1,21 +1,16 @@
 import pytest
+from sqlmodel import select
 
+from app.models.correo import EnvioCorreo, MensajeCorreo
 
-@pytest.mark.anyio
-async def test_subscribe_and_notify(client, db, monkeypatch, auth_headers):
-    sent = {}
-
-    async def fake_send(to, sub, html):
-        sent[to] = (sub, html)
-
-    # Parchear el servicio de email
-    monkeypatch.setattr("app.routes.blog.send_html", fake_send)
 
+@pytest.mark.anyio
+async def test_subscribe_and_notify(client, db, auth_headers):
     # Suscribir
     r = await client.post("/suscriptores/", json={"email": "test@example.com"})
     assert r.status_code == 201
 
-    # Crear post publicado
+    # Crear post publicado: la notificación queda en la cola de salida
     post_data = {
         "titulo": "Demo",
         "contenido": "<p>hola</p>",
@@ -23,5 +18,12 @@ async def test_subscribe_and_notify(client, db, monkeypatch, auth_headers):
     }
     await client.post("/blog/posts", json=post_data, headers=auth_headers)
 
-    assert "test@example.com" in sent
-    assert sent["test@example.com"][0] == "Demo"
+    result = await db.execute(
+        select(EnvioCorreo, MensajeCorreo)
+        .join(MensajeCorreo, MensajeCorreo.id == EnvioCorreo.mensaje_id)
+        .where(EnvioCorreo.destinatario == "test@example.com")
+    )
+    envio, mensaje = result.one()
+    assert envio.estado == "pendiente"
+    assert mensaje.asunto == "Demo"
+    assert mensaje.html == "<p>hola</p>"
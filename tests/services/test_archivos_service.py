@@ -0,0 +1,134 @@
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from starlette.datastructures import Headers, UploadFile
+
+from app.models.models import Archivo, SesionSubida
+from app.services import archivos_service
+from app.storage import local_repo
+from app.storage.backend import obtener_backend
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _upload(nombre: str, contenido: bytes, tipo: str = "application/pdf"):
+    return UploadFile(
+        io.BytesIO(contenido),
+        filename=nombre,
+        headers=Headers({"content-type": tipo}),
+    )
+
+
+def _blobs(directorio: Path):
+    return [
+        p
+        for p in directorio.rglob("*")
+        if p.is_file() and local_repo.TMP_SUBDIR not in p.parts
+    ]
+
+
+@pytest.mark.anyio
+async def test_guardar_por_contenido_deduplica(
+    db: AsyncSession, upload_dir: Path, monkeypatch
+):
+    monkeypatch.setattr(local_repo, "CONTENT_ADDRESSED_STORAGE", True)
+    contenido = b"%PDF-1.5\nPrograma de la materia"
+
+    a1 = await archivos_service.guardar_archivo(db, _upload("prog1.pdf", contenido))
+    a2 = await archivos_service.guardar_archivo(db, _upload("prog2.pdf", contenido))
+
+    assert a1.id != a2.id
+    assert a1.sha256 == a2.sha256
+    assert a1.ruta == a2.ruta
+    assert a1.ruta == f"{a1.sha256[:2]}/{a1.sha256[2:4]}/{a1.sha256}.pdf"
+    assert a1.tamano == len(contenido)
+    assert len(_blobs(upload_dir)) == 1
+    assert await archivos_service.contar_referencias(db, a1) == 2
+
+    # El blob sobrevive mientras quede alguna referencia
+    await archivos_service.borrar_archivo(db, a1.id)
+    assert (upload_dir / a2.ruta).read_bytes() == contenido
+
+    await archivos_service.borrar_archivo(db, a2.id)
+    assert _blobs(upload_dir) == []
+
+
+@pytest.mark.anyio
+async def test_borrar_archivo_elimina_archivo_fisico(db: AsyncSession, upload_dir: Path):
+    archivo = await archivos_service.guardar_archivo(
+        db, _upload("nota.txt", b"contenido", "text/plain")
+    )
+    assert (upload_dir / archivo.ruta).exists()
+
+    await archivos_service.borrar_archivo(db, archivo.id)
+    assert not (upload_dir / archivo.ruta).exists()
+    assert await archivos_service.obtener_archivo(db, archivo.id) is None
+
+
+async def _sesion_completa(db: AsyncSession, contenido: bytes):
+    sesion = await archivos_service.crear_sesion_subida(
+        db, {"nombre": "datos.bin", "tamano": len(contenido)}
+    )
+
+    async def chunks():
+        yield contenido
+
+    await archivos_service.recibir_fragmento(db, sesion.id, 0, chunks())
+    return sesion
+
+
+@pytest.mark.anyio
+async def test_completar_sesion_reintenta_si_falla_el_backend(
+    db: AsyncSession, upload_dir: Path, monkeypatch
+):
+    sesion = await _sesion_completa(db, b"contenido")
+
+    async def guardar_falla(origen, destino, tipo=None):
+        raise OSError("backend no disponible")
+
+    backend = obtener_backend()
+    original = backend.guardar
+    monkeypatch.setattr(backend, "guardar", guardar_falla)
+    with pytest.raises(OSError):
+        await archivos_service.completar_sesion_subida(db, sesion.id)
+
+    # Sin registro que apunte a un archivo inexistente; la sesión sigue
+    result = await db.execute(select(Archivo).where(Archivo.ruta == sesion.ruta))
+    assert result.first() is None
+    assert await archivos_service.obtener_sesion_subida(db, sesion.id) is not None
+
+    monkeypatch.setattr(backend, "guardar", original)
+    archivo = await archivos_service.completar_sesion_subida(db, sesion.id)
+    assert (upload_dir / archivo.ruta).read_bytes() == b"contenido"
+    assert await archivos_service.obtener_sesion_subida(db, sesion.id) is None
+
+
+@pytest.mark.anyio
+async def test_limpiar_sesiones_abandonadas(db: AsyncSession, upload_dir: Path):
+    activa = await _sesion_completa(db, b"activa")
+    abandonada = await _sesion_completa(db, b"abandonada")
+    await db.execute(
+        update(SesionSubida)
+        .where(SesionSubida.id == abandonada.id)
+        .values(updated_at=datetime.now(timezone.utc) - timedelta(days=2))
+    )
+    await db.commit()
+
+    cantidad, liberados = await archivos_service.limpiar_sesiones_abandonadas(
+        db, 24 * 3600
+    )
+    assert (cantidad, liberados) == (1, len(b"abandonada"))
+    assert not (upload_dir / abandonada.ruta).exists()
+    assert await archivos_service.obtener_sesion_subida(db, abandonada.id) is None
+    assert (upload_dir / activa.ruta).exists()
+    assert await archivos_service.obtener_sesion_subida(db, activa.id) is not None
+    await archivos_service.cancelar_sesion_subida(db, activa.id)
@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+
+import aiosmtplib
+import pytest
+from sqlalchemy import delete, update
+from sqlmodel import select
+
+from app.models.blog import BlogPost
+from app.models.correo import EnvioCorreo, MensajeCorreo
+from app.models.subscriber import Subscriber
+from app.services import blog_service, cola_correo_service
+from app.services.email_service import PoolSMTP
+from app.services.smtp_local import ServidorSMTPLocal
+
+
+@pytest.fixture
+async def smtp():
+    async with ServidorSMTPLocal() as servidor:
+        yield servidor
+
+
+def _pool(servidor: ServidorSMTPLocal, tamano: int = 2) -> PoolSMTP:
+    async def conectar():
+        cliente = aiosmtplib.SMTP(
+            hostname=servidor.host, port=servidor.puerto, start_tls=False
+        )
+        await cliente.connect()
+        return cliente
+
+    return PoolSMTP(tamano, conectar)
+
+
+async def _encolar(db, emails):
+    await db.execute(delete(EnvioCorreo))
+    await db.execute(delete(Subscriber))
+    db.add_all([Subscriber(email=e) for e in emails])
+    await db.commit()
+    encolados = await cola_correo_service.encolar_newsletter(
+        db, "Novedades", "<p>hola</p>"
+    )
+    await db.commit()
+    return encolados
+
+
+async def _estados(db):
+    result = await db.execute(select(EnvioCorreo).order_by(EnvioCorreo.id))
+    return {e.destinatario: e for e in result.scalars().all()}
+
+
+@pytest.mark.anyio
+async def test_worker_envia_la_cola_reutilizando_conexiones(db, smtp):
+    emails = [f"lector{i}@example.com" for i in range(10)]
+    assert await _encolar(db, emails) == 10
+
+    pool = _pool(smtp, tamano=2)
+    limite = cola_correo_service.LimiteTasa(0)
+    assert await cola_correo_service.enviar_lote(db, pool, limite, tamano=4) == 4
+    assert await cola_correo_service.enviar_lote(db, pool, limite) == 6
+    assert await cola_correo_service.enviar_lote(db, pool, limite) == 0
+    await pool.cerrar()
+
+    assert sorted(m["To"] for m in smtp.mensajes) == sorted(emails)
+    assert smtp.mensajes[0]["Subject"] == "Novedades"
+    # Una conexión por slot del pool, no una por mensaje
+    assert smtp.conexiones <= 2
+    db.expire_all()
+    assert {e.estado for e in (await _estados(db)).values()} == {"enviado"}
+
+
+@pytest.mark.anyio
+async def test_reintenta_errores_temporales_y_descarta_permanentes(db, smtp):
+    await _encolar(db, ["temporal@example.com", "inexistente@example.com"])
+    smtp.fallar_proximos = 1
+    smtp.rechazados = {"inexistente@example.com"}
+
+    pool = _pool(smtp, tamano=1)
+    limite = cola_correo_service.LimiteTasa(0)
+    await cola_correo_service.enviar_lote(db, pool, limite)
+
+    db.expire_all()
+    estados = await _estados(db)
+    temporal = estados["temporal@example.com"]
+    assert temporal.estado == "pendiente"
+    assert temporal.intentos == 1
+    assert temporal.proximo_intento.replace(tzinfo=timezone.utc) > datetime.now(
+        timezone.utc
+    )
+    assert estados["inexistente@example.com"].estado == "fallido"
+
+    # Mientras no venza el backoff no se vuelve a intentar
+    assert await cola_correo_service.enviar_lote(db, pool, limite) == 0
+
+    await db.execute(
+        update(EnvioCorreo).values(proximo_intento=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    assert await cola_correo_service.enviar_lote(db, pool, limite) == 1
+    await pool.cerrar()
+
+    db.expire_all()
+    assert (await _estados(db))["temporal@example.com"].estado == "enviado"
+    assert [m["To"] for m in smtp.mensajes] == ["temporal@example.com"]
+
+
+@pytest.mark.anyio
+async def test_envio_sin_mensaje_se_marca_fallido(db, smtp):
+    await _encolar(db, ["lector@example.com"])
+    # Un mensaje que ya no existe no frena el resto del lote
+    db.add(
+        EnvioCorreo(
+            mensaje_id=999_999,
+            destinatario="huerfano@example.com",
+            estado="pendiente",
+            intentos=0,
+            proximo_intento=datetime.now(timezone.utc),
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+    await db.commit()
+
+    pool = _pool(smtp, tamano=1)
+    limite = cola_correo_service.LimiteTasa(0)
+    assert await cola_correo_service.enviar_lote(db, pool, limite) == 2
+    await pool.cerrar()
+
+    db.expire_all()
+    estados = await _estados(db)
+    assert estados["lector@example.com"].estado == "enviado"
+    assert estados["huerfano@example.com"].estado == "fallido"
+    assert [m["To"] for m in smtp.mensajes] == ["lector@example.com"]
+
+
+@pytest.mark.anyio
+async def test_post_y_newsletter_en_la_misma_transaccion(db, monkeypatch):
+    await _encolar(db, ["lector@example.com"])
+    await db.execute(delete(EnvioCorreo))
+    await db.commit()
+
+    async def encolar_falla(db, asunto, html):
+        raise RuntimeError("cola no disponible")
+
+    monkeypatch.setattr(cola_correo_service, "encolar_newsletter", encolar_falla)
+    with pytest.raises(RuntimeError):
+        await blog_service.crear_post(
+            db, {"titulo": "Sin cola", "contenido": "x", "publicado": True}
+        )
+    await db.rollback()
+    result = await db.execute(select(BlogPost).where(BlogPost.titulo == "Sin cola"))
+    assert result.first() is None
+
+    monkeypatch.undo()
+    post = await blog_service.crear_post(
+        db, {"titulo": "Con cola", "contenido": "<p>x</p>", "publicado": True}
+    )
+    envios = (await _estados(db)).values()
+    assert [e.destinatario for e in envios] == ["lector@example.com"]
+    mensaje = await db.get(MensajeCorreo, next(iter(envios)).mensaje_id)
+    assert mensaje.asunto == post.titulo
+
+
+@pytest.mark.anyio
+async def test_post_con_titulo_largo_encola_la_newsletter(db):
+    await _encolar(db, ["lector@example.com"])
+    await db.execute(delete(EnvioCorreo))
+    await db.commit()
+
+    titulo = "Título muy largo " * 20
+    assert len(titulo) > 255
+    post = await blog_service.crear_post(
+        db, {"titulo": titulo, "contenido": "<p>x</p>", "publicado": True}
+    )
+    assert post.id is not None
+    envio = next(iter((await _estados(db)).values()))
+    mensaje = await db.get(MensajeCorreo, envio.mensaje_id)
+    assert mensaje.asunto == titulo
+    # SQLite no aplica longitudes: se comprueba que la columna no tenga límite
+    # (en Postgres un varchar(255) haría fallar la creación del post)
+    assert getattr(MensajeCorreo.__table__.c.asunto.type, "length", None) is None
+
+
+@pytest.mark.anyio
+async def test_limite_de_tasa_espacia_los_envios():
+    import asyncio
+
+    limite = cola_correo_service.LimiteTasa(50)
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    await asyncio.gather(*[limite.esperar() for _ in range(6)])
+    # 6 envíos a 50/s: el último sale al menos 5 intervalos después
+    assert loop.time() - inicio >= 5 / 50 * 0.9
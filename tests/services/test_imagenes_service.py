@@ -0,0 +1,127 @@
+import io
+import asyncio
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from fastapi import HTTPException
+
+from app.models.models import Archivo
+from app.services import imagenes_service
+from app.storage import local_repo
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(imagenes_service, "_indice", None)
+    monkeypatch.setattr(imagenes_service, "_total", 0)
+    yield tmp_path
+    imagenes_service.cerrar_pool()
+
+
+def _imagen(upload_dir: Path, aid: int, ancho: int = 800, alto: int = 600) -> Archivo:
+    salida = io.BytesIO()
+    Image.new("RGB", (ancho, alto), (30, 120, 200)).save(salida, format="PNG")
+    (upload_dir / f"foto{aid}.png").write_bytes(salida.getvalue())
+    return Archivo(
+        id=aid,
+        nombre=f"foto{aid}.png",
+        ruta=f"foto{aid}.png",
+        tipo="image/png",
+        tamano=len(salida.getvalue()),
+        sha256=f"{aid:064x}",
+    )
+
+
+@pytest.mark.anyio
+async def test_variante_se_genera_una_vez(upload_dir: Path, monkeypatch):
+    archivo = _imagen(upload_dir, 1)
+    generar = imagenes_service._generar
+    llamadas = []
+
+    async def contar(*args):
+        llamadas.append(args)
+        await generar(*args)
+
+    monkeypatch.setattr(imagenes_service, "_generar", contar)
+
+    rutas = await asyncio.gather(
+        *[imagenes_service.obtener_variante(archivo, 320, "webp") for _ in range(3)]
+    )
+    assert len(set(rutas)) == 1
+    assert len(llamadas) == 1
+
+    with Image.open(rutas[0]) as variante:
+        assert variante.format == "WEBP"
+        assert variante.size == (320, 240)
+    assert Path(rutas[0]).parent == upload_dir / imagenes_service.VARIANTES_SUBDIR
+
+    # Ya generada: se sirve desde el almacén
+    assert await imagenes_service.obtener_variante(archivo, 320, "webp") == rutas[0]
+    assert len(llamadas) == 1
+
+    # Nunca se agranda el original
+    ruta = await imagenes_service.obtener_variante(archivo, 1024, "jpeg")
+    with Image.open(ruta) as variante:
+        assert variante.format == "JPEG"
+        assert variante.size == (800, 600)
+
+
+@pytest.mark.anyio
+async def test_variante_transformacion_invalida(upload_dir: Path):
+    archivo = _imagen(upload_dir, 1)
+
+    for ancho, formato in [(333, "webp"), (320, "gif")]:
+        with pytest.raises(HTTPException) as exc_info:
+            imagenes_service.validar_transformacion(archivo, ancho, formato)
+        assert exc_info.value.status_code == 400
+
+    # Declarada como imagen pero con contenido no decodificable
+    (upload_dir / "roto.png").write_bytes(b"no es una imagen")
+    archivo.ruta = "roto.png"
+    archivo.sha256 = "f" * 64
+    with pytest.raises(HTTPException) as exc_info:
+        await imagenes_service.obtener_variante(archivo, 320, "webp")
+    assert exc_info.value.status_code == 415
+
+
+@pytest.mark.anyio
+async def test_almacen_desaloja_lo_menos_usado(upload_dir: Path, monkeypatch):
+    rutas = {}
+    for aid in (1, 2):
+        rutas[aid] = Path(
+            await imagenes_service.obtener_variante(
+                _imagen(upload_dir, aid), 160, "webp"
+            )
+        )
+    tamano = rutas[1].stat().st_size
+    monkeypatch.setattr(imagenes_service, "MAX_VARIANTES_BYTES", tamano * 2 + 10)
+
+    # Se vuelve a usar la variante 1: la menos usada pasa a ser la 2
+    await imagenes_service.obtener_variante(_imagen(upload_dir, 1), 160, "webp")
+    rutas[3] = Path(
+        await imagenes_service.obtener_variante(_imagen(upload_dir, 3), 160, "webp")
+    )
+
+    assert rutas[1].exists()
+    assert not rutas[2].exists()
+    assert rutas[3].exists()
+    assert imagenes_service._total <= imagenes_service.MAX_VARIANTES_BYTES
+
+
+@pytest.mark.anyio
+async def test_eliminar_variantes_de_un_archivo(upload_dir: Path):
+    variantes = [
+        Path(await imagenes_service.obtener_variante(_imagen(upload_dir, 1), a, f))
+        for a, f in [(160, "webp"), (320, "jpeg")]
+    ]
+    # El id 11 también empieza con "1": sus variantes no se tocan
+    otra = Path(
+        await imagenes_service.obtener_variante(_imagen(upload_dir, 11), 160, "webp")
+    )
+
+    await imagenes_service.eliminar_variantes(_imagen(upload_dir, 1))
+    assert not any(v.exists() for v in variantes)
+    assert otra.exists()
+    assert imagenes_service._total == otra.stat().st_size
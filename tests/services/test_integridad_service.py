@@ -0,0 +1,115 @@
+import os
+import hashlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete
+from sqlmodel import select
+
+from app.models.models import Archivo, SesionSubida
+from app.services import integridad_service
+from app.storage import local_repo
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _blob(directorio: Path, ruta: str, contenido: bytes, antiguo: bool = True) -> Path:
+    path = directorio / ruta
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(contenido)
+    if antiguo:
+        hace_un_dia = path.stat().st_mtime - 86400
+        os.utime(path, (hace_un_dia, hace_un_dia))
+    return path
+
+
+def _archivo(ruta: str, contenido: bytes, sha256: str = None) -> Archivo:
+    now = datetime.now(timezone.utc)
+    return Archivo(
+        nombre=ruta,
+        ruta=ruta,
+        tipo="application/octet-stream",
+        tamano=len(contenido),
+        sha256=sha256 or hashlib.sha256(contenido).hexdigest(),
+        fecha_subida=now,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.mark.anyio
+async def test_reconciliar(db: AsyncSession, upload_dir: Path):
+    # La base de pruebas es compartida: se parte de tablas vacías
+    await db.execute(delete(Archivo))
+    await db.execute(delete(SesionSubida))
+    await db.commit()
+
+    _blob(upload_dir, "ab/cd/bueno.bin", b"bueno")
+    # Variante precomprimida: pertenece al original, no es huérfana
+    variante_gz = _blob(upload_dir, "ab/cd/bueno.bin.gz", b"gz")
+    _blob(upload_dir, "corrupto.bin", b"alterado")
+    huerfano = _blob(upload_dir, "ef/huerfano.bin", b"sin registro")
+    reciente = _blob(upload_dir, "reciente.bin", b"subida en curso", antiguo=False)
+    sesion = _blob(upload_dir, "sesion.bin", b"parcial")
+    abandonada = _blob(upload_dir, "abandonada.bin", b"vieja")
+    temporal = _blob(upload_dir, ".tmp/abandonado.part", b"temporal")
+    variante = _blob(upload_dir, ".variantes/1-x-w160-q80.webp", b"variante")
+
+    bueno = _archivo("ab/cd/bueno.bin", b"bueno")
+    corrupto = _archivo("corrupto.bin", b"original")
+    sin_blob = _archivo("perdido.bin", b"perdido")
+    now = datetime.now(timezone.utc)
+    db.add_all([bueno, corrupto, sin_blob])
+    db.add(
+        SesionSubida(
+            id="s1", nombre="s.bin", tipo="application/octet-stream", tamano=100,
+            recibido=7, ruta="sesion.bin", created_at=now, updated_at=now,
+        )
+    )
+    hace_dos_dias = now - timedelta(days=2)
+    db.add(
+        SesionSubida(
+            id="s2", nombre="a.bin", tipo="application/octet-stream", tamano=100,
+            recibido=5, ruta="abandonada.bin", created_at=hace_dos_dias,
+            updated_at=hace_dos_dias,
+        )
+    )
+    await db.commit()
+    sin_blob_id = sin_blob.id
+    corrupto_id = corrupto.id
+
+    # Solo informe, en lotes de 2 para recorrer varios
+    informe = await integridad_service.reconciliar(
+        db, verificar_checksums=True, tamano_lote=2
+    )
+    assert informe.blobs_revisados == 7
+    assert informe.blobs_huerfanos == 2
+    assert sorted(informe.ejemplos_blobs_huerfanos) == ["ef/huerfano.bin", "reciente.bin"]
+    assert informe.registros_revisados == 3
+    assert informe.ejemplos_registros_sin_blob == [sin_blob_id]
+    assert informe.checksums_verificados == 2
+    assert informe.ejemplos_checksums_invalidos == [corrupto_id]
+    assert informe.blobs_eliminados == informe.registros_eliminados == 0
+    assert huerfano.exists() and temporal.exists()
+
+    informe = await integridad_service.reconciliar(
+        db, eliminar_blobs=True, eliminar_registros=True, tamano_lote=2
+    )
+    assert informe.blobs_eliminados == 1
+    assert informe.temporales_eliminados == 1
+    assert informe.sesiones_eliminadas == 1
+    assert informe.registros_eliminados == 1
+    assert not huerfano.exists()
+    assert not temporal.exists()
+    assert not abandonada.exists()
+    # Los recientes, las sesiones y las variantes se conservan
+    assert reciente.exists() and sesion.exists() and variante.exists()
+    assert variante_gz.exists()
+    ids = (await db.execute(select(Archivo.id))).scalars().all()
+    assert sin_blob_id not in ids and len(ids) == 2
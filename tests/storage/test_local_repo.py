@@ -142,3 +142,122 @@ async def test_guardar_archivo_sin_extension(mock_upload_dir):
 
     await local_repo.eliminar(relative_file_path)
     assert not full_file_path.exists()
+
+
+async def _consumir(response) -> bytes:
+    contenido = b""
+    async for chunk in response.body_iterator:
+        contenido += chunk
+    return contenido
+
+
+@pytest.fixture
+def archivo_rangos(mock_upload_dir):
+    ruta = "rangos.txt"
+    contenido = bytes(range(256)) * 40  # 10240 bytes
+    (Path(mock_upload_dir) / ruta).write_bytes(contenido)
+    return ruta, contenido
+
+
+@pytest.mark.anyio
+async def test_abrir_sin_rango_anuncia_accept_ranges(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta)
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(contenido))
+    assert await _consumir(response) == contenido
+
+
+@pytest.mark.anyio
+async def test_abrir_rango_simple(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta, "bytes=100-2099")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-2099/{len(contenido)}"
+    assert response.headers["content-length"] == "2000"
+    assert await _consumir(response) == contenido[100:2100]
+
+
+@pytest.mark.anyio
+async def test_abrir_rango_sufijo_y_abierto(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta, "bytes=-10")
+    assert await _consumir(response) == contenido[-10:]
+
+    response = await local_repo.abrir(ruta, "bytes=10000-")
+    assert response.headers["content-range"] == f"bytes 10000-10239/{len(contenido)}"
+    assert await _consumir(response) == contenido[10000:]
+
+
+@pytest.mark.anyio
+async def test_abrir_multiples_rangos(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta, "bytes=0-9, 5000-5009")
+    assert response.status_code == 206
+    assert response.media_type.startswith("multipart/byteranges")
+    boundary = response.media_type.split("boundary=")[1]
+
+    cuerpo = await _consumir(response)
+    assert len(cuerpo) == int(response.headers["content-length"])
+    partes = cuerpo.split(f"--{boundary}".encode())
+    assert partes[-1] == b"--\r\n"
+    assert partes[1].endswith(b"\r\n\r\n" + contenido[0:10] + b"\r\n")
+    assert f"Content-Range: bytes 5000-5009/{len(contenido)}".encode() in partes[2]
+    assert partes[2].endswith(b"\r\n\r\n" + contenido[5000:5010] + b"\r\n")
+
+
+@pytest.mark.anyio
+async def test_abrir_rangos_superpuestos_se_unen(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta, "bytes=0-99,50-199")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 0-199/{len(contenido)}"
+
+
+@pytest.mark.anyio
+async def test_abrir_rango_no_satisfacible(archivo_rangos):
+    from fastapi import HTTPException
+
+    ruta, contenido = archivo_rangos
+    with pytest.raises(HTTPException) as exc_info:
+        await local_repo.abrir(ruta, f"bytes={len(contenido)}-")
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == f"bytes */{len(contenido)}"
+
+
+@pytest.mark.anyio
+async def test_parsear_rango_sufijo_en_archivo_vacio():
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc_info:
+        local_repo.parsear_rango("bytes=-5", 0)
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers["Content-Range"] == "bytes */0"
+
+
+@pytest.mark.anyio
+async def test_abrir_rango_invalido_se_ignora(archivo_rangos):
+    ruta, contenido = archivo_rangos
+    response = await local_repo.abrir(ruta, "items=0-10")
+    assert response.status_code == 200
+    assert await _consumir(response) == contenido
+
+
+@pytest.mark.anyio
+async def test_abrir_modo_sendfile(archivo_rangos, monkeypatch):
+    from fastapi.responses import FileResponse
+
+    ruta, contenido = archivo_rangos
+    monkeypatch.setattr(local_repo, "DOWNLOAD_MODE", "sendfile")
+
+    response = await local_repo.abrir(ruta)
+    assert isinstance(response, FileResponse)
+    assert response.headers["content-length"] == str(len(contenido))
+    assert response.headers["accept-ranges"] == "bytes"
+
+    # Los rangos siguen usando el generador
+    response = await local_repo.abrir(ruta, "bytes=0-9")
+    assert isinstance(response, StreamingResponse)
+    assert response.status_code == 206
+    assert await _consumir(response) == contenido[:10]
@@ -0,0 +1,105 @@
+import pytest
+from pathlib import Path
+from fastapi import HTTPException
+
+from app.storage import local_repo
+from app.storage.s3_local import ClienteS3Local
+from app.storage.s3_repo import AlmacenamientoS3
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    directorio = tmp_path / "uploads"
+    (directorio / local_repo.TMP_SUBDIR).mkdir(parents=True)
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(directorio))
+    return directorio
+
+
+@pytest.fixture
+def cliente(tmp_path: Path):
+    return ClienteS3Local(str(tmp_path / "s3"))
+
+
+async def _cuerpo(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.anyio
+async def test_guardar_multipart_y_descargar(upload_dir: Path, cliente, tmp_path):
+    contenido = bytes(range(256)) * 100
+    (upload_dir / ".tmp" / "a.part").write_bytes(contenido)
+    backend = AlmacenamientoS3(
+        cliente, bucket="b", prefijo="archivos/", ttl_prefirmada=0, tamano_parte=10_000
+    )
+
+    await backend.guardar(".tmp/a.part", "ab/cd/x.bin")
+
+    # Se subió en 3 partes, se eliminó el temporal y no quedan partes sueltas
+    assert (tmp_path / "s3" / "b" / "archivos" / "ab/cd/x.bin").read_bytes() == contenido
+    assert not (upload_dir / ".tmp" / "a.part").exists()
+    assert list((tmp_path / "s3" / ".multipart").iterdir()) == []
+    assert await backend.existe("ab/cd/x.bin")
+
+    response = await backend.abrir("ab/cd/x.bin", headers={"ETag": '"e"'})
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(contenido))
+    assert response.headers["etag"] == '"e"'
+    assert await _cuerpo(response) == contenido
+
+    response = await backend.abrir("ab/cd/x.bin", "bytes=100-199")
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(contenido)}"
+    assert await _cuerpo(response) == contenido[100:200]
+
+    await backend.eliminar("ab/cd/x.bin")
+    assert not await backend.existe("ab/cd/x.bin")
+    with pytest.raises(HTTPException) as exc_info:
+        await backend.abrir("ab/cd/x.bin")
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_guardar_multipart_fallido_aborta(upload_dir: Path, cliente, tmp_path):
+    (upload_dir / ".tmp" / "a.part").write_bytes(b"x" * 300)
+
+    def fallar(**kwargs):
+        raise ConnectionError("conexión perdida")
+
+    cliente.complete_multipart_upload = fallar
+    backend = AlmacenamientoS3(cliente, bucket="b", tamano_parte=100)
+
+    with pytest.raises(ConnectionError):
+        await backend.guardar(".tmp/a.part", "x.bin")
+    assert list((tmp_path / "s3" / ".multipart").iterdir()) == []
+    assert not await backend.existe("x.bin")
+
+
+@pytest.mark.anyio
+async def test_abrir_redirige_a_url_prefirmada(upload_dir: Path, cliente):
+    backend = AlmacenamientoS3(cliente, bucket="b", ttl_prefirmada=60)
+
+    response = await backend.abrir("ab/x y.pdf", "bytes=0-9")
+
+    assert response.status_code == 307
+    assert response.headers["location"].startswith(
+        "http://localhost:9000/b/ab/x%20y.pdf?X-Amz-Expires=60&X-Amz-Signature="
+    )
+    assert response.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.anyio
+async def test_listar_y_sha256(upload_dir: Path, cliente):
+    import hashlib
+
+    backend = AlmacenamientoS3(cliente, bucket="b", prefijo="p/")
+    for nombre in ("a.bin", "b/c.bin", "d.bin", ".variantes/x.webp"):
+        (upload_dir / ".tmp" / "t.part").write_bytes(nombre.encode())
+        await backend.guardar(".tmp/t.part", nombre)
+
+    # Páginas de 2 claves; los directorios internos se omiten
+    lotes = [lote async for lote in backend.listar(lote=2)]
+    assert all(len(lote) <= 2 for lote in lotes)
+    entradas = [e for lote in lotes for e in lote]
+    assert [e.ruta for e in entradas] == ["a.bin", "b/c.bin", "d.bin"]
+    assert entradas[0].tamano == len("a.bin")
+    assert await backend.calcular_sha256("d.bin") == hashlib.sha256(b"d.bin").hexdigest()
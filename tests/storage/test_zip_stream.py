@@ -0,0 +1,55 @@
+import io
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.storage import local_repo, zip_stream
+from app.storage.local_repo import AlmacenamientoLocal
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(local_repo, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_nombres_unicos():
+    assert zip_stream.nombres_unicos(["a.pdf", "A.pdf", "../x/b.pdf", "a.pdf", ""]) == [
+        "a.pdf",
+        "A (2).pdf",
+        ".._x_b.pdf",
+        "a (3).pdf",
+        "archivo",
+    ]
+
+
+@pytest.mark.anyio
+async def test_generar_zip(upload_dir: Path):
+    texto = b"programa de la materia\n" * 20_000
+    foto = b"\xff\xd8\xff" + bytes(range(256)) * 500
+    (upload_dir / "texto.txt").write_bytes(texto)
+    (upload_dir / "foto.jpg").write_bytes(foto)
+    modificado = datetime(2024, 3, 1, 12, 30)
+    entradas = [
+        zip_stream.EntradaZip("texto.txt", "texto.txt", len(texto), "text/plain", modificado),
+        zip_stream.EntradaZip("foto.jpg", "foto.jpg", len(foto), "image/jpeg", modificado),
+    ]
+
+    bloques = [
+        bloque
+        async for bloque in zip_stream.generar_zip(entradas, AlmacenamientoLocal())
+    ]
+
+    # Se entrega en varios bloques, no como un único buffer
+    assert len(bloques) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(bloques))) as zf:
+        assert zf.testzip() is None
+        assert zf.read("texto.txt") == texto
+        assert zf.read("foto.jpg") == foto
+        assert zf.getinfo("texto.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo("texto.txt").compress_size < len(texto)
+        assert zf.getinfo("foto.jpg").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("foto.jpg").date_time == (2024, 3, 1, 12, 30, 0)